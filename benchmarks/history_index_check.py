@@ -0,0 +1,306 @@
+"""
+EXPLAIN-based regression check for the download_history indexes.
+
+Generates a fixed, deterministic history dataset (make_fixture() from
+history_partition_bench) into a scratch schema of the configured database
+(DATABASE_* settings). The schema holds download_history exactly as the
+DownloadHistory model declares it, with its monthly partitions and
+indexes, and is the only schema on the search_path, so the application's
+own tables are never read or touched. After VACUUM ANALYZE the
+application's history queries are captured as they execute and
+EXPLAINed against it.
+
+Every plan must satisfy its expectation in query_checks(): the query is
+served by the expected index, never by a sequential scan, as an
+index-only scan where the index covers it, and without a sort where the
+index provides the order. The process exits with status 1 otherwise.
+
+The scratch schema is dropped afterwards. Much smaller datasets than the
+default make sequential scans legitimately cheaper for some queries.
+
+Usage:
+    python -m benchmarks.history_index_check [--rows 200000] [--months 3]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+from datetime import timedelta
+
+from sqlalchemy import event, insert, text
+from sqlmodel import Session, select
+
+from src.database.database import engine
+from src.models.download_history import DownloadHistory, DownloadStatus
+from src.routes.api import fetch_history_page
+from src.routes.web import get_recent_downloads, parse_period_to_dates
+from src.services.history_partitions import (
+    DEFAULT_PARTITION,
+    add_months,
+    month_start,
+    partition_name,
+)
+from src.services.provider_scoreboard import PROVIDER_SEED_LIMIT
+
+from .history_partition_bench import BATCH_SIZE, FIXTURE_END, make_fixture
+
+SCHEMA = "history_index_check"
+
+# A day of rows aggregated the way rollup rebuilds and the legacy dashboard
+# scan history
+PERIOD_AGGREGATE_SQL = (
+    "SELECT platform, status, count(*), avg(response_time) "
+    "FROM download_history WHERE created_at >= :start AND created_at < :end "
+    "GROUP BY platform, status"
+)
+
+
+def seed_scoreboard_query(session: Session, latest):
+    # seed_provider_scoreboard() looks back from the current time, which may
+    # be past the newest row; same query, anchored at the newest row
+    since = latest - timedelta(hours=24)
+    session.exec(
+        select(
+            DownloadHistory.platform,
+            DownloadHistory.provider,
+            DownloadHistory.response_time,
+        )
+        .where(DownloadHistory.created_at >= since)
+        .where(DownloadHistory.status == DownloadStatus.SUCCESS)
+        .where(DownloadHistory.provider.is_not(None))
+        .where(DownloadHistory.response_time.is_not(None))
+        .order_by(DownloadHistory.created_at.desc())
+        .limit(PROVIDER_SEED_LIMIT)
+    ).all()
+
+
+def deep_cursor(conn, latest):
+    """A (created_at, id) key some way into the history, for deep pages."""
+    return conn.execute(
+        text(
+            "SELECT created_at, id FROM download_history "
+            "WHERE created_at < :middle ORDER BY created_at DESC, id DESC LIMIT 1"
+        ),
+        {"middle": latest - timedelta(days=40)},
+    ).one_or_none() or (latest, 0)
+
+
+def query_checks(session: Session, conn, latest) -> list:
+    """(label, run query, expected index, index-only, sort-free)"""
+    week_start, week_end = parse_period_to_dates("7days", latest)
+    after = tuple(deep_cursor(conn, latest))
+    return [
+        (
+            "recent downloads (dashboard)",
+            lambda: get_recent_downloads(session, week_start, week_end, limit=10),
+            "ix_download_history_created_at_id",
+            False,
+            True,
+        ),
+        (
+            "history page 1",
+            lambda: fetch_history_page(session, {}, None, 101),
+            "ix_download_history_created_at_id",
+            False,
+            True,
+        ),
+        (
+            "history page, deep cursor",
+            lambda: fetch_history_page(session, {}, after, 101),
+            "ix_download_history_created_at_id",
+            False,
+            True,
+        ),
+        (
+            "history page by platform",
+            lambda: fetch_history_page(session, {"platform": "reddit"}, after, 101),
+            "ix_download_history_platform_created_at_id",
+            False,
+            True,
+        ),
+        (
+            "history page by status",
+            lambda: fetch_history_page(
+                session, {"status": DownloadStatus.FAILED}, after, 101
+            ),
+            "ix_download_history_status_created_at_id",
+            False,
+            True,
+        ),
+        (
+            "scoreboard seed",
+            lambda: seed_scoreboard_query(session, latest),
+            "ix_download_history_created_at_id",
+            True,
+            True,
+        ),
+        (
+            "one-day aggregate",
+            lambda: session.execute(
+                text(PERIOD_AGGREGATE_SQL),
+                {"start": week_end - timedelta(days=1), "end": week_end},
+            ).all(),
+            "ix_download_history_created_at_id",
+            True,
+            False,
+        ),
+    ]
+
+
+def create_scratch(conn, months: int):
+    """download_history as the model declares it, alone in the scratch schema."""
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    # Only the scratch schema is visible, so nothing resolves to app tables
+    conn.execute(text(f"SET search_path TO {SCHEMA}"))
+    DownloadHistory.__table__.create(conn)
+    lower = add_months(month_start(FIXTURE_END), -months)
+    while lower <= FIXTURE_END:
+        upper = add_months(lower, 1)
+        conn.execute(
+            text(
+                f"CREATE TABLE {partition_name(lower)} PARTITION OF download_history "
+                f"FOR VALUES FROM ('{lower:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+            )
+        )
+        lower = upper
+    conn.execute(
+        text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF download_history DEFAULT")
+    )
+    conn.commit()
+
+
+def load_fixture(conn, fixture: list):
+    rows = sorted(fixture, key=lambda row: row["created_at"])
+    for i in range(0, len(rows), BATCH_SIZE):
+        conn.execute(insert(DownloadHistory.__table__), rows[i : i + BATCH_SIZE])
+    conn.commit()
+
+    # Planner statistics, and the visibility map index-only scans need
+    conn.execution_options(isolation_level="AUTOCOMMIT")
+    conn.execute(text("VACUUM ANALYZE download_history"))
+    conn.commit()
+    conn.execution_options(isolation_level=conn.default_isolation_level)
+
+
+def parent_indexes(conn) -> dict:
+    """Partition index name -> name of the index declared on download_history."""
+    rows = conn.execute(
+        text(
+            "SELECT child.relname, parent.relname FROM pg_inherits i "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "WHERE child.relkind = 'i'"
+        )
+    ).all()
+    return dict(rows)
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain_query(conn, run) -> dict:
+    """EXPLAIN the SQL a query function runs, instead of running it."""
+    statements = []
+    plans = []
+
+    def to_explain(_conn, _cursor, statement, parameters, _context, _executemany):
+        statements.append(statement)
+        return f"EXPLAIN (FORMAT JSON) {statement}", parameters
+
+    def read_plan(_conn, cursor, *_):
+        plans.append(cursor.fetchone()[0][0]["Plan"])
+
+    output = io.StringIO()
+    event.listen(conn, "before_cursor_execute", to_explain, retval=True)
+    event.listen(conn, "after_cursor_execute", read_plan)
+    try:
+        # Some functions log errors instead of raising them; keep that out of
+        # the report
+        with contextlib.redirect_stdout(output):
+            run()
+    except Exception:
+        # Once every captured statement has its plan, the function failing to
+        # make sense of the EXPLAIN result it got back is expected
+        if not plans or len(plans) < len(statements):
+            raise
+    finally:
+        event.remove(conn, "before_cursor_execute", to_explain)
+        event.remove(conn, "after_cursor_execute", read_plan)
+
+    if len(plans) < len(statements):
+        # The function swallowed the error of a failed EXPLAIN
+        raise RuntimeError(
+            f"EXPLAIN failed for: {statements[len(plans)]}\n{output.getvalue()}"
+        )
+    if not plans:
+        raise RuntimeError("Query function ran no SQL")
+    return plans[-1]
+
+
+def check_plans(conn, latest) -> list:
+    names = parent_indexes(conn)
+    failures = []
+    with Session(bind=conn) as session:
+        for name, run, index, index_only, sort_free in query_checks(
+            session, conn, latest
+        ):
+            plan = explain_query(conn, run)
+            nodes = list(plan_nodes(plan))
+            used = {
+                names.get(node["Index Name"], node["Index Name"])
+                for node in nodes
+                if "Index Name" in node
+            }
+            node_types = {node["Node Type"] for node in nodes}
+            problems = []
+            if index not in used:
+                problems.append(f"expected {index}, used {sorted(used) or 'none'}")
+            if "Seq Scan" in node_types:
+                problems.append("sequential scan")
+            if index_only and "Index Only Scan" not in node_types:
+                problems.append("not index-only")
+            if sort_free and {"Sort", "Incremental Sort"} & node_types:
+                problems.append("explicit sort")
+
+            scan = sorted(node_types & {"Seq Scan", "Index Scan", "Index Only Scan"})
+            scan = ", ".join(scan) or "bitmap scan"
+            verdict = ("FAIL: " + "; ".join(problems)) if problems else "ok"
+            print(
+                f"  {name:<30} cost {plan['Total Cost']:>10.1f}  {scan:<28}  {verdict}"
+            )
+            if problems:
+                failures.append(f"{name}: {'; '.join(problems)}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--months", type=int, default=3)
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        try:
+            create_scratch(conn, args.months)
+            load_fixture(conn, make_fixture(args.rows, args.months))
+            print(f"Plans over {args.rows} generated rows, {args.months} months:")
+            failures = check_plans(conn, FIXTURE_END)
+        finally:
+            conn.rollback()
+            conn.execute(text("RESET search_path"))
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.commit()
+
+    if failures:
+        print("\n❌ Index regressions:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\n✅ Every history query uses its intended index")
+
+
+if __name__ == "__main__":
+    main()
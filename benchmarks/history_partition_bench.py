@@ -0,0 +1,262 @@
+"""
+Benchmark download_history layouts: one plain table vs monthly partitions.
+
+Loads the same deterministic fixture into both layouts inside a scratch
+schema of the configured database (DATABASE_* settings) and reports:
+
+- insert cost: batches of 500 in arrival order, as the history writer
+  sends them, plus the rollup upserts that now ride along. Their cost
+  grows with the distinct (hour, platform, status) keys per batch, so a
+  sparse fixture (few rows per hour) is their worst case
+- dashboard cost: the live-scan queries the dashboard used to run against
+  the plain table vs the rollup queries it runs now
+- retention cost: deleting a month of rows vs dropping its partition
+
+The scratch schema is dropped afterwards.
+
+Usage:
+    python -m benchmarks.history_partition_bench [--rows 100000] [--months 12]
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import MetaData, insert, text
+from sqlmodel import Session
+
+from src.database.database import create_db_and_tables, engine
+from src.models.download_history import DownloadHistory, DownloadStatus
+from src.routes.web import (
+    get_platform_statistics,
+    get_stats_for_period,
+    parse_period_to_dates,
+)
+from src.services.history_partitions import add_months, month_start, partition_name
+from src.services.rollups import rollup_upserts
+
+SCHEMA = "history_bench"
+BATCH_SIZE = 500
+FIXTURE_END = datetime(2026, 6, 30, 12, 0)
+
+PLATFORMS = ["tiktok", "instagram", "facebook", "twitter", "reddit", "pinterest"]
+PROVIDERS = {"tiktok": ["ssstik", "tikmate"], "instagram": ["on4t", "fastdl"]}
+ROLLUP_TABLES = [
+    "download_rollup_hourly",
+    "download_rollup_daily",
+    "provider_rollup_hourly",
+    "provider_rollup_daily",
+]
+
+# The legacy live-scan dashboard queries: current and previous period
+# stats, then the platform breakdown
+LEGACY_STATS_SQL = (
+    "SELECT count(id), "
+    "sum(CASE WHEN status IN ('SUCCESS', 'CACHED') THEN 1 ELSE 0 END), "
+    "sum(CASE WHEN status = 'FAILED' THEN 1 ELSE 0 END), "
+    "sum(CASE WHEN status = 'CACHED' THEN 1 ELSE 0 END), avg(response_time) "
+    "FROM download_history_plain "
+    "WHERE created_at >= :start AND created_at <= :end"
+)
+LEGACY_PLATFORMS_SQL = (
+    "SELECT platform, count(id), "
+    "sum(CASE WHEN status IN ('SUCCESS', 'CACHED') THEN 1 ELSE 0 END), "
+    "sum(CASE WHEN status = 'FAILED' THEN 1 ELSE 0 END) "
+    "FROM download_history_plain "
+    "WHERE created_at >= :start AND created_at <= :end "
+    "GROUP BY platform ORDER BY count(id) DESC"
+)
+
+
+def make_fixture(rows: int, months: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    span = (FIXTURE_END - add_months(month_start(FIXTURE_END), -months)).total_seconds()
+    fixture = []
+    for i in range(rows):
+        platform = rng.choice(PLATFORMS)
+        status = rng.choices(
+            [DownloadStatus.SUCCESS, DownloadStatus.FAILED, DownloadStatus.CACHED],
+            weights=[70, 20, 10],
+        )[0]
+        scraped = status == DownloadStatus.SUCCESS
+        fixture.append(
+            {
+                "url": f"https://www.{platform}.com/video/{i}",
+                "platform": platform,
+                "status": status,
+                "title": f"Video {i}" if scraped else None,
+                "error_message": "Scraper failed" if not scraped else None,
+                "created_at": FIXTURE_END - timedelta(seconds=rng.random() * span),
+                "response_time": (
+                    rng.lognormvariate(0.5, 0.8)
+                    if status != DownloadStatus.CACHED
+                    else 0.01
+                ),
+                "provider": (
+                    rng.choice(PROVIDERS.get(platform, ["default"]))
+                    if scraped
+                    else None
+                ),
+            }
+        )
+    return fixture
+
+
+def create_layouts(conn, months: int):
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+
+    # Before: the original single table with its four single-column indexes
+    conn.execute(
+        text(
+            "CREATE TABLE download_history_plain "
+            "(LIKE public.download_history INCLUDING DEFAULTS)"
+        )
+    )
+    conn.execute(text("ALTER TABLE download_history_plain ADD PRIMARY KEY (id)"))
+    for column in ("url", "platform", "status", "created_at"):
+        conn.execute(text(f"CREATE INDEX ON download_history_plain ({column})"))
+
+    # After: monthly partitions, as created by history_partitions.py
+    conn.execute(
+        text(
+            "CREATE TABLE download_history "
+            "(LIKE public.download_history INCLUDING DEFAULTS INCLUDING INDEXES) "
+            "PARTITION BY RANGE (created_at)"
+        )
+    )
+    lower = add_months(month_start(FIXTURE_END), -months)
+    while lower <= FIXTURE_END:
+        upper = add_months(lower, 1)
+        conn.execute(
+            text(
+                f"CREATE TABLE {partition_name(lower)} PARTITION OF download_history "
+                f"FOR VALUES FROM ('{lower:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+            )
+        )
+        lower = upper
+    for table in ROLLUP_TABLES:
+        conn.execute(text(f"CREATE TABLE {table} (LIKE public.{table} INCLUDING ALL)"))
+
+
+def report(label: str, seconds: float, baseline: float = None, unit: str = "ms"):
+    value = seconds * 1000 if unit == "ms" else seconds
+    speedup = f"{baseline / seconds:6.1f}x" if baseline else "   1.0x"
+    print(f"  {label:<44} {value:10.2f} {unit}  {speedup}")
+
+
+def bench_inserts(conn, fixture: list):
+    # Unqualified names resolve to the scratch schema through search_path
+    partitioned = DownloadHistory.__table__
+    plain = partitioned.to_metadata(MetaData(), name="download_history_plain")
+    # The history writer inserts rows in arrival order, so batches are too
+    fixture = sorted(fixture, key=lambda row: row["created_at"])
+    batches = [fixture[i : i + BATCH_SIZE] for i in range(0, len(fixture), BATCH_SIZE)]
+
+    print(f"Insert {len(fixture)} rows in batches of {BATCH_SIZE}:")
+    start = time.perf_counter()
+    for batch in batches:
+        conn.execute(insert(plain), batch)
+    conn.commit()
+    before = time.perf_counter() - start
+    report("plain table (before)", before, unit="s")
+
+    start = time.perf_counter()
+    for batch in batches:
+        conn.execute(insert(partitioned), batch)
+    conn.commit()
+    partitioned_only = time.perf_counter() - start
+    report("partitioned table", partitioned_only, before, unit="s")
+
+    start = time.perf_counter()
+    for batch in batches:
+        for statement, params in rollup_upserts(batch):
+            conn.execute(statement, params)
+    conn.commit()
+    after = partitioned_only + time.perf_counter() - start
+    report("partitioned + rollup upserts (after)", after, before, unit="s")
+    conn.execute(text("ANALYZE"))
+    conn.commit()
+
+
+def bench_dashboard(conn, repeat: int):
+    print(f"\nDashboard queries, mean of {repeat}:")
+    with Session(bind=conn) as session:
+        for period in ("7days", "1month", "1year"):
+            start_date, end_date = parse_period_to_dates(period, FIXTURE_END)
+            previous = start_date - (end_date - start_date)
+
+            def legacy():
+                for lower, upper in ((start_date, end_date), (previous, start_date)):
+                    params = {"start": lower, "end": upper}
+                    conn.execute(text(LEGACY_STATS_SQL), params).all()
+                conn.execute(
+                    text(LEGACY_PLATFORMS_SQL), {"start": start_date, "end": end_date}
+                ).all()
+
+            def rollups():
+                get_stats_for_period(session, start_date, end_date)
+                get_stats_for_period(session, previous, start_date)
+                get_platform_statistics(session, start_date, end_date)
+
+            before = timed(legacy, repeat)
+            report(f"{period}: live scan, plain table (before)", before)
+            report(f"{period}: rollups (after)", timed(rollups, repeat), before)
+
+
+def bench_retention(conn, months: int):
+    oldest = add_months(month_start(FIXTURE_END), -months)
+    print(f"\nRetention, removing {oldest:%Y-%m}:")
+    start = time.perf_counter()
+    conn.execute(
+        text(
+            "DELETE FROM download_history_plain "
+            "WHERE created_at < :upper AND created_at >= :lower"
+        ),
+        {"lower": oldest, "upper": add_months(oldest, 1)},
+    )
+    conn.commit()
+    before = time.perf_counter() - start
+    report("DELETE from plain table (before)", before)
+
+    start = time.perf_counter()
+    conn.execute(text(f"DROP TABLE {partition_name(oldest)}"))
+    conn.commit()
+    report("DROP partition (after)", time.perf_counter() - start, before)
+
+
+def timed(fn, repeat: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    fixture = make_fixture(args.rows, args.months)
+    with engine.connect() as conn:
+        try:
+            create_layouts(conn, args.months)
+            conn.commit()
+            bench_inserts(conn, fixture)
+            bench_dashboard(conn, args.repeat)
+            bench_retention(conn, args.months)
+        finally:
+            conn.rollback()
+            conn.execute(text("RESET search_path"))
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark scraper HTML extraction: full html.parser parse vs parse_html().
+
+Builds a synthetic result page shaped like the orbitdownloader Rumble
+response (a large landing page with a few format cards) and times the
+extraction done by fetch_rumble_orbitdownloader with each strategy.
+
+Usage:
+    python -m benchmarks.html_extract_bench [--repeat 200]
+"""
+
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+from src.services import html_extract
+from src.services.html_extract import parse_html
+
+NAV_ITEM = '<li class="nav-item"><a class="nav-link" href="/tool/{i}">Tool {i}</a></li>'
+ARTICLE = (
+    '<section class="seo-block"><h2>Heading {i}</h2>'
+    + "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 8
+    + "</p><ul>"
+    + "<li><span>Point</span> <em>detail</em></li>" * 6
+    + "</ul></section>"
+)
+FORMAT_CARD = (
+    '<div class="format-card"><span class="resolution-label">{q}p</span>'
+    '<a class="download-button" href="https://cdn.example.com/{q}.mp4">Download</a>'
+    "</div>"
+)
+
+
+def build_page(sections: int = 120) -> str:
+    nav = "".join(NAV_ITEM.format(i=i) for i in range(200))
+    seo = "".join(ARTICLE.format(i=i) for i in range(sections))
+    cards = "".join(FORMAT_CARD.format(q=q) for q in (1080, 720, 480, 360, 240))
+    return (
+        "<!DOCTYPE html><html><head><title>Rumble Downloader</title>"
+        + '<meta name="csrf-token" content="abc">' * 3
+        + "</head><body>"
+        + f'<nav><ul class="nav">{nav}</ul></nav>'
+        + '<div class="preview-header"><h1>Sample video title</h1></div>'
+        + '<div class="thumbnail-container"><img src="https://cdn.example.com/t.jpg"></div>'
+        + cards
+        + seo
+        + "</body></html>"
+    )
+
+
+def extract(soup: BeautifulSoup) -> dict:
+    title = soup.find("div", class_="preview-header").find("h1").text
+    thumbnail = soup.find("div", class_="thumbnail-container").find("img")["src"]
+    urls = [
+        {
+            "quality": item.find("span", class_="resolution-label").text,
+            "url": item.find("a", class_="download-button")["href"],
+        }
+        for item in soup.find_all("div", class_="format-card")
+    ]
+    return {"title": title, "thumbnail": thumbnail, "videos": urls}
+
+
+def strained(html: str) -> BeautifulSoup:
+    return parse_html(
+        html, "div", class_=["preview-header", "thumbnail-container", "format-card"]
+    )
+
+
+def bench(label: str, fn, html: str, repeat: int, baseline=None) -> float:
+    fn(html)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(html)
+    per_call = (time.perf_counter() - start) / repeat * 1000
+    speedup = f"{baseline / per_call:5.1f}x" if baseline else "  1.0x"
+    print(f"{label:<36} {per_call:8.3f} ms  {speedup}")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    html = build_page()
+    print(f"Page size: {len(html) / 1024:.0f} KiB, {args.repeat} iterations\n")
+
+    expected = extract(BeautifulSoup(html, "html.parser"))
+    cases = [
+        ("full parse, html.parser (before)", "html.parser", None),
+        ("full parse, lxml", "lxml", None),
+        ("parse_html strained, html.parser", "html.parser", strained),
+        ("parse_html strained, lxml", "lxml", strained),
+    ]
+
+    baseline = None
+    for label, parser_name, strain in cases:
+        if (
+            parser_name == "lxml"
+            and not html_extract.get_parser_info()["lxml_available"]
+        ):
+            print(f"{label:<36} skipped (install the fast-html extra)")
+            continue
+        html_extract.HTML_PARSER = parser_name
+        if strain:
+            parse = strain
+        else:
+            parse = lambda page, p=parser_name: BeautifulSoup(page, p)  # noqa: E731
+        assert extract(parse(html)) == expected, f"{label} extracted different data"
+        per_call = bench(
+            label, lambda page: extract(parse(page)), html, args.repeat, baseline
+        )
+        baseline = baseline or per_call
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark detect_platform: host suffix index vs the previous regex scan.
+
+Runs both detectors over a corpus of real-world URL shapes, reports the
+time per lookup and lists every URL the two route differently.
+
+Usage:
+    python -m benchmarks.platform_detect_bench [--repeat 2000]
+"""
+
+import argparse
+import re
+import time
+
+from src.routes.general import detect_platform
+
+# The regex table and linear scan detect_platform used before the host index
+LEGACY_PLATFORM_PATTERNS = {
+    "tiktok": [
+        r"tiktok\.com",
+        r"vm\.tiktok\.com",
+        r"vt\.tiktok\.com",
+        r"m\.tiktok\.com",
+    ],
+    "instagram": [r"instagram\.com", r"instagr\.am", r"ig\.me"],
+    "facebook": [r"facebook\.com", r"fb\.com", r"fb\.watch"],
+    "twitter": [
+        r"(?:https?:\/\/)?(?:www\.)?twitter\.com\/",
+        r"(?:https?:\/\/)?(?:www\.)?x\.com\/",
+        r"(?:https?:\/\/)?(?:www\.)?t\.co\/",
+    ],
+    "dailymotion": [r"dailymotion\.com", r"dai\.ly"],
+    "reddit": [
+        r"reddit\.com",
+        r"redd\.it",
+        r"reddit\.com\/user\/",
+        r"reddit\.com\/comments\/",
+    ],
+    "pinterest": [r"pinterest\.com", r"pin\.it"],
+    "ninegag": [r"9gag\.com"],
+    "bitchute": [r"bitchute\.com"],
+    "douyin": [r"douyin\.com"],
+    "imdb": [r"imdb\.com"],
+    "kwai": [r"kwai\.com"],
+    "linkedin": [r"linkedin\.com"],
+    "rumble": [r"rumble\.com"],
+    "snapchat": [r"snapchat\.com"],
+    "twitch": [r"twitch\.tv"],
+    "buzzfeed": [r"buzzfeed\.com"],
+    "tumblr": [r"tumblr\.com"],
+    "bilibili": [r"bilibili\.com"],
+}
+
+
+def legacy_detect_platform(url: str):
+    url_lower = url.lower()
+    for platform, patterns in LEGACY_PLATFORM_PATTERNS.items():
+        for pattern in patterns:
+            if re.search(pattern, url_lower):
+                return platform
+    return None
+
+
+CORPUS = [
+    "https://www.tiktok.com/@scout2015/video/6718335390845095173",
+    "https://vm.tiktok.com/ZMeAbCdEf/",
+    "https://vt.tiktok.com/ZSabc123/",
+    "https://m.tiktok.com/v/6718335390845095173.html",
+    "https://www.instagram.com/reel/C1a2B3c4D5e/?igsh=MTc4MmM1YmI2Ng==",
+    "https://instagram.com/p/CxYz123AbC/",
+    "https://www.facebook.com/watch/?v=1234567890123456",
+    "https://m.facebook.com/story.php?story_fbid=1234&id=5678",
+    "https://fb.watch/abcDEF123/",
+    "https://twitter.com/NASA/status/1700000000000000000",
+    "https://x.com/elonmusk/status/1700000000000000001?s=20",
+    "https://t.co/AbCdEf1234",
+    "https://www.dailymotion.com/video/x8abcd1",
+    "https://dai.ly/x8abcd1",
+    "https://www.reddit.com/r/videos/comments/abc123/some_title/",
+    "https://old.reddit.com/r/aww/comments/xyz789/cute/",
+    "https://redd.it/abc123",
+    "https://www.pinterest.com/pin/123456789012345678/",
+    "https://in.pinterest.com/pin/123456789012345678/",
+    "https://www.pinterest.co.uk/pin/123456789012345678/",
+    "https://pinterest.de/pin/123456789012345678/",
+    "https://www.pinterest.com.au/pin/123456789012345678/",
+    "https://pin.it/1a2B3c4D5",
+    "https://9gag.com/gag/aXyZ123",
+    "https://www.bitchute.com/video/AbCdEf123/",
+    "https://www.douyin.com/video/7300000000000000000",
+    "https://www.imdb.com/video/vi1234567890/",
+    "https://www.kwai.com/@user/video/5200000000000000000",
+    "https://www.linkedin.com/posts/someone_activity-7100000000000000000-AbCd",
+    "https://rumble.com/v3abcd-some-video.html",
+    "https://www.snapchat.com/spotlight/W7_EDlXWTBiXAEEniNoMPwAAYa",
+    "https://www.twitch.tv/videos/1900000000",
+    "https://clips.twitch.tv/FunnyClipName-AbCdEf",
+    "https://www.buzzfeed.com/someone/some-video",
+    "https://someblog.tumblr.com/post/123456789/title",
+    "https://www.bilibili.com/video/BV1cs79zmECo/",
+    "www.tiktok.com/@user/video/7301234567890123456",
+    # Links to one platform carried inside another's URL
+    "https://www.reddit.com/r/videos/comments/abc/https_www_tiktok_com_clip/",
+    "https://www.reddit.com/submit?url=https://www.tiktok.com/@u/video/1",
+    "https://l.facebook.com/l.php?u=https%3A%2F%2Fwww.instagram.com%2Fp%2Fabc",
+    "https://www.dropbox.com/s/abc/video.mp4",
+    "https://example.com/watch?v=123",
+]
+
+
+def bench(label: str, detect, repeat: int, baseline=None) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for url in CORPUS:
+            detect(url)
+    per_lookup = (time.perf_counter() - start) / (repeat * len(CORPUS)) * 1e6
+    speedup = f"{baseline / per_lookup:5.1f}x" if baseline else "  1.0x"
+    print(f"{label:<28} {per_lookup:8.2f} us/lookup  {speedup}")
+    return per_lookup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{len(CORPUS)} URLs x {args.repeat} iterations\n")
+    baseline = bench("regex scan (before)", legacy_detect_platform, args.repeat)
+    bench("host suffix index", detect_platform, args.repeat, baseline)
+
+    print("\nRouted differently:")
+    for url in CORPUS:
+        old, new = legacy_detect_platform(url), detect_platform(url)
+        if old != new:
+            print(f"  {old or '-':<10} -> {new or '-':<10} {url}")
+
+
+if __name__ == "__main__":
+    main()
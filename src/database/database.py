@@ -1,26 +1,59 @@
 from sqlmodel import create_engine, SQLModel, Session
-from typing import Generator
+from typing import Any, Callable, Generator, TypeVar
+import asyncio
 import os
 from dotenv import load_dotenv
 
 # Import all models here so SQLModel knows about them
 from ..models.download_history import DownloadHistory
+from ..models.download_rollup import (
+    DownloadRollupDaily,
+    DownloadRollupHourly,
+    ProviderRollupDaily,
+    ProviderRollupHourly,
+)
+from .migrations import apply_migrations
 
 # Load environment variables
 load_dotenv()
 
 DATABASE_URL = f"postgresql://{os.getenv('DATABASE_USERNAME')}:{os.getenv('DATABASE_PASSWORD')}@{os.getenv('DATABASE_HOST')}:{os.getenv('DATABASE_PORT')}/{os.getenv('DATABASE_NAME')}"
 
-# Create engine
-# For production, you might want to add pool settings
+# Connection pool sizing, per engine
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "5"))
+DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+DATABASE_POOL_TIMEOUT = float(os.getenv("DATABASE_POOL_TIMEOUT", "30"))
+
+# Serve request-path queries through asyncpg instead of psycopg2 in threads.
+# Requires the "async-db" extra.
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Create engine (migrations, startup tasks and the threaded query path)
 engine = create_engine(
     DATABASE_URL,
     echo=False,  # Set to False in production to reduce logs
     pool_pre_ping=True,  # Verify connections before using them
-    pool_size=5,  # Maximum number of connections to keep in the pool
-    max_overflow=10,  # Maximum overflow size of the pool
+    pool_size=DATABASE_POOL_SIZE,  # Maximum number of connections to keep in the pool
+    max_overflow=DATABASE_MAX_OVERFLOW,  # Maximum overflow size of the pool
+    pool_timeout=DATABASE_POOL_TIMEOUT,
 )
 
+async_engine = None
+if DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    async_engine = create_async_engine(
+        DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1),
+        echo=False,
+        pool_pre_ping=True,
+        pool_size=DATABASE_POOL_SIZE,
+        max_overflow=DATABASE_MAX_OVERFLOW,
+        pool_timeout=DATABASE_POOL_TIMEOUT,
+    )
+
+T = TypeVar("T")
+
 
 def create_db_and_tables():
     """
@@ -28,6 +61,7 @@ def create_db_and_tables():
     Call this function on application startup.
     """
     SQLModel.metadata.create_all(engine)
+    apply_migrations(engine)
 
 
 def get_session() -> Generator[Session, None, None]:
@@ -43,3 +77,50 @@ def get_session() -> Generator[Session, None, None]:
     """
     with Session(engine) as session:
         yield session
+
+
+def _run_in_session(fn: Callable[..., T], *args: Any) -> T:
+    with Session(engine) as session:
+        return fn(session, *args)
+
+
+async def run_with_session(fn: Callable[..., T], *args: Any) -> T:
+    """
+    Run synchronous query code against the database without blocking the loop.
+
+    With DATABASE_ASYNC enabled, fn runs through AsyncSession.run_sync on the
+    asyncpg engine, so its I/O is awaited natively. Otherwise it runs with a
+    regular Session in a worker thread.
+
+    Args:
+        fn: Function taking a Session as first argument, then *args
+        *args: Extra arguments for fn
+
+    Returns:
+        Whatever fn returns
+
+    Example:
+        stats = await run_with_session(get_dashboard_data, "7days")
+    """
+    if async_engine is not None:
+        async with AsyncSession(async_engine) as session:
+            return await session.run_sync(lambda sync_session: fn(sync_session, *args))
+    return await asyncio.to_thread(_run_in_session, fn, *args)
+
+
+def get_pool_status() -> dict:
+    """Connection pool usage of the active engines, for monitoring."""
+    status = {"async": async_engine is not None, "sync": engine.pool.status()}
+    if async_engine is not None:
+        status["asyncpg"] = async_engine.pool.status()
+    return status
+
+
+async def dispose_engines():
+    """
+    Close pooled connections.
+    Call this function on application shutdown.
+    """
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
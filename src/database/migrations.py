@@ -0,0 +1,172 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# Ordered, append-only list of schema migrations applied after create_all().
+# create_all() only creates missing tables; anything that changes an existing
+# table or type must be added here as (migration_id, [SQL statements]).
+MIGRATIONS = [
+    (
+        "0001_download_status_cached",
+        ["ALTER TYPE downloadstatus ADD VALUE IF NOT EXISTS 'CACHED'"],
+    ),
+    (
+        "0002_download_history_provider",
+        [
+            "ALTER TABLE download_history "
+            "ADD COLUMN IF NOT EXISTS provider VARCHAR(50)"
+        ],
+    ),
+    (
+        # create_all() made the (empty) rollup tables; fill them from history
+        "0003_download_rollups_backfill",
+        [
+            f"INSERT INTO download_rollup_{table} "
+            "(bucket, platform, status, count, response_time_sum, "
+            "response_time_count) "
+            f"SELECT date_trunc('{grain}', created_at), platform, status, "
+            "count(*), coalesce(sum(response_time), 0), count(response_time) "
+            "FROM download_history GROUP BY 1, 2, 3"
+            for table, grain in (("hourly", "hour"), ("daily", "day"))
+        ],
+    ),
+    (
+        # Response-time sketches on the rollups plus per-provider rollups.
+        # Sketch keys are ceil(ln(t) / ln(gamma)) with gamma = 1.01 / 0.99,
+        # matching services/latency_sketch.py.
+        "0004_rollup_sketches",
+        [
+            "CREATE OR REPLACE FUNCTION jsonb_sum_merge(a jsonb, b jsonb) "
+            "RETURNS jsonb LANGUAGE sql IMMUTABLE AS $$ "
+            "SELECT coalesce(jsonb_object_agg(key, total), '{}'::jsonb) FROM ("
+            "SELECT key, sum(value::bigint) AS total FROM ("
+            "SELECT * FROM jsonb_each_text(coalesce(a, '{}'::jsonb)) UNION ALL "
+            "SELECT * FROM jsonb_each_text(coalesce(b, '{}'::jsonb))"
+            ") AS entries GROUP BY key) AS merged $$",
+        ]
+        + [
+            statement
+            for table, grain in (("hourly", "hour"), ("daily", "day"))
+            for statement in (
+                f"ALTER TABLE download_rollup_{table} ADD COLUMN IF NOT EXISTS "
+                "response_time_sketch JSONB NOT NULL DEFAULT '{}'::jsonb",
+                f"UPDATE download_rollup_{table} AS r "
+                "SET response_time_sketch = s.sketch FROM ("
+                "SELECT bucket, platform, status, jsonb_object_agg(key, n) AS sketch "
+                f"FROM (SELECT date_trunc('{grain}', created_at) AS bucket, "
+                "platform, status, "
+                "ceil(ln(greatest(response_time, 0.001)) / ln(1.01 / 0.99))"
+                "::int::text AS key, count(*) AS n "
+                "FROM download_history WHERE response_time IS NOT NULL "
+                "GROUP BY 1, 2, 3, 4) AS keyed GROUP BY 1, 2, 3) AS s "
+                "WHERE r.bucket = s.bucket AND r.platform = s.platform "
+                "AND r.status = s.status",
+                f"INSERT INTO provider_rollup_{table} "
+                "(bucket, platform, provider, count, response_time_sum, "
+                "response_time_count, response_time_sketch) "
+                "SELECT bucket, platform, provider, sum(n), sum(total), "
+                "sum(timed), coalesce(jsonb_object_agg(key, timed) "
+                "FILTER (WHERE key IS NOT NULL), '{}'::jsonb) "
+                f"FROM (SELECT date_trunc('{grain}', created_at) AS bucket, "
+                "platform, provider, CASE WHEN response_time IS NOT NULL THEN "
+                "ceil(ln(greatest(response_time, 0.001)) / ln(1.01 / 0.99))"
+                "::int::text END AS key, count(*) AS n, "
+                "coalesce(sum(response_time), 0) AS total, "
+                "count(response_time) AS timed "
+                "FROM download_history WHERE provider IS NOT NULL "
+                "GROUP BY 1, 2, 3, 4) AS keyed GROUP BY 1, 2, 3 "
+                "ON CONFLICT DO NOTHING",
+            )
+        ],
+    ),
+    # 0005_partition_download_history converts an unpartitioned
+    # download_history into range partitions. It scans and indexes the whole
+    # table, so it is not applied at startup but run offline with
+    # `python -m src.database.partition_history`.
+    (
+        # Merge only the incoming sketch's buckets into the stored one
+        # instead of regrouping both; about 6x cheaper per rollup upsert
+        "0006_faster_jsonb_sum_merge",
+        [
+            "CREATE OR REPLACE FUNCTION jsonb_sum_merge(a jsonb, b jsonb) "
+            "RETURNS jsonb LANGUAGE sql IMMUTABLE AS $$ "
+            "SELECT coalesce(a, '{}'::jsonb) || coalesce(("
+            "SELECT jsonb_object_agg(key, coalesce((a ->> key)::bigint, 0) "
+            "+ value::bigint) FROM jsonb_each_text(b)), '{}'::jsonb) $$"
+        ],
+    ),
+    (
+        # Replace the single-column indexes with ones matching the query
+        # shapes (see models/download_history.py). The url index served no
+        # query. Indexes on the partitioned parent cascade to every
+        # partition; the build locks download_history against writes once.
+        "0007_download_history_query_indexes",
+        [
+            "DROP INDEX IF EXISTS ix_download_history_url",
+            "DROP INDEX IF EXISTS ix_download_history_platform",
+            "DROP INDEX IF EXISTS ix_download_history_status",
+            "DROP INDEX IF EXISTS ix_download_history_created_at",
+            "CREATE INDEX IF NOT EXISTS ix_download_history_created_at_id "
+            "ON download_history (created_at, id) "
+            "INCLUDE (platform, status, response_time, provider)",
+            "CREATE INDEX IF NOT EXISTS ix_download_history_platform_created_at_id "
+            "ON download_history (platform, created_at, id)",
+            "CREATE INDEX IF NOT EXISTS ix_download_history_status_created_at_id "
+            "ON download_history (status, created_at, id)",
+        ],
+    ),
+]
+
+# Arbitrary key serialising migrations across app workers starting together
+MIGRATION_LOCK_ID = 7_340_211
+
+PARTITION_MIGRATION_ID = "0005_partition_download_history"
+
+
+def download_history_partitioned(conn) -> bool:
+    """Whether download_history is the partitioned table (or not created yet)."""
+    return conn.execute(
+        text(
+            "SELECT coalesce((SELECT relkind = 'p' FROM pg_class "
+            "WHERE oid = to_regclass('download_history')), true)"
+        )
+    ).scalar_one()
+
+
+def apply_migrations(engine: Engine):
+    """
+    Apply pending schema migrations in order, recording them in schema_migrations.
+    Call this function on application startup, after create_all().
+    """
+    with engine.begin() as conn:
+        conn.execute(
+            text("SELECT pg_advisory_xact_lock(:lock_id)"),
+            {"lock_id": MIGRATION_LOCK_ID},
+        )
+        conn.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "id VARCHAR(100) PRIMARY KEY, "
+                "applied_at TIMESTAMP NOT NULL DEFAULT now())"
+            )
+        )
+        applied = {
+            row[0] for row in conn.execute(text("SELECT id FROM schema_migrations"))
+        }
+
+        for migration_id, statements in MIGRATIONS:
+            if migration_id in applied:
+                continue
+            for statement in statements:
+                conn.execute(text(statement))
+            conn.execute(
+                text("INSERT INTO schema_migrations (id) VALUES (:id)"),
+                {"id": migration_id},
+            )
+            print(f"   Applied migration {migration_id}")
+
+        if not download_history_partitioned(conn):
+            print(
+                "⚠️  download_history is not partitioned; retention and "
+                "partition maintenance are off until "
+                "`python -m src.database.partition_history` is run"
+            )
@@ -0,0 +1,187 @@
+"""
+Convert an unpartitioned download_history into monthly range partitions.
+
+Databases created since partitioning was introduced start partitioned;
+older ones are converted by running this once. It is kept out of app
+startup because the preparation steps scan and index the whole table.
+Those steps run without blocking history writes:
+
+1. A NOT VALID CHECK constraint bounds created_at below the boundary, two
+   months past the newest row, and is then validated. Validation scans
+   the table but lets inserts through.
+2. The (id, created_at) primary key index and indexes matching the model's
+   are built CONCURRENTLY.
+3. One short transaction renames the table to download_history_legacy,
+   swaps its primary key, creates the partitioned download_history and
+   attaches the old table as its partition from MINVALUE to the boundary.
+   The validated constraint spares ATTACH its own scan, and the prebuilt
+   indexes are adopted instead of rebuilt.
+
+Monthly partitions from the boundary on are then created by the regular
+partition maintenance. Safe to run again: it stops at once when the table
+is already partitioned.
+
+Usage:
+    python -m src.database.partition_history
+"""
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+from ..models.download_history import DownloadHistory
+from .database import engine
+from .migrations import PARTITION_MIGRATION_ID, download_history_partitioned
+
+LEGACY_TABLE = "download_history_legacy"
+BOUND_CONSTRAINT = "download_history_legacy_bound"
+PRIMARY_KEY_INDEX = "download_history_id_created_at_key"
+
+
+def record_migration(conn):
+    conn.execute(
+        text("INSERT INTO schema_migrations (id) VALUES (:id) ON CONFLICT DO NOTHING"),
+        {"id": PARTITION_MIGRATION_ID},
+    )
+
+
+def existing_indexes(conn, table: str) -> set:
+    """Names of the valid indexes on a table in the current schema."""
+    rows = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = to_regclass(:table) AND i.indisvalid"
+        ),
+        {"table": table},
+    )
+    return {row[0] for row in rows}
+
+
+def model_index_statements(table: str, suffix: str = "") -> list:
+    """CREATE INDEX statements for the model's indexes on the given table."""
+    statements = []
+    for index in sorted(DownloadHistory.__table__.indexes, key=lambda i: i.name):
+        statement = str(CreateIndex(index).compile(dialect=engine.dialect))
+        statement = statement.replace(
+            f"INDEX {index.name} ON download_history",
+            f"INDEX {index.name}{suffix} ON {table}",
+        )
+        statements.append((index.name, statement))
+    return statements
+
+
+def prepare(boundary) -> None:
+    """Steps 1 and 2: constraint and indexes, none holding a write lock for long."""
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f"ALTER TABLE download_history DROP CONSTRAINT IF EXISTS "
+                f"{BOUND_CONSTRAINT}"
+            )
+        )
+        conn.execute(
+            text(
+                f"ALTER TABLE download_history ADD CONSTRAINT {BOUND_CONSTRAINT} "
+                f"CHECK (created_at < '{boundary.isoformat()}') NOT VALID"
+            )
+        )
+    print("   Validating the created_at bound...")
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"ALTER TABLE download_history VALIDATE CONSTRAINT {BOUND_CONSTRAINT}")
+        )
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        present = existing_indexes(conn, "download_history")
+        statements = [
+            (
+                PRIMARY_KEY_INDEX,
+                PRIMARY_KEY_INDEX,
+                f"CREATE UNIQUE INDEX {PRIMARY_KEY_INDEX} "
+                "ON download_history (id, created_at)",
+            )
+        ] + [
+            (name, f"{name}_legacy", statement)
+            for name, statement in model_index_statements("download_history", "_legacy")
+        ]
+        for name, target, statement in statements:
+            if name in present or target in present:
+                continue
+            print(f"   Building {target}...")
+            # An interrupted concurrent build leaves an invalid index behind
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {target}"))
+            conn.execute(text(statement.replace("INDEX ", "INDEX CONCURRENTLY ", 1)))
+
+
+def swap(boundary) -> None:
+    """Step 3: the short exclusive transaction attaching the old table."""
+    with engine.begin() as conn:
+        conn.execute(text("LOCK TABLE download_history IN ACCESS EXCLUSIVE MODE"))
+        conn.execute(text(f"ALTER TABLE download_history RENAME TO {LEGACY_TABLE}"))
+        conn.execute(
+            text(f"ALTER TABLE {LEGACY_TABLE} DROP CONSTRAINT download_history_pkey")
+        )
+        conn.execute(
+            text(
+                f"ALTER TABLE {LEGACY_TABLE} ADD CONSTRAINT {LEGACY_TABLE}_pkey "
+                f"PRIMARY KEY USING INDEX {PRIMARY_KEY_INDEX}"
+            )
+        )
+        for name in existing_indexes(conn, LEGACY_TABLE):
+            if not name.endswith(("_legacy", "_pkey")):
+                conn.execute(text(f"ALTER INDEX {name} RENAME TO {name}_legacy"))
+
+        conn.execute(
+            text(
+                f"CREATE TABLE download_history (LIKE {LEGACY_TABLE} "
+                "INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)"
+            )
+        )
+        conn.execute(
+            text("ALTER TABLE download_history ADD PRIMARY KEY (id, created_at)")
+        )
+        conn.execute(
+            text("ALTER SEQUENCE download_history_id_seq OWNED BY download_history.id")
+        )
+        for _, statement in model_index_statements("download_history"):
+            conn.execute(text(statement))
+
+        conn.execute(
+            text(
+                f"ALTER TABLE download_history ATTACH PARTITION {LEGACY_TABLE} "
+                f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}')"
+            )
+        )
+        conn.execute(
+            text(f"ALTER TABLE {LEGACY_TABLE} DROP CONSTRAINT {BOUND_CONSTRAINT}")
+        )
+        record_migration(conn)
+
+
+def main():
+    from ..services.history_partitions import run_history_maintenance
+
+    with engine.begin() as conn:
+        if download_history_partitioned(conn):
+            record_migration(conn)
+            print("✅ download_history is already partitioned")
+            return
+        # Past the newest row and far enough ahead that the month cannot
+        # roll over before the swap, as the bound also applies to inserts
+        boundary = conn.execute(
+            text(
+                "SELECT date_trunc('month', greatest(max(created_at), "
+                "now() AT TIME ZONE 'utc')) + interval '2 months' "
+                "FROM download_history"
+            )
+        ).scalar_one()
+
+    print(f"🗂️  Partitioning download_history, legacy rows up to {boundary:%Y-%m-%d}")
+    prepare(boundary)
+    swap(boundary)
+    run_history_maintenance()
+    print("✅ download_history is partitioned")
+
+
+if __name__ == "__main__":
+    main()
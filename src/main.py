@@ -2,11 +2,38 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+from sqlmodel import Session
 import os
 
-from .routes.general import general_router
-from .routes.web import web_router
-from .database.database import create_db_and_tables
+from .routes.general import general_router, get_result_cache_stats
+from .routes.web import web_router, get_dashboard_cache_stats
+from .routes.api import api_router
+from .routes.proxy import proxy_router
+from .database.database import (
+    create_db_and_tables,
+    dispose_engines,
+    engine,
+    get_pool_status,
+)
+from .services.http_client import start_http_client, close_http_client, get_pool_stats
+from .services.media_proxy import get_proxy_stats
+from .services.media_probe import get_probe_stats
+from .services.hls_gateway import get_hls_stats
+from .services.circuit_breaker import get_breaker_stats
+from .services.history_writer import (
+    start_history_writer,
+    stop_history_writer,
+    get_history_writer_stats,
+)
+from .services.history_partitions import (
+    get_history_maintenance_stats,
+    start_history_maintenance,
+    stop_history_maintenance,
+)
+from .services.html_extract import get_parser_info
+from .services.loop_guard import install_blocking_io_guard, get_guard_stats
+from .services.provider_scoreboard import seed_provider_scoreboard
+from .services.scraper_tokens import get_token_cache_stats
 
 
 @asynccontextmanager
@@ -25,10 +52,35 @@ async def lifespan(app: FastAPI):
         print(f"⚠️  Database initialization warning: {e}")
         print("   The app will continue, but database features may not work.")
 
+    # Startup: Rank scrapers from recent history instead of starting cold
+    try:
+        with Session(engine) as session:
+            seeded = seed_provider_scoreboard(session)
+        print(f"🏁 Provider scoreboard seeded from {seeded} recent downloads")
+    except Exception as e:
+        print(f"⚠️  Provider scoreboard not seeded: {e}")
+
+    # Startup: Keep monthly history partitions ahead of time, apply retention
+    await start_history_maintenance()
+
+    # Startup: Write download history in background batches
+    await start_history_writer()
+
+    # Startup: Report synchronous network calls made on the event loop
+    install_blocking_io_guard()
+
+    # Startup: Open the shared outbound HTTP connection pool
+    await start_http_client()
+    print("🌐 Outbound HTTP connection pool ready")
+
     yield
 
     # Shutdown
     print("👋 Shutting down application...")
+    await stop_history_writer()
+    await stop_history_maintenance()
+    await close_http_client()
+    await dispose_engines()
 
 
 app = FastAPI(
@@ -53,6 +105,8 @@ if os.path.exists("static") and os.path.isdir("static"):
 # Include routers
 app.include_router(web_router)  # Web interface routes (must be first for root route)
 app.include_router(general_router)  # API routes
+app.include_router(api_router)  # History API
+app.include_router(proxy_router)  # Media proxy
 
 
 @app.get("/health")
@@ -61,4 +115,20 @@ async def health_check():
     Health check endpoint for Docker and monitoring systems.
     Returns 200 OK if the application is running.
     """
-    return {"status": "healthy", "service": "j-video-downloader"}
+    return {
+        "status": "healthy",
+        "service": "j-video-downloader",
+        "http_pool": get_pool_stats(),
+        "media_proxy": get_proxy_stats(),
+        "media_probe": get_probe_stats(),
+        "hls_gateway": get_hls_stats(),
+        "database_pool": get_pool_status(),
+        "circuit_breakers": get_breaker_stats(),
+        "blocking_io_guard": get_guard_stats(),
+        "result_cache": get_result_cache_stats(),
+        "history_writer": get_history_writer_stats(),
+        "history_partitions": get_history_maintenance_stats(),
+        "dashboard_cache": get_dashboard_cache_stats(),
+        "scraper_tokens": get_token_cache_stats(),
+        "html_parser": get_parser_info(),
+    }
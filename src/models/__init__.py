@@ -1,3 +1,16 @@
 from .download_history import DownloadHistory, DownloadStatus
+from .download_rollup import (
+    DownloadRollupDaily,
+    DownloadRollupHourly,
+    ProviderRollupDaily,
+    ProviderRollupHourly,
+)
 
-__all__ = ["DownloadHistory", "DownloadStatus"]
+__all__ = [
+    "DownloadHistory",
+    "DownloadStatus",
+    "DownloadRollupDaily",
+    "DownloadRollupHourly",
+    "ProviderRollupDaily",
+    "ProviderRollupHourly",
+]
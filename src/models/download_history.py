@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from datetime import datetime, timezone
 from typing import Optional
 from enum import Enum
@@ -9,6 +10,7 @@ class DownloadStatus(str, Enum):
 
     SUCCESS = "success"
     FAILED = "failed"
+    CACHED = "cached"  # Served from the result cache without scraping
 
 
 class DownloadHistory(SQLModel, table=True):
@@ -17,19 +19,44 @@ class DownloadHistory(SQLModel, table=True):
 
     Tracks all download requests with their status, response time,
     and error information if applicable.
+
+    The table is range-partitioned by created_at into monthly partitions
+    (see services/history_partitions.py), so created_at is part of the
+    primary key.
+
+    Indexes follow the query shapes rather than single columns: every read
+    is a created_at range, optionally narrowed by platform or status and
+    ordered by (created_at, id). The columns included in the created_at
+    index let range scans that only read platform, status, provider and
+    response_time (rollup rebuilds, scoreboard seeding) run index-only.
+    benchmarks/history_index_check.py checks the plans.
     """
 
     __tablename__ = "download_history"
+    __table_args__ = (
+        Index(
+            "ix_download_history_created_at_id",
+            "created_at",
+            "id",
+            postgresql_include=["platform", "status", "response_time", "provider"],
+        ),
+        Index(
+            "ix_download_history_platform_created_at_id", "platform", "created_at", "id"
+        ),
+        Index("ix_download_history_status_created_at_id", "status", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id: Optional[int] = Field(default=None, primary_key=True)
-    url: str = Field(index=True, max_length=2048, description="Video URL requested")
+    id: Optional[int] = Field(
+        default=None, primary_key=True, sa_column_kwargs={"autoincrement": True}
+    )
+    url: str = Field(max_length=2048, description="Video URL requested")
     platform: str = Field(
-        index=True,
         max_length=50,
         description="Platform detected (e.g., tiktok, instagram)",
     )
     status: DownloadStatus = Field(
-        index=True, description="Download status: success or failed"
+        description="Download status: success, failed or cached"
     )
     title: Optional[str] = Field(
         default=None, max_length=500, description="Video title if download succeeded"
@@ -39,12 +66,17 @@ class DownloadHistory(SQLModel, table=True):
     )
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
-        index=True,
+        primary_key=True,
         description="Timestamp when download was requested",
     )
     response_time: Optional[float] = Field(
         default=None, description="Processing time in seconds"
     )
+    provider: Optional[str] = Field(
+        default=None,
+        max_length=50,
+        description="Upstream scraper that produced the result (e.g., ssstik)",
+    )
 
     class Config:
         json_schema_extra = {
@@ -55,5 +87,6 @@ class DownloadHistory(SQLModel, table=True):
                 "title": "Amazing TikTok Video",
                 "error_message": None,
                 "response_time": 2.34,
+                "provider": "ssstik",
             }
         }
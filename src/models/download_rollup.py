@@ -0,0 +1,86 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+from typing import Dict
+
+from .download_history import DownloadStatus
+
+
+def sketch_field():
+    return Field(
+        default_factory=dict,
+        sa_type=JSONB,
+        sa_column_kwargs={"server_default": text("'{}'::jsonb")},
+        description="Response-time sketch: bucket index -> count "
+        "(see services/latency_sketch.py)",
+    )
+
+
+class DownloadRollupBase(SQLModel):
+    """
+    Download counts for one platform and status within one time bucket.
+
+    Maintained incrementally by the history writer, so dashboard queries
+    sum a few rollup rows instead of scanning download_history.
+    """
+
+    bucket: datetime = Field(
+        primary_key=True, description="Bucket start (naive UTC, truncated)"
+    )
+    platform: str = Field(primary_key=True, max_length=50)
+    status: DownloadStatus = Field(primary_key=True)
+    count: int = Field(default=0, description="Downloads in the bucket")
+    response_time_sum: float = Field(
+        default=0.0, description="Sum of recorded response times in seconds"
+    )
+    response_time_count: int = Field(
+        default=0, description="Downloads with a recorded response time"
+    )
+    response_time_sketch: Dict[str, int] = sketch_field()
+
+
+class DownloadRollupHourly(DownloadRollupBase, table=True):
+    """Hourly download rollup"""
+
+    __tablename__ = "download_rollup_hourly"
+
+
+class DownloadRollupDaily(DownloadRollupBase, table=True):
+    """Daily download rollup"""
+
+    __tablename__ = "download_rollup_daily"
+
+
+class ProviderRollupBase(SQLModel):
+    """
+    Scrapes served by one upstream provider of a platform within one time bucket.
+
+    Only rows with a provider (successful scrapes) are counted.
+    """
+
+    bucket: datetime = Field(
+        primary_key=True, description="Bucket start (naive UTC, truncated)"
+    )
+    platform: str = Field(primary_key=True, max_length=50)
+    provider: str = Field(primary_key=True, max_length=50)
+    count: int = Field(default=0, description="Scrapes in the bucket")
+    response_time_sum: float = Field(
+        default=0.0, description="Sum of recorded response times in seconds"
+    )
+    response_time_count: int = Field(
+        default=0, description="Scrapes with a recorded response time"
+    )
+    response_time_sketch: Dict[str, int] = sketch_field()
+
+
+class ProviderRollupHourly(ProviderRollupBase, table=True):
+    """Hourly provider rollup"""
+
+    __tablename__ = "provider_rollup_hourly"
+
+
+class ProviderRollupDaily(ProviderRollupBase, table=True):
+    """Daily provider rollup"""
+
+    __tablename__ = "provider_rollup_daily"
@@ -0,0 +1,265 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import JSONResponse, StreamingResponse
+import base64
+import binascii
+import csv
+import io
+import json
+import os
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+from sqlalchemy import tuple_
+from sqlmodel import Session, select
+
+from ..auth.auth import verify_api_key
+from ..database.database import run_with_session
+from ..models.download_history import DownloadHistory, DownloadStatus
+
+api_router = APIRouter(
+    prefix="/api",
+    tags=["History"],
+)
+
+# Largest page /api/history returns
+HISTORY_PAGE_MAX = int(os.getenv("HISTORY_PAGE_MAX", "1000"))
+
+# Rows fetched per query while streaming an export; only one batch is held
+# in memory at a time
+HISTORY_EXPORT_BATCH_SIZE = int(os.getenv("HISTORY_EXPORT_BATCH_SIZE", "5000"))
+
+HISTORY_COLUMNS = (
+    DownloadHistory.id,
+    DownloadHistory.created_at,
+    DownloadHistory.platform,
+    DownloadHistory.status,
+    DownloadHistory.url,
+    DownloadHistory.title,
+    DownloadHistory.error_message,
+    DownloadHistory.response_time,
+    DownloadHistory.provider,
+)
+HISTORY_FIELDS = [column.key for column in HISTORY_COLUMNS]
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def to_naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """History timestamps are stored as naive UTC; convert aware filters to match."""
+    if moment is not None and moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque cursor pointing just past the row (created_at, id)."""
+    raw = f"{created_at.isoformat()},{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Parse a cursor from encode_cursor().
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit(",", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def fetch_history_page(
+    session: Session,
+    filters: dict,
+    after: Optional[tuple[datetime, int]],
+    limit: int,
+) -> list:
+    """
+    Fetch one page of history rows, newest first.
+
+    Rows are ordered by (created_at, id) descending and the page starts
+    strictly after the `after` key, so each page is an index range scan
+    however deep into the history it is, and rows written meanwhile never
+    shift the pages that follow.
+
+    Args:
+        session: Database session
+        filters: platform, status, start (inclusive) and end (exclusive);
+            None values are ignored
+        after: (created_at, id) of the last row of the previous page
+        limit: Maximum number of rows
+
+    Returns:
+        List of rows with the HISTORY_FIELDS columns
+    """
+    statement = select(*HISTORY_COLUMNS)
+    if filters.get("platform"):
+        statement = statement.where(DownloadHistory.platform == filters["platform"])
+    if filters.get("status"):
+        statement = statement.where(DownloadHistory.status == filters["status"])
+    if filters.get("start"):
+        statement = statement.where(DownloadHistory.created_at >= filters["start"])
+    if filters.get("end"):
+        statement = statement.where(DownloadHistory.created_at < filters["end"])
+    if after is not None:
+        statement = statement.where(
+            tuple_(DownloadHistory.created_at, DownloadHistory.id) < tuple_(*after)
+        )
+
+    statement = statement.order_by(
+        DownloadHistory.created_at.desc(), DownloadHistory.id.desc()
+    ).limit(limit)
+    return session.exec(statement).all()
+
+
+def serialize_history_row(row) -> dict:
+    record = dict(zip(HISTORY_FIELDS, row))
+    record["created_at"] = record["created_at"].isoformat()
+    record["status"] = record["status"].value
+    return record
+
+
+def history_filters(
+    platform: Optional[str],
+    status: Optional[DownloadStatus],
+    start: Optional[datetime],
+    end: Optional[datetime],
+) -> dict:
+    return {
+        "platform": platform.lower() if platform else None,
+        "status": status,
+        "start": to_naive_utc(start),
+        "end": to_naive_utc(end),
+    }
+
+
+async def iter_history_export(filters: dict, export_format: str) -> AsyncIterator[str]:
+    """
+    Stream every matching history row as NDJSON lines or CSV.
+
+    The rows are read in keyset-paginated batches of HISTORY_EXPORT_BATCH_SIZE,
+    each in its own short session, so neither memory nor a database
+    connection is held for the length of the download.
+    """
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(HISTORY_FIELDS)
+        yield buffer.getvalue()
+
+    after = None
+    while True:
+        rows = await run_with_session(
+            fetch_history_page, filters, after, HISTORY_EXPORT_BATCH_SIZE
+        )
+        if not rows:
+            return
+
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow(serialize_history_row(row).values())
+            yield buffer.getvalue()
+        else:
+            yield "".join(json.dumps(serialize_history_row(row)) + "\n" for row in rows)
+
+        if len(rows) < HISTORY_EXPORT_BATCH_SIZE:
+            return
+        after = (rows[-1].created_at, rows[-1].id)
+
+
+@api_router.get("/history")
+async def list_history(
+    platform: Optional[str] = None,
+    status: Optional[DownloadStatus] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    api_key: str = Depends(verify_api_key),
+):
+    """
+    Page through download history, newest first.
+
+    Args:
+        platform (Optional[str]): Only this platform (e.g. tiktok)
+        status (Optional[DownloadStatus]): Only this status
+        start (Optional[datetime]): Created at or after (UTC if no offset)
+        end (Optional[datetime]): Created before (UTC if no offset)
+        limit (int): Page size, up to HISTORY_PAGE_MAX
+        cursor (Optional[str]): next_cursor from the previous page
+        api_key (str): API key for authentication
+
+    Returns:
+        JSONResponse: items, plus next_cursor (null on the last page)
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    limit = max(1, min(limit, HISTORY_PAGE_MAX))
+    filters = history_filters(platform, status, start, end)
+    after = decode_cursor(cursor) if cursor else None
+
+    # One extra row tells whether another page follows
+    rows = await run_with_session(fetch_history_page, filters, after, limit + 1)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return JSONResponse(
+        content={
+            "items": [serialize_history_row(row) for row in rows],
+            "next_cursor": next_cursor,
+            "limit": limit,
+        },
+        status_code=200,
+    )
+
+
+@api_router.get("/history/export")
+async def export_history(
+    format: str = "ndjson",
+    platform: Optional[str] = None,
+    status: Optional[DownloadStatus] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    api_key: str = Depends(verify_api_key),
+):
+    """
+    Stream all matching download history as NDJSON or CSV, newest first.
+
+    Args:
+        format (str): "ndjson" or "csv"
+        platform (Optional[str]): Only this platform (e.g. tiktok)
+        status (Optional[DownloadStatus]): Only this status
+        start (Optional[datetime]): Created at or after (UTC if no offset)
+        end (Optional[datetime]): Created before (UTC if no offset)
+        api_key (str): API key for authentication
+
+    Returns:
+        StreamingResponse: The export as an attachment
+
+    Raises:
+        HTTPException: If the format is not supported
+    """
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format: {format}. Use ndjson or csv",
+        )
+    filters = history_filters(platform, status, start, end)
+    return StreamingResponse(
+        iter_history_export(filters, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="download_history.{format}"'
+        },
+    )
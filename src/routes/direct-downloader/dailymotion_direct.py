@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse
 import requests
 import re
 from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ..proxy import hls_playlist_response
 import json
 
 dailymotion_router_direct = APIRouter(
@@ -177,32 +178,10 @@ async def download_dailymotion(url: str, api_key: str = Depends(verify_api_key))
 @dailymotion_router_direct.get("/dailymotion/stream/")
 async def proxy_stream(m3u8_url: str):
     """
-    Simple proxy - forwards m3u8 content exactly as received from Dailymotion
+    Serve the m3u8 through the HLS gateway, so its variants and segments
+    are proxied and cached too
     """
     if not m3u8_url:
         raise HTTPException(status_code=400, detail="m3u8_url parameter is required")
 
-    try:
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-            "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        }
-        # Fetch the m3u8 exactly as Dailymotion serves it
-        response = requests.get(m3u8_url, headers=headers, timeout=30)
-        response.raise_for_status()
-
-        # Forward EXACTLY as received - no processing!
-        return Response(
-            content=response.content,
-            media_type=response.headers.get(
-                "content-type", "application/vnd.apple.mpegurl"
-            ),
-            headers={
-                "Access-Control-Allow-Origin": "*",
-                "Cache-Control": "public, max-age=300",  # Optional caching
-            },
-        )
-
-    except requests.RequestException as e:
-        raise HTTPException(status_code=502, detail=f"Failed to fetch stream: {str(e)}")
+    return await hls_playlist_response(m3u8_url)
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import requests
-from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ...services.scraper_tokens import fetch_aio_dl
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 
 bilibili_router = APIRouter(
     prefix="/download",
@@ -10,51 +10,20 @@ bilibili_router = APIRouter(
 )
 
 
-async def download_bilibili_core(url: str):
-    """
-    Core Bilibili download logic without FastAPI dependencies.
-    Can be used as part of another API or service.
-
-    Args:
-        url (str): Bilibili video URL
-
-    Returns:
-        dict: Dictionary containing title, thumbnail, and videos array
-
-    Raises:
-        HTTPException: If download fails
-    """
+async def fetch_bilibili_vidburner(url: str):
     try:
         headers = {
             "Content-Type": "application/x-www-form-urlencoded",
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         }
 
-        session = requests.Session()
-
-        init_response = session.get(
-            "https://vidburner.com/bilibili-video-downloader/", headers=headers
-        )
-
-        init_data = init_response.text
-
-        soup = BeautifulSoup(init_data, "html.parser")
-
-        token = soup.find("input", {"name": "token"})["value"]
-        # print(token, "token")
-        payload = {
-            "url": url,
-            "token": token,
-            "hash": "aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
-        }
-
-        response = session.post(
+        data = await fetch_aio_dl(
+            "https://vidburner.com/bilibili-video-downloader/",
             "https://vidburner.com/wp-json/aio-dl/video-data/",
-            data=payload,
-            headers=headers,
+            url,
+            headers,
+            form_hash="aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
         )
-
-        data = response.json()
         # print(data, "data")
         title = data["title"]
         thumbnail = data["thumbnail"]
@@ -67,6 +36,38 @@ async def download_bilibili_core(url: str):
 
         return {"title": title, "thumbnail": thumbnail, "videos": urls}
 
+    except Exception as e:
+        raise Exception(f"vidburner.com method failed: {str(e)}")
+
+
+# Providers raced for each request, in priority order
+BILIBILI_PROVIDERS = [
+    Provider("vidburner", fetch_bilibili_vidburner),
+]
+
+
+async def download_bilibili_core(url: str):
+    """
+    Core Bilibili download logic without FastAPI dependencies.
+    Can be used as part of another API or service.
+
+    Args:
+        url (str): Bilibili video URL
+
+    Returns:
+        dict: Dictionary containing title, thumbnail, and videos array
+
+    Raises:
+        HTTPException: If download fails
+    """
+    try:
+        return await race_providers("bilibili", url, BILIBILI_PROVIDERS)
+    except AllProvidersFailed as e:
+        raise HTTPException(
+            status_code=500, detail=f"Bilibili download error: {str(e)}"
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Bilibili download error: {str(e)}"
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ...services.http_client import http_session
+from ...services.scraper_tokens import fetch_aio_dl
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 
 bitchute_router = APIRouter(
     prefix="/download",
@@ -19,7 +19,7 @@ async def fetch_bitchute_toolsed(url: str):
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
+        async with http_session() as session:
             async with session.get(api_url, headers=headers) as resp:
                 data = await resp.json()
 
@@ -45,28 +45,13 @@ async def fetch_bitchute_vidburner(url: str):
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            # Step 1: Get token
-            async with session.get(
-                "https://vidburner.com/bitchute-video-downloader/", headers=headers
-            ) as resp:
-                html = await resp.text()
-                soup = BeautifulSoup(html, "html.parser")
-                token = soup.find("input", {"name": "token"})["value"]
-
-            # Replace hardcoded URL with input URL
-            payload = {
-                "url": url,
-                "token": token,
-                "hash": "aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
-            }
-
-            async with session.post(
-                "https://vidburner.com/wp-json/aio-dl/video-data/",
-                data=payload,
-                headers=headers,
-            ) as resp:
-                data = await resp.json()
+        data = await fetch_aio_dl(
+            "https://vidburner.com/bitchute-video-downloader/",
+            "https://vidburner.com/wp-json/aio-dl/video-data/",
+            url,
+            headers,
+            form_hash="aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
+        )
 
         urls = [
             {"quality": "1080p", "url": item["url"], "filesize": "null"}
@@ -79,6 +64,13 @@ async def fetch_bitchute_vidburner(url: str):
         raise Exception(f"vidburner.com method failed: {str(e)}")
 
 
+# Providers raced for each request, in priority order
+BITCHUTE_PROVIDERS = [
+    Provider("toolsed", fetch_bitchute_toolsed),
+    Provider("vidburner", fetch_bitchute_vidburner),
+]
+
+
 async def download_bitchute_core(url: str):
     """
     Core BitChute download logic without FastAPI dependencies.
@@ -94,28 +86,11 @@ async def download_bitchute_core(url: str):
         HTTPException: If download fails
     """
     try:
-        task1 = asyncio.create_task(fetch_bitchute_toolsed(url))
-        task2 = asyncio.create_task(fetch_bitchute_vidburner(url))
-
-        done, pending = await asyncio.wait(
-            [task1, task2], return_when=asyncio.FIRST_COMPLETED
-        )
-
-        # Cancel pending tasks
-        for task in pending:
-            task.cancel()
-
-        # Get result from completed task
-        for completed in done:
-            result = completed.result()
-            if result:
-                return result
-
-        # If no task completed successfully
+        return await race_providers("bitchute", url, BITCHUTE_PROVIDERS)
+    except AllProvidersFailed as e:
         raise HTTPException(
-            status_code=500, detail="Both BitChute download methods failed"
+            status_code=500, detail=f"Both BitChute download methods failed: {str(e)}"
         )
-
     except HTTPException:
         raise
     except Exception as e:
@@ -1,9 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import asyncio
-import requests
-from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ...services.scraper_tokens import fetch_aio_dl
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 from typing import Dict
 
 buzzfeed_router = APIRouter(
@@ -12,29 +11,18 @@ buzzfeed_router = APIRouter(
 )
 
 
-def fetch_steptodown(url: str) -> Dict:
+async def fetch_steptodown(url: str) -> Dict:
     headers = {
         "Content-Type": "application/x-www-form-urlencoded",
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     }
-    session = requests.Session()
-    init_response = session.get(
-        "https://steptodown.com/buzzfeed-video-downloader/", headers=headers
-    )
-    soup = BeautifulSoup(init_response.text, "html.parser")
-    token = soup.find("input", {"name": "token"})["value"]
-
-    payload = {
-        "url": url,
-        "token": token,
-    }
-    response = session.post(
+    data = await fetch_aio_dl(
+        "https://steptodown.com/buzzfeed-video-downloader/",
         "https://steptodown.com/wp-json/aio-dl/video-data/",
-        data=payload,
-        headers=headers,
+        url,
+        headers,
     )
-    data = response.json()
     # print(data, "data from steptodown")
     title = data["title"]
     thumbnail = data["thumbnail"]
@@ -49,30 +37,19 @@ def fetch_steptodown(url: str) -> Dict:
     return {"title": title, "thumbnail": thumbnail, "videos": urls}
 
 
-def fetch_vidburner(url: str) -> Dict:
+async def fetch_vidburner(url: str) -> Dict:
     headers = {
         "Content-Type": "application/x-www-form-urlencoded",
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     }
-    session = requests.Session()
-    init_response = session.get(
-        "https://vidburner.com/buzzfeed-video-downloader/", headers=headers
-    )
-    soup = BeautifulSoup(init_response.text, "html.parser")
-    token = soup.find("input", {"name": "token"})["value"]
-
-    payload = {
-        "url": url,
-        "token": token,
-        "hash": "aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
-    }
-    response = session.post(
+    data = await fetch_aio_dl(
+        "https://vidburner.com/buzzfeed-video-downloader/",
         "https://vidburner.com/wp-json/aio-dl/video-data/",
-        data=payload,
-        headers=headers,
+        url,
+        headers,
+        form_hash="aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
     )
-    data = response.json()
     # print(data, "data from vidburner")
     title = data["title"]
     thumbnail = data["thumbnail"]
@@ -86,6 +63,13 @@ def fetch_vidburner(url: str) -> Dict:
     return {"title": title, "thumbnail": thumbnail, "videos": urls}
 
 
+# Providers raced for each request, in priority order
+BUZZFEED_PROVIDERS = [
+    Provider("steptodown", fetch_steptodown),
+    Provider("vidburner", fetch_vidburner),
+]
+
+
 async def download_buzzfeed_core(url: str):
     """
     Core Buzzfeed download logic without FastAPI dependencies.
@@ -101,53 +85,11 @@ async def download_buzzfeed_core(url: str):
         HTTPException: If download fails
     """
     try:
-        loop = asyncio.get_event_loop()
-        # Run both in thread pool executor concurrently
-        task_steptodown = loop.run_in_executor(None, fetch_steptodown, url)
-        task_vidburner = loop.run_in_executor(None, fetch_vidburner, url)
-
-        done, pending = await asyncio.wait(
-            [task_steptodown, task_vidburner], return_when=asyncio.FIRST_COMPLETED
+        return await race_providers("buzzfeed", url, BUZZFEED_PROVIDERS)
+    except AllProvidersFailed as e:
+        raise HTTPException(
+            status_code=500, detail=f"Buzzfeed download failed: {str(e)}"
         )
-
-        # Try to get a successful result from the first completed task
-        first_result = None
-        first_error = None
-        for task in done:
-            try:
-                result = task.result()
-                if result and isinstance(result, dict) and result.get("videos"):
-                    first_result = result
-                    break
-            except Exception as e:
-                first_error = e
-
-        # If first completed task failed or returned error, wait for the other(s)
-        if not first_result:
-            if pending:
-                # Wait for the remaining tasks
-                more_done, _ = await asyncio.wait(pending)
-                for task in more_done:
-                    try:
-                        result = task.result()
-                        if result and isinstance(result, dict) and result.get("videos"):
-                            first_result = result
-                            break
-                    except Exception as e:
-                        first_error = e
-
-        # Cancel any remaining tasks
-        for task in pending:
-            task.cancel()
-
-        if first_result:
-            return first_result
-        else:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Buzzfeed download failed: {str(first_error) if first_error else 'Unknown error'}",
-            )
-
     except HTTPException:
         raise
     except Exception as e:
@@ -1,11 +1,21 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import requests
-import time
+import asyncio
 
 from ...auth.auth import verify_api_key
-from bs4 import BeautifulSoup
+from ...services.http_client import http_session
+from ...services.jobs import Job, JobRegistry
+from ...services.scraper_tokens import fetch_on4t
+from ...services.provider_race import (
+    Provider,
+    AllProvidersFailed,
+    has_video_links,
+    race_providers,
+)
 from datetime import datetime
+from typing import Optional
+import json
+import os
 
 
 dailymotion_router = APIRouter(
@@ -14,15 +24,115 @@ dailymotion_router = APIRouter(
 )
 
 
+# Background conversion jobs for the ssvid.net fallback, keyed by "k" value
+ssvid_jobs = JobRegistry("ssvid-conversion")
+
+# How long a request waits inline for a conversion before returning a job handle
+SSVID_INLINE_WAIT = float(os.getenv("SSVID_INLINE_WAIT", "20"))
+SSVID_MAX_POLLS = 10
+
+
+async def post_ssvid_convert(payload: dict) -> Optional[dict]:
+    """
+    POST to the ssvid.net convert endpoint.
+
+    Returns:
+        Optional[dict]: Parsed JSON, or None if the response was not JSON
+    """
+    async with http_session() as session:
+        async with session.post(
+            "https://ssvid.net/api/ajax/convert",
+            data=payload,
+        ) as resp:
+            raw = await resp.text()
+    try:
+        return json.loads(raw)
+    except Exception:
+        return None
+
+
+def clamp_backoff(value, default: int = 5) -> int:
+    if not isinstance(value, (int, float)):
+        value = default
+    return max(1, min(int(value), 15))
+
+
+async def run_ssvid_conversion(job: Job, k_value: str, title, thumbnail) -> dict:
+    """
+    Submit a conversion to ssvid.net and poll it until a download link exists.
+
+    Runs as a background job: sleeping between polls never blocks the event
+    loop, and every caller asking for the same k value awaits this one task.
+    """
+
+    def converted(dlink):
+        return {
+            "title": title,
+            "thumbnail": thumbnail,
+            "videos": [
+                {
+                    "quality": "1080p",
+                    "url": dlink,
+                    "filesize": "null",
+                }
+            ],
+        }
+
+    convert_json = await post_ssvid_convert({"k": k_value})
+    if convert_json is None:
+        raise Exception("Invalid JSON from ssvid.net convert")
+
+    # If already converted (small files), return immediately
+    if convert_json.get("c_status") == "CONVERTED" or convert_json.get("dlink"):
+        return converted(convert_json.get("dlink"))
+
+    if convert_json.get("c_status") != "CONVERTING":
+        # Default: return whatever we received
+        return converted(convert_json.get("dlink"))
+
+    b_id = convert_json.get("b_id")
+    if not b_id:
+        # Cannot proceed without the server's poll identifier
+        raise Exception("ssvid.net conversion started without a b_id")
+
+    backoff_seconds = clamp_backoff(convert_json.get("e_time", 5))
+    job.progress = {"b_id": b_id, "attempt": 0, "eta_seconds": backoff_seconds}
+
+    for attempt in range(1, SSVID_MAX_POLLS + 1):
+        await asyncio.sleep(backoff_seconds)
+        job.progress["attempt"] = attempt
+
+        # Try both common param keys for the poll identifier
+        for payload in ({"b_id": b_id}, {"bid": b_id}):
+            resp_json = await post_ssvid_convert(payload)
+            if resp_json is None:
+                continue
+
+            if resp_json.get("c_status") == "CONVERTED" or resp_json.get("dlink"):
+                return converted(resp_json.get("dlink"))
+            if resp_json.get("c_status") == "CONVERTING":
+                # Update delay and b_id if provided
+                if isinstance(resp_json.get("e_time"), (int, float)):
+                    backoff_seconds = clamp_backoff(resp_json.get("e_time"))
+                    job.progress["eta_seconds"] = backoff_seconds
+                if resp_json.get("b_id"):
+                    b_id = resp_json.get("b_id")
+                    job.progress["b_id"] = b_id
+                break
+
+    raise Exception("Conversion still in progress after polling")
+
+
 async def download_dailymotion_fallback(
     url: str,
 ):
     try:
-        response = requests.post(
-            "https://ssvid.net/api/ajax/search?hl=en",
-            data={"query": url, "cftoken": "", "vt": "dailymotion"},
-        )
-        data = response.json()
+        async with http_session() as session:
+            async with session.post(
+                "https://ssvid.net/api/ajax/search?hl=en",
+                data={"query": url, "cftoken": "", "vt": "dailymotion"},
+            ) as response:
+                data = await response.json(content_type=None)
 
         # Expecting structure with data.links.video -> { resolution: { k: "..." } }
         links = data.get("data", {}).get("links", {}).get("video", {})
@@ -82,153 +192,39 @@ async def download_dailymotion_fallback(
 
         k_value = links[selected_key]["k"]
 
-        # Call convert endpoint with form-data payload containing key "k"
-        convert_response = requests.post(
-            "https://ssvid.net/api/ajax/convert",
-            data={"k": k_value},
+        # Conversion runs in the background; identical keys share one job
+        job = ssvid_jobs.submit(
+            k_value,
+            lambda job: run_ssvid_conversion(job, k_value, title, thumbnail),
         )
 
-        # Parse first convert attempt
         try:
-            convert_json = convert_response.json()
-        except Exception:
-            return {
-                "status": "error",
-                "message": "Invalid JSON from convert",
-                "raw": convert_response.text,
-            }
-
-        # If already converted (small files), return immediately
-        if convert_json.get("c_status") == "CONVERTED" or convert_json.get("dlink"):
+            return await job.wait(timeout=SSVID_INLINE_WAIT)
+        except asyncio.TimeoutError:
+            # Still converting: hand back a job handle the client can poll
             return {
                 "title": title,
                 "thumbnail": thumbnail,
-                "videos": [
-                    {
-                        "quality": "1080p",
-                        "url": convert_json.get("dlink"),
-                        "filesize": "null",
-                    }
-                ],
+                "videos": [],
+                "job": job.to_dict(),
+                "poll_url": f"/download/jobs/{job.id}",
             }
-
-        # If converting, poll until converted or timeout
-        if convert_json.get("c_status") == "CONVERTING":
-            backoff_seconds = convert_json.get("e_time", 5)
-            if not isinstance(backoff_seconds, (int, float)):
-                backoff_seconds = 5
-            backoff_seconds = max(1, min(int(backoff_seconds), 15))
-
-            b_id = convert_json.get("b_id")
-            if not b_id:
-                # Cannot proceed with server's required poll identifier
-                return convert_json
-            # Poll up to a reasonable number of attempts
-            max_attempts = 10
-            for _ in range(max_attempts):
-                time.sleep(backoff_seconds)
-
-                # Prefer sending b_id if provided; try both common param keys for robustness
-                payload_candidates = []
-                if b_id:
-                    payload_candidates.append({"b_id": b_id})
-                    payload_candidates.append({"bid": b_id})
-
-                for payload in payload_candidates:
-                    resp = requests.post(
-                        "https://ssvid.net/api/ajax/convert",
-                        data=payload,
-                    )
-                    try:
-                        resp_json = resp.json()
-                    except Exception:
-                        continue
-
-                    if resp_json.get("c_status") == "CONVERTED" or resp_json.get(
-                        "dlink"
-                    ):
-                        return {
-                            "title": title,
-                            "thumbnail": thumbnail,
-                            "videos": [
-                                {
-                                    "quality": "1080p",
-                                    "url": resp_json.get("dlink"),
-                                    "filesize": "null",
-                                }
-                            ],
-                        }
-                    if resp_json.get("c_status") == "CONVERTING":
-                        # Update delay and b_id if provided
-                        if isinstance(resp_json.get("e_time"), (int, float)):
-                            backoff_seconds = max(
-                                1, min(int(resp_json.get("e_time")), 15)
-                            )
-                        if resp_json.get("b_id"):
-                            b_id = resp_json.get("b_id")
-                        # Continue outer loop to sleep again
-                        break
-                else:
-                    # None of the payloads returned valid JSON; keep looping using last delay
-                    continue
-
-            # Fallback if not converted after attempts
-            raise HTTPException(
-                status_code=500, detail="Conversion still in progress after polling"
-            )
-
-        # Default: return whatever we received
-        return {
-            "title": title,
-            "thumbnail": thumbnail,
-            "videos": [
-                {
-                    "quality": "1080p",
-                    "url": convert_json.get("dlink"),
-                    "filesize": "null",
-                }
-            ],
-        }
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=e)
-
-
-async def download_dailymotion_core(url: str):
-    """
-    Core dailymotion download logic without FastAPI dependencies.
-    Can be used as part of another API or service.
+        raise HTTPException(status_code=500, detail=str(e))
 
-    Args:
-        url (str): Dailymotion video URL
 
-    Returns:
-        dict: Dictionary containing title, thumbnail, and videos array
-
-    Raises:
-        HTTPException: If download fails
-    """
+async def fetch_dailymotion_on4t(url: str):
     try:
         headers = {
             "Content-Type": "application/x-www-form-urlencoded",
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         }
 
-        session = requests.Session()
-
-        init_response = session.get(
-            "https://on4t.com/dailymotion-video-downloader", headers=headers
+        data = await fetch_on4t(
+            "https://on4t.com/dailymotion-video-downloader", url, headers
         )
-        init_data = init_response.text
-
-        soup = BeautifulSoup(init_data, "html.parser")
-        token = soup.find("meta", {"name": "csrf-token"})["content"]
-
-        payload = {"_token": token, "link[]": url}
-
-        response = session.post(
-            "https://on4t.com/all-video-download", data=payload, headers=headers
-        )
-        data = response.json()
         title = data["result"][0].get("title", "").strip()
         if not title:
             current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -239,7 +235,7 @@ async def download_dailymotion_core(url: str):
         # Handle missing video URL
         video_url = data["result"][0].get("video_file_url", "")
         if not video_url:
-            return await download_dailymotion_fallback(url)
+            raise Exception("on4t.com returned no video URL")
 
         return {
             "title": title,
@@ -252,6 +248,46 @@ async def download_dailymotion_core(url: str):
                 }
             ],
         }
+    except Exception as e:
+        raise Exception(f"on4t.com method failed: {str(e)}")
+
+
+def is_dailymotion_result(result) -> bool:
+    # A pending ssvid.net conversion is a usable answer: the client polls the job
+    return has_video_links(result) or (isinstance(result, dict) and "job" in result)
+
+
+# on4t answers quickly when it works; ssvid.net is hedged in when it stalls
+DAILYMOTION_PROVIDERS = [
+    Provider("on4t", fetch_dailymotion_on4t),
+    Provider("ssvid", download_dailymotion_fallback, hedge_delay=5.0),
+]
+
+
+async def download_dailymotion_core(url: str):
+    """
+    Core dailymotion download logic without FastAPI dependencies.
+    Can be used as part of another API or service.
+
+    Args:
+        url (str): Dailymotion video URL
+
+    Returns:
+        dict: Dictionary containing title, thumbnail, and videos array
+
+    Raises:
+        HTTPException: If download fails
+    """
+    try:
+        return await race_providers(
+            "dailymotion", url, DAILYMOTION_PROVIDERS, is_valid=is_dailymotion_result
+        )
+    except AllProvidersFailed as e:
+        raise HTTPException(
+            status_code=500, detail=f"Dailymotion download error: {str(e)}"
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=e)
 
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ...services.http_client import http_session
+from ...services.scraper_tokens import fetch_aio_dl
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 
 douyin_router = APIRouter(
     prefix="/download",
@@ -19,7 +19,7 @@ async def fetch_douyin_savedouyin(url: str):
     payload = {"url": url}
 
     try:
-        async with aiohttp.ClientSession() as session:
+        async with http_session() as session:
             async with session.post(
                 "https://savedouyin.net/proxy.php", data=payload, headers=headers
             ) as resp:
@@ -56,43 +56,36 @@ async def fetch_douyin_vidburner(url: str):
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            # Get token
-            async with session.get(
-                "https://vidburner.com/douyin-video-downloader/", headers=headers
-            ) as resp:
-                html = await resp.text()
-                soup = BeautifulSoup(html, "html.parser")
-                token = soup.find("input", {"name": "token"})["value"]
-
-            payload = {
-                "url": url,
-                "token": token,
-                "hash": "aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
-            }
-
-            async with session.post(
-                "https://vidburner.com/wp-json/aio-dl/video-data/",
-                data=payload,
-                headers=headers,
-            ) as resp:
-                data = await resp.json()
+        data = await fetch_aio_dl(
+            "https://vidburner.com/douyin-video-downloader/",
+            "https://vidburner.com/wp-json/aio-dl/video-data/",
+            url,
+            headers,
+            form_hash="aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
+        )
 
-            urls = [
-                {"quality": "1080p", "url": item["url"], "filesize": "null"}
-                for item in data["medias"]
-                if item.get("extension") == "mp4"
-            ]
-
-            return {
-                "title": data.get("title", ""),
-                "thumbnail": data.get("thumbnail", ""),
-                "videos": urls,
-            }
+        urls = [
+            {"quality": "1080p", "url": item["url"], "filesize": "null"}
+            for item in data["medias"]
+            if item.get("extension") == "mp4"
+        ]
+
+        return {
+            "title": data.get("title", ""),
+            "thumbnail": data.get("thumbnail", ""),
+            "videos": urls,
+        }
     except Exception as e:
         raise Exception(f"vidburner.com method failed: {str(e)}")
 
 
+# Providers raced for each request, in priority order
+DOUYIN_PROVIDERS = [
+    Provider("savedouyin", fetch_douyin_savedouyin),
+    Provider("vidburner", fetch_douyin_vidburner),
+]
+
+
 async def download_douyin_core(url: str):
     """
     Core Douyin download logic without FastAPI dependencies.
@@ -108,28 +101,11 @@ async def download_douyin_core(url: str):
         HTTPException: If download fails
     """
     try:
-        task1 = asyncio.create_task(fetch_douyin_savedouyin(url))
-        task2 = asyncio.create_task(fetch_douyin_vidburner(url))
-
-        done, pending = await asyncio.wait(
-            [task1, task2], return_when=asyncio.FIRST_COMPLETED
-        )
-
-        # Cancel pending tasks
-        for task in pending:
-            task.cancel()
-
-        # Get result from completed task
-        for completed in done:
-            result = completed.result()
-            if result:
-                return result
-
-        # If no task completed successfully
+        return await race_providers("douyin", url, DOUYIN_PROVIDERS)
+    except AllProvidersFailed as e:
         raise HTTPException(
-            status_code=500, detail="Both Douyin download methods failed"
+            status_code=500, detail=f"Both Douyin download methods failed: {str(e)}"
         )
-
     except HTTPException:
         raise
     except Exception as e:
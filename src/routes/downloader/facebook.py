@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import requests
-from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ...services.http_client import http_session
+from ...services.html_extract import parse_html
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 
 facebook_router = APIRouter(
     prefix="/download",
@@ -17,34 +18,36 @@ async def fetch_from_getsave(url: str):
     }
     # print(url, "url from getsave")
     try:
-        resp = requests.post(
-            "https://getsave.net/proxy.php",
-            data={"url": url},
-            headers=headers,
-            timeout=30,
-        )
-        data = resp.json()
-        # print(data, "data from getsave")
-        title = data["api"]["title"]
-        thumbnail_url = data["api"]["mediaItems"][0].get("mediaThumbnail")
-
-        videos = []
-        for item in data["api"]["mediaItems"]:
-            if item.get("type") == "Video":
-                try:
-                    quality = item.get("mediaQuality")
-                    file_size = item.get("mediaFileSize")
-                    file_resp = requests.get(item.get("mediaUrl"), headers=headers)
-                    file_data = file_resp.json()
-                    videos.append(
-                        {
-                            "quality": quality,
-                            "url": file_data["fileUrl"],
-                            "filesize": file_size,
-                        }
-                    )
-                except Exception:
-                    continue
+        async with http_session() as session:
+            async with session.post(
+                "https://getsave.net/proxy.php",
+                data={"url": url},
+                headers=headers,
+            ) as resp:
+                data = await resp.json(content_type=None)
+            # print(data, "data from getsave")
+            title = data["api"]["title"]
+            thumbnail_url = data["api"]["mediaItems"][0].get("mediaThumbnail")
+
+            videos = []
+            for item in data["api"]["mediaItems"]:
+                if item.get("type") == "Video":
+                    try:
+                        quality = item.get("mediaQuality")
+                        file_size = item.get("mediaFileSize")
+                        async with session.get(
+                            item.get("mediaUrl"), headers=headers
+                        ) as file_resp:
+                            file_data = await file_resp.json(content_type=None)
+                        videos.append(
+                            {
+                                "quality": quality,
+                                "url": file_data["fileUrl"],
+                                "filesize": file_size,
+                            }
+                        )
+                    except Exception:
+                        continue
 
         return {"title": title, "thumbnail": thumbnail_url, "videos": videos}
 
@@ -60,16 +63,16 @@ async def fetch_from_saveas(url: str):
 
     try:
         # print(url, "url from saveas")
-        resp = requests.post(
-            "https://saveas.co/smart_download.php",
-            data={"fb_url": url},
-            headers=headers,
-            timeout=30,
-        )
-        data = resp.text
+        async with http_session() as session:
+            async with session.post(
+                "https://saveas.co/smart_download.php",
+                data={"fb_url": url},
+                headers=headers,
+            ) as resp:
+                data = await resp.text()
 
         # print(data, "data from saveas")
-        soup = BeautifulSoup(data, "html.parser")
+        soup = parse_html(data)
 
         img_element = soup.select_one("img")
         thumbnail_url = img_element.get("src") if img_element else None
@@ -108,6 +111,14 @@ async def fetch_from_saveas(url: str):
         raise Exception(f"saveas.co method failed: {str(e)}")
 
 
+# Providers raced for each request, in priority order. getsave is a hedge:
+# it only starts if saveas has not answered (or has failed) within 3s.
+FACEBOOK_PROVIDERS = [
+    Provider("saveas", fetch_from_saveas),
+    Provider("getsave", fetch_from_getsave, hedge_delay=3.0),
+]
+
+
 async def download_facebook_core(url: str):
     """
     Core Facebook download logic without FastAPI dependencies.
@@ -123,28 +134,12 @@ async def download_facebook_core(url: str):
         HTTPException: If download fails
     """
     try:
-        # print(url, "url from facebook download core")
-        # Primary: try saveas.co first
-        try:
-            primary_result = await fetch_from_saveas(url)
-            if primary_result:
-                return primary_result
-        except Exception:
-            pass
-
-        # Fallback: try getsave.net if primary failed
-        try:
-            fallback_result = await fetch_from_getsave(url)
-            if fallback_result:
-                return fallback_result
-        except Exception:
-            pass
-
-        # If we reach here, both methods failed
+        return await race_providers("facebook", url, FACEBOOK_PROVIDERS)
+    except AllProvidersFailed as e:
         raise HTTPException(
-            status_code=502, detail="Both Facebook download methods failed"
+            status_code=502,
+            detail=f"Both Facebook download methods failed: {str(e)}",
         )
-
     except HTTPException:
         raise
     except Exception as e:
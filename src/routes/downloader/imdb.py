@@ -1,9 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ...services.scraper_tokens import fetch_aio_dl
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 
 imdb_router = APIRouter(
     prefix="/download",
@@ -18,44 +17,37 @@ async def fetch_imdb_vidburner(url: str):
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                "https://vidburner.com/imdb-video-downloader/", headers=headers
-            ) as resp:
-                html = await resp.text()
-                soup = BeautifulSoup(html, "html.parser")
-                token = soup.find("input", {"name": "token"})["value"]
-
-            payload = {
-                "url": url,
-                "token": token,
-                "hash": "aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
+        data = await fetch_aio_dl(
+            "https://vidburner.com/imdb-video-downloader/",
+            "https://vidburner.com/wp-json/aio-dl/video-data/",
+            url,
+            headers,
+            form_hash="aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
+        )
+
+        urls = [
+            {
+                "quality": "1080p",
+                "url": data["medias"][-1]["url"],
+                "filesize": "null",
             }
+        ]
 
-            async with session.post(
-                "https://vidburner.com/wp-json/aio-dl/video-data/",
-                data=payload,
-                headers=headers,
-            ) as resp:
-                data = await resp.json()
-
-            urls = [
-                {
-                    "quality": "1080p",
-                    "url": data["medias"][-1]["url"],
-                    "filesize": "null",
-                }
-            ]
-
-            return {
-                "title": data["title"],
-                "thumbnail": data["thumbnail"],
-                "videos": urls,
-            }
+        return {
+            "title": data["title"],
+            "thumbnail": data["thumbnail"],
+            "videos": urls,
+        }
     except Exception as e:
         raise Exception(f"vidburner.com method failed: {str(e)}")
 
 
+# Providers raced for each request, in priority order
+IMDB_PROVIDERS = [
+    Provider("vidburner", fetch_imdb_vidburner),
+]
+
+
 async def download_imdb_core(url: str):
     """
     Core IMDb download logic without FastAPI dependencies.
@@ -71,23 +63,11 @@ async def download_imdb_core(url: str):
         HTTPException: If download fails
     """
     try:
-        task2 = asyncio.create_task(fetch_imdb_vidburner(url))
-
-        done, pending = await asyncio.wait([task2], return_when=asyncio.FIRST_COMPLETED)
-
-        # Cancel pending tasks
-        for task in pending:
-            task.cancel()
-
-        # Get result from completed task
-        for completed in done:
-            result = completed.result()
-            if result:
-                return result
-
-        # If no task completed successfully
-        raise HTTPException(status_code=500, detail="IMDb download method failed")
-
+        return await race_providers("imdb", url, IMDB_PROVIDERS)
+    except AllProvidersFailed as e:
+        raise HTTPException(
+            status_code=500, detail=f"IMDb download method failed: {str(e)}"
+        )
     except HTTPException:
         raise
     except Exception as e:
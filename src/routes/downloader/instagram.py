@@ -1,11 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import asyncio
-from bs4 import BeautifulSoup
-import aiohttp
-
-
 from ...auth.auth import verify_api_key
+from ...services.http_client import http_session
+from ...services.scraper_tokens import fetch_on4t
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 
 instagram_router = APIRouter(
     prefix="/download",
@@ -17,42 +15,26 @@ async def fetch_from_on4t(url: str):
     headers = {"User-Agent": "Mozilla/5.0"}
 
     try:
-        async with aiohttp.ClientSession() as session:
-            # Step 1: Get CSRF token
-            async with session.get(
-                "https://on4t.com/instagram-video-downloader", headers=headers
-            ) as resp:
-                html = await resp.text()
-                soup = BeautifulSoup(html, "html.parser")
-                token_element = soup.find("meta", {"name": "csrf-token"})
-                if not token_element:
-                    raise Exception("CSRF token not found")
-                token = token_element["content"]
-
-            # Step 2: Submit download request
-            payload = {"_token": token, "link[]": url}
-
-            async with session.post(
-                "https://on4t.com/all-video-download", data=payload, headers=headers
-            ) as resp:
-                data = await resp.json()
-
-            if "result" not in data or not data["result"]:
-                raise Exception("No result data from on4t.com")
-
-            result = data["result"][0]
+        data = await fetch_on4t(
+            "https://on4t.com/instagram-video-downloader", url, headers
+        )
 
-            return {
-                "title": result.get("title", "Instagram Video"),
-                "thumbnail": result.get("videoimg_file_url", ""),
-                "videos": [
-                    {
-                        "quality": "1080p",
-                        "url": result.get("video_file_url", ""),
-                        "filesize": "null",
-                    }
-                ],
-            }
+        if "result" not in data or not data["result"]:
+            raise Exception("No result data from on4t.com")
+
+        result = data["result"][0]
+
+        return {
+            "title": result.get("title", "Instagram Video"),
+            "thumbnail": result.get("videoimg_file_url", ""),
+            "videos": [
+                {
+                    "quality": "1080p",
+                    "url": result.get("video_file_url", ""),
+                    "filesize": "null",
+                }
+            ],
+        }
     except Exception as e:
         raise Exception(f"on4t.com method failed: {str(e)}")
 
@@ -61,9 +43,10 @@ async def fetch_from_snapins(url: str):
     headers = {"User-Agent": "Mozilla/5.0"}
 
     try:
-        async with aiohttp.ClientSession() as session:
+        async with http_session() as session:
             # Set cookies
-            await session.get("https://snapins.ai/", headers=headers)
+            async with session.get("https://snapins.ai/", headers=headers) as resp:
+                await resp.read()
 
             # Send POST request
             payload = {"url": url}
@@ -117,6 +100,13 @@ async def fetch_from_snapins(url: str):
         raise Exception(f"snapins.ai method failed: {str(e)}")
 
 
+# Providers raced for each request, in priority order
+INSTAGRAM_PROVIDERS = [
+    Provider("on4t", fetch_from_on4t),
+    Provider("snapins", fetch_from_snapins),
+]
+
+
 async def download_instagram_core(url: str):
     """
     Core Instagram download logic without FastAPI dependencies.
@@ -132,65 +122,11 @@ async def download_instagram_core(url: str):
         HTTPException: If download fails
     """
     try:
-        task1 = asyncio.create_task(fetch_from_on4t(url))
-        task2 = asyncio.create_task(fetch_from_snapins(url))
-
-        done, pending = await asyncio.wait(
-            [task1, task2], return_when=asyncio.FIRST_COMPLETED
-        )
-
-        # Check the first completed task(s)
-        first_success_result = None
-        for completed in done:
-            try:
-                result = completed.result()
-                if result:
-                    first_success_result = result
-                    break
-            except Exception:
-                # Ignore error here; we'll try the remaining task(s)
-                pass
-
-        if first_success_result is not None:
-            # We have a valid result; cancel any remaining work
-            for task in pending:
-                task.cancel()
-            return first_success_result
-
-        # If the first finished task failed or returned empty, wait for the others
-        if pending:
-            more_done, still_pending = await asyncio.wait(
-                pending, return_when=asyncio.FIRST_COMPLETED
-            )
-
-            # Try to get a result from the newly completed task(s)
-            for completed in more_done:
-                try:
-                    result = completed.result()
-                    if result:
-                        # Cancel anything else that might still be running
-                        for task in still_pending:
-                            task.cancel()
-                        return result
-                except Exception:
-                    pass
-
-            # If nothing succeeded yet, wait for all remaining tasks to finish as a last attempt
-            if still_pending:
-                final_done, _ = await asyncio.wait(still_pending)
-                for completed in final_done:
-                    try:
-                        result = completed.result()
-                        if result:
-                            return result
-                    except Exception:
-                        pass
-
-        # If we reach here, all methods failed
+        return await race_providers("instagram", url, INSTAGRAM_PROVIDERS)
+    except AllProvidersFailed as e:
         raise HTTPException(
-            status_code=502, detail="Both Instagram download methods failed"
+            status_code=502, detail=f"Both Instagram download methods failed: {str(e)}"
         )
-
     except HTTPException:
         raise
     except Exception as e:
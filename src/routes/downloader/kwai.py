@@ -1,9 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ...services.http_client import http_session
+from ...services.scraper_tokens import fetch_aio_dl
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 
 kwai_router = APIRouter(
     prefix="/download",
@@ -19,7 +19,7 @@ async def fetch_kwai_socifan(url: str):
     payload = {"endpoint": "/v1/scraper/kwai/video-downloader", "url": url}
 
     try:
-        async with aiohttp.ClientSession() as session:
+        async with http_session() as session:
             async with session.post(
                 "https://www.socifan.com/v2/fallout-api", data=payload, headers=headers
             ) as resp:
@@ -48,42 +48,36 @@ async def fetch_kwai_vidburner(url: str):
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                "https://vidburner.com/kwai-video-downloader/", headers=headers
-            ) as resp:
-                html = await resp.text()
-                soup = BeautifulSoup(html, "html.parser")
-                token = soup.find("input", {"name": "token"})["value"]
-
-            payload = {
-                "url": url,
-                "token": token,
-                "hash": "aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
-            }
-
-            async with session.post(
-                "https://vidburner.com/wp-json/aio-dl/video-data/",
-                data=payload,
-                headers=headers,
-            ) as resp:
-                data = await resp.json()
-
-            videos = [
-                {"quality": "1080p", "url": item["url"], "filesize": "null"}
-                for item in data["medias"]
-                if item.get("extension") == "mp4"
-            ]
+        data = await fetch_aio_dl(
+            "https://vidburner.com/kwai-video-downloader/",
+            "https://vidburner.com/wp-json/aio-dl/video-data/",
+            url,
+            headers,
+            form_hash="aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
+        )
 
-            return {
-                "title": data["title"],
-                "thumbnail": data["thumbnail"],
-                "videos": videos,
-            }
+        videos = [
+            {"quality": "1080p", "url": item["url"], "filesize": "null"}
+            for item in data["medias"]
+            if item.get("extension") == "mp4"
+        ]
+
+        return {
+            "title": data["title"],
+            "thumbnail": data["thumbnail"],
+            "videos": videos,
+        }
     except Exception as e:
         raise Exception(f"vidburner.com method failed: {str(e)}")
 
 
+# Providers raced for each request, in priority order
+KWAI_PROVIDERS = [
+    Provider("socifan", fetch_kwai_socifan),
+    Provider("vidburner", fetch_kwai_vidburner),
+]
+
+
 async def download_kwai_core(url: str):
     """
     Core Kwai download logic without FastAPI dependencies.
@@ -99,38 +93,11 @@ async def download_kwai_core(url: str):
         HTTPException: If download fails
     """
     try:
-        task1 = asyncio.create_task(fetch_kwai_socifan(url))
-        task2 = asyncio.create_task(fetch_kwai_vidburner(url))
-
-        done, pending = await asyncio.wait(
-            [task1, task2], return_when=asyncio.FIRST_COMPLETED
-        )
-
-        # Check for a successful result
-        for task in done:
-            try:
-                result = task.result()
-                # Cancel other pending tasks since we have a valid result
-                for t in pending:
-                    t.cancel()
-                return result
-            except Exception:
-                pass  # Ignore the failed task and move on
-
-        # If the first completed task failed, wait for others
-        if pending:
-            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
-            for task in done:
-                try:
-                    result = task.result()
-                    return result
-                except Exception:
-                    pass
-
+        return await race_providers("kwai", url, KWAI_PROVIDERS)
+    except AllProvidersFailed as e:
         raise HTTPException(
-            status_code=502, detail="Both Kwai download sources failed."
+            status_code=502, detail=f"Both Kwai download sources failed: {str(e)}"
         )
-
     except HTTPException:
         raise
     except Exception as e:
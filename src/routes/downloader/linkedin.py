@@ -1,9 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ...services.http_client import http_session
+from ...services.scraper_tokens import fetch_aio_dl
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 
 linkedin_router = APIRouter(
     prefix="/download",
@@ -18,38 +18,25 @@ async def fetch_linkedin_vidburner(url: str):
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                "https://vidburner.com/linkedin-video-downloader/", headers=headers
-            ) as resp:
-                html = await resp.text()
-                soup = BeautifulSoup(html, "html.parser")
-                token = soup.find("input", {"name": "token"})["value"]
-
-            payload = {
-                "url": url,
-                "token": token,
-                "hash": "aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
-            }
-
-            async with session.post(
-                "https://vidburner.com/wp-json/aio-dl/video-data/",
-                data=payload,
-                headers=headers,
-            ) as resp:
-                data = await resp.json()
-
-            urls = [
-                {"quality": "1080p", "url": item["url"], "filesize": "null"}
-                for item in data["medias"]
-                if item.get("extension") == "mp4"
-            ]
+        data = await fetch_aio_dl(
+            "https://vidburner.com/linkedin-video-downloader/",
+            "https://vidburner.com/wp-json/aio-dl/video-data/",
+            url,
+            headers,
+            form_hash="aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
+        )
 
-            return {
-                "title": data["title"],
-                "thumbnail": data["thumbnail"],
-                "videos": urls,
-            }
+        urls = [
+            {"quality": "1080p", "url": item["url"], "filesize": "null"}
+            for item in data["medias"]
+            if item.get("extension") == "mp4"
+        ]
+
+        return {
+            "title": data["title"],
+            "thumbnail": data["thumbnail"],
+            "videos": urls,
+        }
     except Exception as e:
         raise Exception(f"vidburner.com method failed: {str(e)}")
 
@@ -62,7 +49,7 @@ async def fetch_linkedin_ez4cast(url: str):
     payload = {"url": url}
 
     try:
-        async with aiohttp.ClientSession() as session:
+        async with http_session() as session:
             async with session.post(
                 "https://us-central1-ez4cast.cloudfunctions.net/tweetVideoURL-getLinkedinVideoURL",
                 data=payload,
@@ -81,6 +68,13 @@ async def fetch_linkedin_ez4cast(url: str):
         raise Exception(f"ez4cast method failed: {str(e)}")
 
 
+# Providers raced for each request, in priority order
+LINKEDIN_PROVIDERS = [
+    Provider("vidburner", fetch_linkedin_vidburner),
+    Provider("ez4cast", fetch_linkedin_ez4cast),
+]
+
+
 async def download_linkedin_core(url: str):
     """
     Core LinkedIn download logic without FastAPI dependencies.
@@ -96,28 +90,11 @@ async def download_linkedin_core(url: str):
         HTTPException: If download fails
     """
     try:
-        task1 = asyncio.create_task(fetch_linkedin_vidburner(url))
-        task2 = asyncio.create_task(fetch_linkedin_ez4cast(url))
-
-        done, pending = await asyncio.wait(
-            [task1, task2], return_when=asyncio.FIRST_COMPLETED
-        )
-
-        # Cancel pending tasks
-        for task in pending:
-            task.cancel()
-
-        # Get result from completed task
-        for finished in done:
-            result = finished.result()
-            if result:
-                return result
-
-        # If no task completed successfully
+        return await race_providers("linkedin", url, LINKEDIN_PROVIDERS)
+    except AllProvidersFailed as e:
         raise HTTPException(
-            status_code=500, detail="Both LinkedIn download methods failed"
+            status_code=500, detail=f"Both LinkedIn download methods failed: {str(e)}"
         )
-
     except HTTPException:
         raise
     except Exception as e:
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ...services.http_client import http_session
+from ...services.scraper_tokens import fetch_aio_dl
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 
 ninegag_router = APIRouter(
     prefix="/download",
@@ -18,36 +18,24 @@ async def fetch_9gag_steptodown(url: str):
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            # Step 1: Get token
-            async with session.get(
-                "https://steptodown.com/9gag-video-downloader/", headers=headers
-            ) as resp:
-                html = await resp.text()
-                soup = BeautifulSoup(html, "html.parser")
-                token = soup.find("input", {"name": "token"})["value"]
-
-            # Step 2: Post to fetch data
-            payload = {"url": url, "token": token}
-
-            async with session.post(
-                "https://steptodown.com/wp-json/aio-dl/video-data/",
-                data=payload,
-                headers=headers,
-            ) as resp:
-                data = await resp.json()
+        data = await fetch_aio_dl(
+            "https://steptodown.com/9gag-video-downloader/",
+            "https://steptodown.com/wp-json/aio-dl/video-data/",
+            url,
+            headers,
+        )
 
-            return {
-                "title": data["title"],
-                "thumbnail": data["thumbnail"],
-                "videos": [
-                    {
-                        "quality": "1080p",
-                        "url": data["medias"][0]["url"],
-                        "filesize": "null",
-                    }
-                ],
-            }
+        return {
+            "title": data["title"],
+            "thumbnail": data["thumbnail"],
+            "videos": [
+                {
+                    "quality": "1080p",
+                    "url": data["medias"][0]["url"],
+                    "filesize": "null",
+                }
+            ],
+        }
     except Exception as e:
         raise Exception(f"steptodown.com method failed: {str(e)}")
 
@@ -59,7 +47,7 @@ async def fetch_9gag_storyclone(url: str):
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
+        async with http_session() as session:
             api_url = f"https://storyclone.com/api/fetchMedia?url={url}"
             async with session.get(api_url, headers=headers) as resp:
                 data = await resp.json()
@@ -79,6 +67,13 @@ async def fetch_9gag_storyclone(url: str):
         raise Exception(f"storyclone.com method failed: {str(e)}")
 
 
+# Providers raced for each request, in priority order
+NINEGAG_PROVIDERS = [
+    Provider("steptodown", fetch_9gag_steptodown),
+    Provider("storyclone", fetch_9gag_storyclone),
+]
+
+
 async def download_9gag_core(url: str):
     """
     Core 9GAG download logic without FastAPI dependencies.
@@ -94,26 +89,11 @@ async def download_9gag_core(url: str):
         HTTPException: If download fails
     """
     try:
-        task1 = asyncio.create_task(fetch_9gag_steptodown(url))
-        task2 = asyncio.create_task(fetch_9gag_storyclone(url))
-
-        done, pending = await asyncio.wait(
-            [task1, task2], return_when=asyncio.FIRST_COMPLETED
+        return await race_providers("ninegag", url, NINEGAG_PROVIDERS)
+    except AllProvidersFailed as e:
+        raise HTTPException(
+            status_code=500, detail=f"Both 9GAG download methods failed: {str(e)}"
         )
-
-        # Cancel pending tasks
-        for task in pending:
-            task.cancel()
-
-        # Get result from completed task
-        for completed in done:
-            result = completed.result()
-            if result:
-                return result
-
-        # If no task completed successfully
-        raise HTTPException(status_code=500, detail="Both 9GAG download methods failed")
-
     except HTTPException:
         raise
     except Exception as e:
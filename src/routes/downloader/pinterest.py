@@ -1,10 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import asyncio
-import aiohttp
 import re
-from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ...services.http_client import http_session
+from ...services.html_extract import parse_html
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 
 pinterest_router = APIRouter(
     prefix="/download",
@@ -88,14 +88,16 @@ async def fetch_from_savepin_v2(url: str):
     type_ = "redirect"
 
     try:
-        async with aiohttp.ClientSession() as session:
+        async with http_session() as session:
             async with session.get(
                 f"https://www.savepin.app/download.php?url={url}&lang={lang}&type={type_}",
                 headers=headers,
             ) as resp:
                 html = await resp.text()
 
-        soup = BeautifulSoup(html, "html.parser")
+        soup = parse_html(
+            html, "div", "a", class_=["image-container", "table-container", "is-success"]
+        )
         thumbnail = soup.find("div", class_="image-container").find("img")["src"]
         title = soup.find("div", class_="table-container").find("h1").text
         video_url = soup.find("a", class_="button is-success is-small")["href"]
@@ -121,9 +123,10 @@ async def fetch_from_savepin_with_fdown(url: str):
     type_ = "redirect"
 
     try:
-        async with aiohttp.ClientSession() as session:
+        async with http_session() as session:
             # Dummy call to fdown.net to simulate cookie handling
-            await session.get("https://www.fdown.net", headers=headers)
+            async with session.get("https://www.fdown.net", headers=headers) as resp:
+                await resp.read()
 
             async with session.get(
                 f"https://www.savepin.app/download.php?url={url}&lang={lang}&type={type_}",
@@ -131,7 +134,9 @@ async def fetch_from_savepin_with_fdown(url: str):
             ) as resp:
                 html = await resp.text()
 
-        soup = BeautifulSoup(html, "html.parser")
+        soup = parse_html(
+            html, "div", "a", class_=["image-container", "table-container", "is-success"]
+        )
         thumbnail = soup.find("div", class_="image-container").find("img")["src"]
         title = soup.find("div", class_="table-container").find("h1").text
         video_url = soup.find("a", class_="button is-success is-small")["href"]
@@ -150,6 +155,13 @@ async def fetch_from_savepin_with_fdown(url: str):
         raise Exception(f"savepin.app with fdown method failed: {str(e)}")
 
 
+# Providers raced for each request, in priority order
+PINTEREST_PROVIDERS = [
+    Provider("savepin", fetch_from_savepin_v2),
+    Provider("savepin-fdown", fetch_from_savepin_with_fdown),
+]
+
+
 async def download_pinterest_core(url: str):
     """
     Core Pinterest download logic without FastAPI dependencies.
@@ -175,28 +187,12 @@ async def download_pinterest_core(url: str):
         )
     
     try:
-        task1 = asyncio.create_task(fetch_from_savepin_v2(cleaned_url))
-        task2 = asyncio.create_task(fetch_from_savepin_with_fdown(cleaned_url))
-
-        done, pending = await asyncio.wait(
-            [task1, task2], return_when=asyncio.FIRST_COMPLETED
-        )
-
-        # Cancel pending tasks
-        for task in pending:
-            task.cancel()
-
-        # Get result from completed task
-        for completed in done:
-            result = completed.result()
-            if result:
-                return result
-
-        # If no task completed successfully
+        return await race_providers("pinterest", cleaned_url, PINTEREST_PROVIDERS)
+    except AllProvidersFailed as e:
         raise HTTPException(
-            status_code=500, detail="Both Pinterest download methods failed"
+            status_code=500,
+            detail=f"Both Pinterest download methods failed: {str(e)}",
         )
-
     except HTTPException:
         raise
     except Exception as e:
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import asyncio
-import requests
 from ...auth.auth import verify_api_key
+from ...services.http_client import http_session
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 from typing import Dict
 
 reddit_router = APIRouter(
@@ -11,20 +11,20 @@ reddit_router = APIRouter(
 )
 
 
-def fetch_reddit2(url: str) -> Dict:
+async def fetch_reddit2(url: str) -> Dict:
     headers = {
         "Content-Type": "application/json",
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     }
     payload = {"url": url}
-    session = requests.Session()
-    response = session.post(
-        "https://submagic-free-tools.fly.dev/api/reddit-download",
-        headers=headers,
-        json=payload,
-    )
-    data = response.json()
+    async with http_session() as session:
+        async with session.post(
+            "https://submagic-free-tools.fly.dev/api/reddit-download",
+            headers=headers,
+            json=payload,
+        ) as response:
+            data = await response.json(content_type=None)
     # print(data, "data from reddit2")
     title = data["title"]
     thumbnail = data.get("thumbnailUrl", "")
@@ -42,20 +42,21 @@ def fetch_reddit2(url: str) -> Dict:
     return {"title": title, "thumbnail": thumbnail, "videos": urls}
 
 
-def fetch_redidown(url: str) -> Dict:
+async def fetch_redidown(url: str) -> Dict:
     headers = {
         "Content-Type": "application/json",
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     }
-    session = requests.Session()
-    session.get("https://redidown.com/", headers=headers)
-
-    payload = {"url": url}
-    response = session.post(
-        "https://redidown.com/download", headers=headers, json=payload
-    )
-    data = response.json()
+    async with http_session() as session:
+        async with session.get("https://redidown.com/", headers=headers) as resp:
+            await resp.read()
+
+        payload = {"url": url}
+        async with session.post(
+            "https://redidown.com/download", headers=headers, json=payload
+        ) as response:
+            data = await response.json(content_type=None)
     # print(data, "data from redidown
     video_info = data.get("video_info", {})
     full_hd = video_info.get("full_hd", {})
@@ -69,6 +70,13 @@ def fetch_redidown(url: str) -> Dict:
     }
 
 
+# Providers raced for each request, in priority order
+REDDIT_PROVIDERS = [
+    Provider("submagic", fetch_reddit2),
+    Provider("redidown", fetch_redidown),
+]
+
+
 async def download_reddit_core(url: str):
     """
     Core Reddit download logic without FastAPI dependencies.
@@ -83,53 +91,12 @@ async def download_reddit_core(url: str):
     Raises:
         HTTPException: If download fails
     """
-
-    # print(url, "url in reddit core")
     try:
-        loop = asyncio.get_event_loop()
-        task_reddit2 = loop.run_in_executor(None, fetch_reddit2, url)
-        task_redidown = loop.run_in_executor(None, fetch_redidown, url)
-
-        done, pending = await asyncio.wait(
-            [task_reddit2, task_redidown], return_when=asyncio.FIRST_COMPLETED
+        return await race_providers("reddit", url, REDDIT_PROVIDERS)
+    except AllProvidersFailed as e:
+        raise HTTPException(
+            status_code=500, detail=f"Both Reddit download methods failed: {str(e)}"
         )
-
-        first_result = None
-        first_error = None
-        for task in done:
-            try:
-                result = task.result()
-                if result and isinstance(result, dict) and result.get("videos"):
-                    first_result = result
-                    break
-            except Exception as e:
-                first_error = e
-
-        # If first completed task failed or returned error, wait for the other(s)
-        if not first_result:
-            if pending:
-                more_done, _ = await asyncio.wait(pending)
-                for task in more_done:
-                    try:
-                        result = task.result()
-                        if result and isinstance(result, dict) and result.get("videos"):
-                            first_result = result
-                            break
-                    except Exception as e:
-                        first_error = e
-
-        # Cancel any remaining tasks
-        for task in pending:
-            task.cancel()
-
-        if first_result:
-            return first_result
-        else:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Both Reddit download methods failed: {str(first_error) if first_error else 'Unknown error'}",
-            )
-
     except HTTPException:
         raise
     except Exception as e:
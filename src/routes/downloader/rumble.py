@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import requests
-from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ...services.http_client import http_session
+from ...services.html_extract import parse_html
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 
 rumble_router = APIRouter(
     prefix="/download",
@@ -10,20 +11,7 @@ rumble_router = APIRouter(
 )
 
 
-async def download_rumble_core(url: str):
-    """
-    Core Rumble download logic without FastAPI dependencies.
-    Can be used as part of another API or service.
-
-    Args:
-        url (str): Rumble video URL
-
-    Returns:
-        dict: Dictionary containing title, thumbnail, and videos array
-
-    Raises:
-        HTTPException: If download fails
-    """
+async def fetch_rumble_orbitdownloader(url: str):
     try:
         headers = {
             "Content-Type": "application/x-www-form-urlencoded",
@@ -34,16 +22,17 @@ async def download_rumble_core(url: str):
             "video_url": url,
         }
 
-        session = requests.Session()
-        response = session.post(
-            "https://orbitdownloader.com/rumble-video-downloader/submit",
-            headers=headers,
-            data=payload,
-        )
+        async with http_session() as session:
+            async with session.post(
+                "https://orbitdownloader.com/rumble-video-downloader/submit",
+                headers=headers,
+                data=payload,
+            ) as response:
+                data = await response.text()
 
-        data = response.text
-
-        soup = BeautifulSoup(data, "html.parser")
+        soup = parse_html(
+            data, "div", class_=["preview-header", "thumbnail-container", "format-card"]
+        )
 
         title = soup.find("div", class_="preview-header").find("h1").text
 
@@ -57,6 +46,36 @@ async def download_rumble_core(url: str):
 
         return {"title": title, "thumbnail": thumbnail, "videos": urls}
 
+    except Exception as e:
+        raise Exception(f"orbitdownloader.com method failed: {str(e)}")
+
+
+# Providers raced for each request, in priority order
+RUMBLE_PROVIDERS = [
+    Provider("orbitdownloader", fetch_rumble_orbitdownloader),
+]
+
+
+async def download_rumble_core(url: str):
+    """
+    Core Rumble download logic without FastAPI dependencies.
+    Can be used as part of another API or service.
+
+    Args:
+        url (str): Rumble video URL
+
+    Returns:
+        dict: Dictionary containing title, thumbnail, and videos array
+
+    Raises:
+        HTTPException: If download fails
+    """
+    try:
+        return await race_providers("rumble", url, RUMBLE_PROVIDERS)
+    except AllProvidersFailed as e:
+        raise HTTPException(status_code=500, detail=f"Rumble download error: {str(e)}")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Rumble download error: {str(e)}")
 
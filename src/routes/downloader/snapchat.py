@@ -1,9 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ...services.scraper_tokens import fetch_aio_dl
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 
 snapchat_router = APIRouter(
     prefix="/download",
@@ -18,41 +17,34 @@ async def fetch_snapchat_vidburner(url: str):
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                "https://vidburner.com/snapchat-video-downloader/", headers=headers
-            ) as init_resp:
-                init_html = await init_resp.text()
-                soup = BeautifulSoup(init_html, "html.parser")
-                token = soup.find("input", {"name": "token"})["value"]
-
-            payload = {
-                "url": url,
-                "token": token,
-                "hash": "aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
-            }
-
-            async with session.post(
-                "https://vidburner.com/wp-json/aio-dl/video-data/",
-                data=payload,
-                headers=headers,
-            ) as post_resp:
-                data = await post_resp.json()
+        data = await fetch_aio_dl(
+            "https://vidburner.com/snapchat-video-downloader/",
+            "https://vidburner.com/wp-json/aio-dl/video-data/",
+            url,
+            headers,
+            form_hash="aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
+        )
 
-            title = data["title"]
-            thumbnail = data["thumbnail"]
-            urls = []
-            for item in data["medias"]:
-                if item["extension"] == "mp4":
-                    urls.append(
-                        {"quality": "1080p", "url": item["url"], "filesize": "null"}
-                    )
+        title = data["title"]
+        thumbnail = data["thumbnail"]
+        urls = []
+        for item in data["medias"]:
+            if item["extension"] == "mp4":
+                urls.append(
+                    {"quality": "1080p", "url": item["url"], "filesize": "null"}
+                )
 
-            return {"title": title, "thumbnail": thumbnail, "videos": urls}
+        return {"title": title, "thumbnail": thumbnail, "videos": urls}
     except Exception as e:
         raise Exception(f"vidburner.com method failed: {str(e)}")
 
 
+# Providers raced for each request, in priority order
+SNAPCHAT_PROVIDERS = [
+    Provider("vidburner", fetch_snapchat_vidburner),
+]
+
+
 async def download_snapchat_core(url: str):
     """
     Core Snapchat download logic without FastAPI dependencies.
@@ -68,23 +60,11 @@ async def download_snapchat_core(url: str):
         HTTPException: If download fails
     """
     try:
-        task1 = asyncio.create_task(fetch_snapchat_vidburner(url))
-
-        done, pending = await asyncio.wait([task1], return_when=asyncio.FIRST_COMPLETED)
-
-        # Cancel pending tasks
-        for task in pending:
-            task.cancel()
-
-        # Get result from completed task
-        for finished in done:
-            result = finished.result()
-            if result is not None:
-                return result
-
-        # If no task completed successfully
-        raise HTTPException(status_code=500, detail="Snapchat download method failed")
-
+        return await race_providers("snapchat", url, SNAPCHAT_PROVIDERS)
+    except AllProvidersFailed as e:
+        raise HTTPException(
+            status_code=500, detail=f"Snapchat download method failed: {str(e)}"
+        )
     except HTTPException:
         raise
     except Exception as e:
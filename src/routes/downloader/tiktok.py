@@ -1,11 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends
-import requests
 import re
 import json
 import base64
 from typing import Dict, Any
 from ...auth.auth import verify_api_key
-from bs4 import BeautifulSoup
+from ...services.http_client import http_session
+from ...services.html_extract import parse_html
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 
 tiktok_router = APIRouter(
     prefix="/download",
@@ -89,11 +90,11 @@ async def download_tiktok_savetik(url: str):
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
         }
 
-        response = requests.post(
-            "https://savetik.co/api/ajaxSearch", data=payload, headers=headers
-        )
-
-        response_data = response.json()
+        async with http_session() as session:
+            async with session.post(
+                "https://savetik.co/api/ajaxSearch", data=payload, headers=headers
+            ) as response:
+                response_data = await response.json(content_type=None)
 
         if response_data.get("status") != "ok":
             raise HTTPException(status_code=400, detail="API returned error status")
@@ -168,6 +169,68 @@ async def download_tiktok_savetik(url: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def fetch_tiktok_ssstik(url: str):
+    payload = {"id": url, "locale": "en", "tt": "bkJ0RTI2"}
+    headers = {
+        "Content-Type": "application/x-www-form-urlencoded",
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    }
+
+    async with http_session() as session:
+        async with session.post(
+            "https://ssstik.io/abc?url=dl", data=payload, headers=headers
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"ssstik.io returned status {response.status}")
+
+            data = await response.text()
+    soup = parse_html(
+        data, "p", "img", "a", class_=["maintext", "result_author", "download_link"]
+    )
+
+    # Try to extract data from ssstik.io
+    title_element = soup.find("p", class_="maintext")
+    thumbnail_element = soup.find("img", class_="result_author")
+    video_element = soup.find(
+        "a",
+        class_="pure-button pure-button-primary is-center u-bl dl-button download_link without_watermark vignette_active notranslate",
+    )
+
+    if not (title_element and thumbnail_element and video_element):
+        raise Exception("ssstik.io response did not contain a video")
+
+    return {
+        "title": title_element.text.strip(),
+        "thumbnail": thumbnail_element.get("src", ""),
+        "videos": [
+            {
+                "quality": "1080p",
+                "url": video_element.get("href", ""),
+                "filesize": "null",
+            }
+        ],
+    }
+
+
+async def fetch_tiktok_savetik(url: str):
+    result = await download_tiktok_savetik(url)
+    return {
+        "title": result["title"],
+        "thumbnail": result["thumbnail"],
+        "videos": [
+            {"quality": "1080p", "url": result["video_url"], "filesize": "null"}
+        ],
+    }
+
+
+# Providers raced for each request, in priority order. savetik is a hedge:
+# it only starts if ssstik has not answered (or has failed) within 2.5s.
+TIKTOK_PROVIDERS = [
+    Provider("ssstik", fetch_tiktok_ssstik),
+    Provider("savetik", fetch_tiktok_savetik, hedge_delay=2.5),
+]
+
+
 async def download_tiktok_core(url: str):
     """
     Core TikTok download logic without FastAPI dependencies.
@@ -183,71 +246,13 @@ async def download_tiktok_core(url: str):
         HTTPException: If download fails
     """
     try:
-        # Primary method: ssstik.io
-        payload = {"id": url, "locale": "en", "tt": "bkJ0RTI2"}
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        }
-
-        response = requests.post(
-            "https://ssstik.io/abc?url=dl", data=payload, headers=headers
-        )
-
-        if response.status_code != 200:
-            raise Exception(f"ssstik.io returned status {response.status_code}")
-
-        data = response.text
-        soup = BeautifulSoup(data, "html.parser")
-
-        # Try to extract data from ssstik.io
-        title_element = soup.find("p", class_="maintext")
-        thumbnail_element = soup.find("img", class_="result_author")
-        video_element = soup.find(
-            "a",
-            class_="pure-button pure-button-primary is-center u-bl dl-button download_link without_watermark vignette_active notranslate",
-        )
-
-        if title_element and thumbnail_element and video_element:
-            title = title_element.text.strip()
-            thumbnail = thumbnail_element.get("src", "")
-            video_url = video_element.get("href", "")
-
-            if video_url:
-                return {
-                    "title": title,
-                    "thumbnail": thumbnail,
-                    "videos": [
-                        {"quality": "1080p", "url": video_url, "filesize": "null"}
-                    ],
-                }
-
-        # Fallback to savetik.co
-        result = await download_tiktok_savetik(url)
-        return {
-            "title": result["title"],
-            "thumbnail": result["thumbnail"],
-            "videos": [
-                {"quality": "1080p", "url": result["video_url"], "filesize": "null"}
-            ],
-        }
-
+        return await race_providers("tiktok", url, TIKTOK_PROVIDERS)
+    except AllProvidersFailed as e:
+        raise HTTPException(status_code=500, detail=f"Both methods failed. {str(e)}")
+    except HTTPException:
+        raise
     except Exception as e:
-        try:
-            # Final fallback to savetik.co
-            result = await download_tiktok_savetik(url)
-            return {
-                "title": result["title"],
-                "thumbnail": result["thumbnail"],
-                "videos": [
-                    {"quality": "1080p", "url": result["video_url"], "filesize": "null"}
-                ],
-            }
-        except Exception as fallback_error:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Both methods failed. Primary: {str(e)}, Fallback: {str(fallback_error)}",
-            )
+        raise HTTPException(status_code=500, detail=f"TikTok download error: {str(e)}")
 
 
 @tiktok_router.get("/tiktok/")
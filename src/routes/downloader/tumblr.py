@@ -1,9 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import asyncio
-import requests
-from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ...services.http_client import http_session
+from ...services.html_extract import parse_html
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 from typing import Dict
 
 tumblr_router = APIRouter(
@@ -12,18 +12,18 @@ tumblr_router = APIRouter(
 )
 
 
-def fetch_tumblr2(url: str) -> Dict:
+async def fetch_tumblr2(url: str) -> Dict:
     headers = {
         "Content-Type": "application/json",
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     }
     payload = {"videoUrl": url}
-    session = requests.Session()
-    response = session.post(
-        "https://a2z.tools/api/fetch-video-info", headers=headers, json=payload
-    )
-    data = response.json()
+    async with http_session() as session:
+        async with session.post(
+            "https://a2z.tools/api/fetch-video-info", headers=headers, json=payload
+        ) as response:
+            data = await response.json(content_type=None)
 
     title = data.get("title", "")
     thumbnail = data.get("thumbnail", "")
@@ -36,26 +36,30 @@ def fetch_tumblr2(url: str) -> Dict:
     }
 
 
-def fetch_savetumblr(url: str) -> Dict:
+async def fetch_savetumblr(url: str) -> Dict:
     headers = {
         "Content-Type": "application/json",
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     }
-    session = requests.Session()
-    init_response = session.get("https://savetumblr.com", headers=headers)
+    async with http_session() as session:
+        async with session.get("https://savetumblr.com", headers=headers) as resp:
+            init_html = await resp.text()
 
-    soup = BeautifulSoup(init_response.text, "html.parser")
-    token_meta = soup.find("meta", {"name": "csrf-token"})
-    if not token_meta or not token_meta.get("content"):
-        raise Exception("CSRF token not found on savetumblr.com")
+        soup = parse_html(init_html, "meta")
+        token_meta = soup.find("meta", {"name": "csrf-token"})
+        if not token_meta or not token_meta.get("content"):
+            raise Exception("CSRF token not found on savetumblr.com")
 
-    token = token_meta["content"]
+        token = token_meta["content"]
 
-    payload = {"_token": token, "url": url, "local": "vi"}
-    response = session.post("https://savetumblr.com/", json=payload, headers=headers)
+        payload = {"_token": token, "url": url, "local": "vi"}
+        async with session.post(
+            "https://savetumblr.com/", json=payload, headers=headers
+        ) as response:
+            html = await response.text()
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = parse_html(html, "div", class_="result_overlay")
     results = soup.find_all("div", class_="result_overlay")
 
     video_links = []
@@ -80,6 +84,13 @@ def fetch_savetumblr(url: str) -> Dict:
     }
 
 
+# Providers raced for each request, in priority order
+TUMBLR_PROVIDERS = [
+    Provider("a2z", fetch_tumblr2),
+    Provider("savetumblr", fetch_savetumblr),
+]
+
+
 async def download_tumblr_core(url: str):
     """
     Core Tumblr download logic without FastAPI dependencies.
@@ -95,29 +106,11 @@ async def download_tumblr_core(url: str):
         HTTPException: If download fails
     """
     try:
-        loop = asyncio.get_event_loop()
-        task_tumblr2 = loop.run_in_executor(None, fetch_tumblr2, url)
-        task_savetumblr = loop.run_in_executor(None, fetch_savetumblr, url)
-
-        done, pending = await asyncio.wait(
-            [task_tumblr2, task_savetumblr], return_when=asyncio.FIRST_COMPLETED
+        return await race_providers("tumblr", url, TUMBLR_PROVIDERS)
+    except AllProvidersFailed as e:
+        raise HTTPException(
+            status_code=500, detail=f"Both Tumblr download methods failed: {str(e)}"
         )
-
-        first_result = None
-        for task in done:
-            first_result = task.result()
-            break
-
-        for task in pending:
-            task.cancel()
-
-        if first_result:
-            return first_result
-        else:
-            raise HTTPException(
-                status_code=500, detail="Both Tumblr download methods failed"
-            )
-
     except HTTPException:
         raise
     except Exception as e:
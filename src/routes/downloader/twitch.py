@@ -1,9 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ...services.scraper_tokens import fetch_aio_dl
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 
 twitch_router = APIRouter(
     prefix="/download",
@@ -18,41 +17,28 @@ async def fetch_twitch_vidburner(url: str):
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                "https://vidburner.com/twitch-video-downloader/", headers=headers
-            ) as init_resp:
-                init_html = await init_resp.text()
-                soup = BeautifulSoup(init_html, "html.parser")
-                token = soup.find("input", {"name": "token"})["value"]
-
-            payload = {
-                "url": url,
-                "token": token,
-                "hash": "aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
-            }
-
-            async with session.post(
-                "https://vidburner.com/wp-json/aio-dl/video-data/",
-                data=payload,
-                headers=headers,
-            ) as post_resp:
-                data = await post_resp.json()
-
-            title = data["title"]
-            thumbnail = data["thumbnail"]
-            urls = []
-            for item in data["medias"]:
-                if item["extension"] == "mp4":
-                    urls.append(
-                        {
-                            "quality": item["quality"],
-                            "url": item["url"],
-                            "filesize": "null",
-                        }
-                    )
-
-            return {"title": title, "thumbnail": thumbnail, "videos": urls}
+        data = await fetch_aio_dl(
+            "https://vidburner.com/twitch-video-downloader/",
+            "https://vidburner.com/wp-json/aio-dl/video-data/",
+            url,
+            headers,
+            form_hash="aHR0cHM6Ly93d3cuYmlsaWJpbGkuY29tL3ZpZGVvL0JWMWNzNzl6bUVDby8=1044YWlvLWRs",
+        )
+
+        title = data["title"]
+        thumbnail = data["thumbnail"]
+        urls = []
+        for item in data["medias"]:
+            if item["extension"] == "mp4":
+                urls.append(
+                    {
+                        "quality": item["quality"],
+                        "url": item["url"],
+                        "filesize": "null",
+                    }
+                )
+
+        return {"title": title, "thumbnail": thumbnail, "videos": urls}
     except Exception as e:
         raise Exception(f"vidburner.com method failed: {str(e)}")
 
@@ -64,46 +50,39 @@ async def fetch_twitch_whitehat(url: str):
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                "https://www.whitehattoolbox.com/videodownloader/twitch-video-downloader/",
-                headers=headers,
-            ) as init_resp:
-                init_html = await init_resp.text()
-                soup = BeautifulSoup(init_html, "html.parser")
-                token = soup.find("input", {"name": "token"})["value"]
-
-            payload = {
-                "url": url,
-                "token": token,
-                "hash": "aHR0cHM6Ly93d3cudHdpdGNoLnR2L2Vyb2JiMjIxL2NsaXAvVmljdG9yaW91c1NoYWtpbmdDb25zb2xlQnVkZGhhQmFyLWxpLW9oa2lhcjAyeWJPdXU=1086YWlvLWRs",
-            }
-
-            async with session.post(
-                "https://www.whitehattoolbox.com/videodownloader/wp-json/aio-dl/video-data/",
-                data=payload,
-                headers=headers,
-            ) as post_resp:
-                data = await post_resp.json()
-
-            title = data["title"]
-            thumbnail = data["thumbnail"]
-            urls = []
-            for media in data["medias"]:
-                if media["extension"] == "mp4":
-                    urls.append(
-                        {
-                            "quality": media["quality"],
-                            "url": media["url"],
-                            "filesize": media["formattedSize"],
-                        }
-                    )
-
-            return {"title": title, "thumbnail": thumbnail, "videos": urls}
+        data = await fetch_aio_dl(
+            "https://www.whitehattoolbox.com/videodownloader/twitch-video-downloader/",
+            "https://www.whitehattoolbox.com/videodownloader/wp-json/aio-dl/video-data/",
+            url,
+            headers,
+            form_hash="aHR0cHM6Ly93d3cudHdpdGNoLnR2L2Vyb2JiMjIxL2NsaXAvVmljdG9yaW91c1NoYWtpbmdDb25zb2xlQnVkZGhhQmFyLWxpLW9oa2lhcjAyeWJPdXU=1086YWlvLWRs",
+        )
+
+        title = data["title"]
+        thumbnail = data["thumbnail"]
+        urls = []
+        for media in data["medias"]:
+            if media["extension"] == "mp4":
+                urls.append(
+                    {
+                        "quality": media["quality"],
+                        "url": media["url"],
+                        "filesize": media["formattedSize"],
+                    }
+                )
+
+        return {"title": title, "thumbnail": thumbnail, "videos": urls}
     except Exception as e:
         raise Exception(f"whitehattoolbox.com method failed: {str(e)}")
 
 
+# Providers raced for each request, in priority order
+TWITCH_PROVIDERS = [
+    Provider("vidburner", fetch_twitch_vidburner),
+    Provider("whitehattoolbox", fetch_twitch_whitehat),
+]
+
+
 async def download_twitch_core(url: str):
     """
     Core Twitch download logic without FastAPI dependencies.
@@ -119,28 +98,11 @@ async def download_twitch_core(url: str):
         HTTPException: If download fails
     """
     try:
-        task1 = asyncio.create_task(fetch_twitch_vidburner(url))
-        task2 = asyncio.create_task(fetch_twitch_whitehat(url))
-
-        done, pending = await asyncio.wait(
-            [task1, task2], return_when=asyncio.FIRST_COMPLETED
-        )
-
-        # Cancel pending tasks
-        for task in pending:
-            task.cancel()
-
-        # Get result from completed task
-        for finished in done:
-            result = finished.result()
-            if result:
-                return result
-
-        # If no task completed successfully
+        return await race_providers("twitch", url, TWITCH_PROVIDERS)
+    except AllProvidersFailed as e:
         raise HTTPException(
-            status_code=500, detail="Both Twitch download methods failed"
+            status_code=500, detail=f"Both Twitch download methods failed: {str(e)}"
         )
-
     except HTTPException:
         raise
     except Exception as e:
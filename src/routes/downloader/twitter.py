@@ -1,9 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
 from ...auth.auth import verify_api_key
+from ...services.http_client import http_session
+from ...services.html_extract import parse_html
+from ...services.provider_race import Provider, AllProvidersFailed, race_providers
 
 twitter_router = APIRouter(
     prefix="/download",
@@ -18,8 +18,9 @@ async def fetch_from_xdown1(url: str):
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            await session.get("https://xdown.app/en", headers=headers)
+        async with http_session() as session:
+            async with session.get("https://xdown.app/en", headers=headers) as resp:
+                await resp.read()
 
             payload = {"q": url, "lang": "en"}
 
@@ -28,7 +29,9 @@ async def fetch_from_xdown1(url: str):
             ) as resp:
                 data = await resp.json()
 
-        soup = BeautifulSoup(data["data"], "html.parser")
+        soup = parse_html(
+            data["data"], "div", "a", class_=["image-tw", "clearfix", "tw-button-dl"]
+        )
 
         thumbnail = soup.find("div", class_="image-tw open-popup").find("img")["src"]
         title = soup.find("div", class_="clearfix").find("h3").text
@@ -52,13 +55,15 @@ async def fetch_from_xdown2(url: str):
     try:
         payload = {"q": url, "lang": "en", "cftoken": ""}
 
-        async with aiohttp.ClientSession() as session:
+        async with http_session() as session:
             async with session.post(
                 "https://xdown.app/api/ajaxSearch", data=payload, headers=headers
             ) as resp:
                 data = await resp.json()
 
-        soup = BeautifulSoup(data["data"], "html.parser")
+        soup = parse_html(
+            data["data"], "div", "a", class_=["image-tw", "clearfix", "tw-button-dl"]
+        )
 
         thumbnail = soup.find("div", class_="image-tw open-popup").find("img")["src"]
         title = soup.find("div", class_="clearfix").find("h3").text
@@ -73,6 +78,13 @@ async def fetch_from_xdown2(url: str):
         raise Exception(f"xdown.app method 2 failed: {str(e)}")
 
 
+# Providers raced for each request, in priority order
+TWITTER_PROVIDERS = [
+    Provider("xdown-1", fetch_from_xdown1),
+    Provider("xdown-2", fetch_from_xdown2),
+]
+
+
 async def download_twitter_core(url: str):
     """
     Core Twitter/X download logic without FastAPI dependencies.
@@ -88,28 +100,11 @@ async def download_twitter_core(url: str):
         HTTPException: If download fails
     """
     try:
-        task1 = asyncio.create_task(fetch_from_xdown1(url))
-        task2 = asyncio.create_task(fetch_from_xdown2(url))
-
-        done, pending = await asyncio.wait(
-            [task1, task2], return_when=asyncio.FIRST_COMPLETED
-        )
-
-        # Cancel pending tasks
-        for task in pending:
-            task.cancel()
-
-        # Get result from completed task
-        for completed in done:
-            result = completed.result()
-            if result:
-                return result
-
-        # If no task completed successfully
+        return await race_providers("twitter", url, TWITTER_PROVIDERS)
+    except AllProvidersFailed as e:
         raise HTTPException(
-            status_code=500, detail="Both Twitter/X download methods failed"
+            status_code=500, detail=f"Both Twitter/X download methods failed: {str(e)}"
         )
-
     except HTTPException:
         raise
     except Exception as e:
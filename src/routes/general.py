@@ -1,13 +1,28 @@
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
+import copy
+import json
+import os
 import re
 import time
-from typing import Dict, Any, Optional
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Any, List, Optional
+from pydantic import BaseModel
+from urllib.parse import urlsplit, parse_qsl, urlencode
 from sqlmodel import Session
 
 from ..auth.auth import verify_api_key
 from ..database.database import get_session
-from ..models.download_history import DownloadHistory, DownloadStatus
+from ..models.download_history import DownloadStatus
+from ..services.history_writer import enqueue_history
+from ..services.jobs import JobStatus, find_job
+from ..services.media_probe import probe_videos
+from ..services.provider_race import get_provider_stats, last_race_winner
+from ..services.provider_scoreboard import get_scoreboard
+from ..services.result_cache import TTLCache
+from ..services.single_flight import SingleFlight
 
 # Import all core download functions
 from .downloader.tiktok import download_tiktok_core
@@ -16,7 +31,7 @@ from .downloader.facebook import download_facebook_core
 from .downloader.twitter import download_twitter_core
 from .downloader.dailymotion import download_dailymotion_core
 from .downloader.reddit import download_reddit_core
-from .downloader.pinterest import download_pinterest_core
+from .downloader.pinterest import download_pinterest_core, clean_pinterest_url
 from .downloader.ninegag import download_9gag_core
 from .downloader.bitchute import download_bitchute_core
 from .downloader.douyin import download_douyin_core
@@ -35,43 +50,40 @@ general_router = APIRouter(
     tags=["Downloads"],
 )
 
-# Platform detection patterns
-PLATFORM_PATTERNS = {
-    "tiktok": [
-        r"tiktok\.com",
-        r"vm\.tiktok\.com",
-        r"vt\.tiktok\.com",
-        r"m\.tiktok\.com",
-    ],
-    "instagram": [r"instagram\.com", r"instagr\.am", r"ig\.me"],
-    "facebook": [r"facebook\.com", r"fb\.com", r"fb\.watch"],
-    "twitter": [
-        r"(?:https?:\/\/)?(?:www\.)?twitter\.com\/",
-        r"(?:https?:\/\/)?(?:www\.)?x\.com\/",
-        r"(?:https?:\/\/)?(?:www\.)?t\.co\/",
-    ],
-    "dailymotion": [r"dailymotion\.com", r"dai\.ly"],
-    "reddit": [
-        r"reddit\.com",
-        r"redd\.it",
-        r"reddit\.com\/user\/",  # Add user profile pattern
-        r"reddit\.com\/comments\/",  # Add comments pattern
-    ],
-    "pinterest": [r"pinterest\.com", r"pin\.it"],
-    "ninegag": [r"9gag\.com"],
-    "bitchute": [r"bitchute\.com"],
-    "douyin": [r"douyin\.com"],
-    "imdb": [r"imdb\.com"],
-    "kwai": [r"kwai\.com"],
-    "linkedin": [r"linkedin\.com"],
-    "rumble": [r"rumble\.com"],
-    "snapchat": [r"snapchat\.com"],
-    "twitch": [r"twitch\.tv"],
-    "buzzfeed": [r"buzzfeed\.com"],
-    "tumblr": [r"tumblr\.com"],
-    "bilibili": [r"bilibili\.com"],
+# Hosts served by each platform; subdomains (www., m., vm., in., ...) match too
+PLATFORM_HOSTS = {
+    "tiktok": ["tiktok.com"],
+    "instagram": ["instagram.com", "instagr.am", "ig.me"],
+    "facebook": ["facebook.com", "fb.com", "fb.watch"],
+    "twitter": ["twitter.com", "x.com", "t.co"],
+    "dailymotion": ["dailymotion.com", "dai.ly"],
+    "reddit": ["reddit.com", "redd.it"],
+    "pinterest": ["pinterest.com", "pin.it"],
+    "ninegag": ["9gag.com"],
+    "bitchute": ["bitchute.com"],
+    "douyin": ["douyin.com"],
+    "imdb": ["imdb.com"],
+    "kwai": ["kwai.com"],
+    "linkedin": ["linkedin.com"],
+    "rumble": ["rumble.com"],
+    "snapchat": ["snapchat.com"],
+    "twitch": ["twitch.tv"],
+    "buzzfeed": ["buzzfeed.com"],
+    "tumblr": ["tumblr.com"],
+    "bilibili": ["bilibili.com"],
 }
 
+# Host suffix -> platform, built once for O(1) lookups per host label
+PLATFORM_HOST_INDEX = {
+    host: platform for platform, hosts in PLATFORM_HOSTS.items() for host in hosts
+}
+
+# Hosts the suffix index cannot enumerate, e.g. country domains such as
+# pinterest.co.uk, pinterest.de or pinterest.com.au
+PLATFORM_HOST_FALLBACKS = [
+    ("pinterest", re.compile(r"(?:^|\.)pinterest\.(?:com?\.)?[a-z]{2,3}$")),
+]
+
 # Core download functions mapping
 DOWNLOAD_FUNCTIONS = {
     "tiktok": download_tiktok_core,
@@ -96,9 +108,240 @@ DOWNLOAD_FUNCTIONS = {
 }
 
 
+# Query parameters that only describe where a link was shared from, on
+# any site
+TRACKING_PARAMS = {"fbclid", "gclid"}
+TRACKING_PARAM_PREFIXES = ("utm_",)
+
+# Share-tracking parameters of one platform. Short keys such as "s" or "t"
+# carry meaning elsewhere, so they are only dropped where they are known
+# to be tracking.
+PLATFORM_TRACKING_PARAMS = {
+    "tiktok": {
+        "is_from_webapp",
+        "is_copy_url",
+        "sender_device",
+        "sender_web_id",
+        "share_app_id",
+        "share_item_id",
+        "_r",
+        "_t",
+    },
+    "douyin": {"share_app_id", "share_item_id", "_r", "_t"},
+    "instagram": {"igshid", "igsh"},
+    "facebook": {"mibextid", "rdid", "ref"},
+    "twitter": {"s", "t", "ref_src", "ref_url"},
+    "reddit": {"share_id", "context", "ref", "ref_source"},
+    "snapchat": {"share_id"},
+}
+
+# Patterns extracting a stable video ID from "host/path" for each platform
+CANONICAL_ID_PATTERNS = {
+    "tiktok": [r"/video/(\d+)", r"/v/(\d+)"],
+    "instagram": [r"/(?:p|reel|reels|tv)/([A-Za-z0-9_-]+)"],
+    "twitter": [r"/status(?:es)?/(\d+)"],
+    "dailymotion": [
+        r"dailymotion\.com/video/([a-zA-Z0-9]+)",
+        r"dai\.ly/([a-zA-Z0-9]+)",
+    ],
+    "reddit": [r"/comments/([a-z0-9]+)", r"redd\.it/([a-z0-9]+)"],
+    "pinterest": [r"/pin/(\d+)"],
+    "douyin": [r"/video/(\d+)"],
+    "ninegag": [r"/gag/([A-Za-z0-9]+)"],
+    "rumble": [r"rumble\.com/(v[0-9a-z]+)"],
+    "imdb": [r"/video/(?:[a-z]+/)?(vi\d+)"],
+    "twitch": [
+        r"/videos/(\d+)",
+        r"clips\.twitch\.tv/([A-Za-z0-9_-]+)",
+        r"/clip/([A-Za-z0-9_-]+)",
+    ],
+    "bilibili": [r"/video/(BV[0-9A-Za-z]+|av\d+)"],
+}
+
+# Result cache TTLs in seconds. Scraped CDN links are signed and expire, so
+# platforms with short-lived links get short TTLs; 0 disables caching.
+RESULT_CACHE_DEFAULT_TTL = float(os.getenv("RESULT_CACHE_DEFAULT_TTL", "900"))
+RESULT_CACHE_TTLS = {
+    "tiktok": 600,
+    "instagram": 600,
+    "facebook": 600,
+    "douyin": 600,
+    "twitter": 1800,
+    "dailymotion": 1800,
+    "reddit": 3600,
+    "pinterest": 3600,
+    "ninegag": 3600,
+    "imdb": 3600,
+}
+
+result_cache = TTLCache(
+    max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "5000")),
+    default_ttl=RESULT_CACHE_DEFAULT_TTL,
+)
+result_cache_platform_stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+# Concurrent identical requests share one upstream scrape
+inflight_downloads = SingleFlight()
+
+# Largest number of URLs one /download/batch call may submit
+BATCH_MAX_URLS = int(os.getenv("BATCH_MAX_URLS", "5000"))
+
+# Scrapes running at once per platform across all batches, so bulk jobs
+# use each platform's capacity without hammering it. Platforms behind
+# stricter rate limits get lower limits.
+BATCH_DEFAULT_CONCURRENCY = int(os.getenv("BATCH_DEFAULT_CONCURRENCY", "8"))
+BATCH_CONCURRENCY = {
+    "instagram": 4,
+    "facebook": 4,
+    "linkedin": 2,
+}
+_batch_slots: Dict[str, asyncio.Semaphore] = {}
+
+
+class BatchRequest(BaseModel):
+    urls: List[str]
+    refresh: bool = False
+    probe: bool = False
+
+
+def canonicalize_url(url: str, platform: str) -> str:
+    """
+    Reduce a video URL to a stable per-platform cache key.
+
+    Extracts the video ID where the platform has one (the way
+    clean_pinterest_url and extract_dailymotion_id do); otherwise normalises
+    the host and drops tracking parameters and fragments.
+
+    Args:
+        url (str): Video URL as submitted
+        platform (str): Detected platform name
+
+    Returns:
+        str: Canonical key such as "tiktok:7301234567890123456"
+    """
+    url = url.strip()
+    if platform == "pinterest":
+        url = clean_pinterest_url(url)
+    if "://" not in url:
+        url = f"https://{url}"
+
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    for prefix in ("www.", "m.", "mobile."):
+        if host.startswith(prefix):
+            host = host[len(prefix) :]
+            break
+    path = parts.path.rstrip("/") or "/"
+    location = f"{host}{path}"
+
+    for pattern in CANONICAL_ID_PATTERNS.get(platform, []):
+        match = re.search(pattern, location)
+        if match:
+            return f"{platform}:{match.group(1)}"
+
+    tracking = TRACKING_PARAMS | PLATFORM_TRACKING_PARAMS.get(platform, set())
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in tracking
+        and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+    canonical = f"{platform}:{location}"
+    if query:
+        canonical += f"?{urlencode(query)}"
+    return canonical
+
+
+def is_cacheable_result(result: Any) -> bool:
+    """Only complete results with at least one video link are cached."""
+    return (
+        isinstance(result, dict) and bool(result.get("videos")) and "job" not in result
+    )
+
+
+def get_result_cache_stats() -> dict:
+    """Overall and per-platform result cache hit/miss counts."""
+    return {
+        **result_cache.stats(),
+        "platforms": dict(result_cache_platform_stats),
+        "single_flight": inflight_downloads.stats(),
+    }
+
+
+def record_download_history(session: Optional[Session], **fields):
+    """
+    Queue a DownloadHistory row for the background history writer.
+
+    The row is written in a later batch, so neither commit latency nor a
+    database error ever reaches the request.
+
+    Args:
+        session (Optional[Session]): Request database session; nothing is
+            saved if None (core functions used without tracking)
+        **fields: DownloadHistory column values
+    """
+    if not session:
+        return
+    enqueue_history(**fields)
+
+
+def record_when_job_done(
+    session: Optional[Session], job_id: str, start_time: float, **fields
+):
+    """
+    Record a request answered with a pending background job once the job ends.
+
+    Until then there is no download link and the job may still fail, so the
+    row is written with the job's outcome (success or failed, with its
+    error) and the time the client actually waited for a link. The row
+    keeps the request's timestamp.
+
+    Args:
+        session (Optional[Session]): Request database session; nothing is
+            saved if None
+        job_id (str): Job the result points the client to
+        start_time (float): time.time() when the request arrived
+        **fields: Other DownloadHistory column values
+    """
+    job = find_job(job_id)
+    if not session or job is None:
+        return
+    requested_at = datetime.fromtimestamp(start_time, timezone.utc)
+
+    def record(_task=None):
+        completed = job.status == JobStatus.COMPLETED
+        record_download_history(
+            session,
+            **fields,
+            status=DownloadStatus.SUCCESS if completed else DownloadStatus.FAILED,
+            error_message=None if completed else job.error,
+            response_time=job.updated_at - start_time,
+            created_at=requested_at,
+        )
+
+    if job.done:
+        record()
+    else:
+        job.task.add_done_callback(record)
+
+
+def url_host(url: str) -> str:
+    """Lowercase host of a URL, accepting URLs pasted without a scheme."""
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+    try:
+        return (urlsplit(url).hostname or "").rstrip(".")
+    except ValueError:
+        return ""
+
+
 def detect_platform(url: str) -> Optional[str]:
     """
-    Detect the platform from the given URL.
+    Detect the platform from the host of the given URL.
+
+    Only the host is considered, so a link to one platform embedded in
+    another's URL (e.g. a Reddit post about a TikTok) is not misrouted.
 
     Args:
         url (str): The video URL to analyze
@@ -106,18 +349,30 @@ def detect_platform(url: str) -> Optional[str]:
     Returns:
         Optional[str]: The detected platform name or None if not supported
     """
-    url_lower = url.lower()
+    host = url_host(url)
+    if not host:
+        return None
+
+    # Try the host and each parent domain: vm.tiktok.com, tiktok.com
+    labels = host.split(".")
+    for start in range(len(labels) - 1):
+        platform = PLATFORM_HOST_INDEX.get(".".join(labels[start:]))
+        if platform:
+            return platform
 
-    for platform, patterns in PLATFORM_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, url_lower):
-                return platform
+    for platform, pattern in PLATFORM_HOST_FALLBACKS:
+        if pattern.search(host):
+            return platform
 
     return None
 
 
 async def download_general_core(
-    url: str, platform: Optional[str] = None, session: Optional[Session] = None
+    url: str,
+    platform: Optional[str] = None,
+    session: Optional[Session] = None,
+    refresh: bool = False,
+    probe: bool = False,
 ) -> Dict[str, Any]:
     """
     Core general download logic that automatically detects platform and uses appropriate downloader.
@@ -126,6 +381,9 @@ async def download_general_core(
         url (str): Video URL to download
         platform (Optional[str]): Force specific platform (optional)
         session (Optional[Session]): Database session for tracking
+        refresh (bool): Skip the result cache lookup and scrape again
+        probe (bool): Fill in size, type and resumability of the video
+            links, within PROBE_BUDGET seconds
 
     Returns:
         Dict[str, Any]: Dictionary containing title, thumbnail, and videos array
@@ -144,63 +402,96 @@ async def download_general_core(
         if not detected_platform:
             error_msg = "Unsupported platform. Please provide a valid video URL from a supported platform."
             # Track failed attempt
-            if session:
-                try:
-                    history_entry = DownloadHistory(
-                        url=url,
-                        platform="unknown",
-                        status=DownloadStatus.FAILED,
-                        error_message=error_msg,
-                        response_time=time.time() - start_time,
-                    )
-                    session.add(history_entry)
-                    session.commit()
-                except Exception as db_error:
-                    print(f"Failed to save history: {db_error}")
-
+            record_download_history(
+                session,
+                url=url,
+                platform="unknown",
+                status=DownloadStatus.FAILED,
+                error_message=error_msg,
+                response_time=time.time() - start_time,
+            )
             raise HTTPException(status_code=400, detail=error_msg)
 
         # Check if platform is supported
         if detected_platform not in DOWNLOAD_FUNCTIONS:
             error_msg = f"Platform '{detected_platform}' is not supported yet."
             # Track failed attempt
-            if session:
-                try:
-                    history_entry = DownloadHistory(
-                        url=url,
-                        platform=detected_platform,
-                        status=DownloadStatus.FAILED,
-                        error_message=error_msg,
-                        response_time=time.time() - start_time,
-                    )
-                    session.add(history_entry)
-                    session.commit()
-                except Exception as db_error:
-                    print(f"Failed to save history: {db_error}")
-
+            record_download_history(
+                session,
+                url=url,
+                platform=detected_platform,
+                status=DownloadStatus.FAILED,
+                error_message=error_msg,
+                response_time=time.time() - start_time,
+            )
             raise HTTPException(status_code=400, detail=error_msg)
 
+        # Serve repeat lookups of the same video from the result cache
+        cache_key = (detected_platform, canonicalize_url(url, detected_platform))
+        cached_result = None if refresh else result_cache.get(cache_key)
+        if cached_result is not None:
+            result_cache_platform_stats[detected_platform]["hits"] += 1
+            record_download_history(
+                session,
+                url=url,
+                platform=detected_platform,
+                status=DownloadStatus.CACHED,
+                title=cached_result.get("title", ""),
+                response_time=time.time() - start_time,
+            )
+            cached_result = copy.deepcopy(cached_result)
+            if probe:
+                await probe_videos(cached_result["videos"])
+            return cached_result
+        result_cache_platform_stats[detected_platform]["misses"] += 1
+
         # Get the appropriate download function
         download_func = DOWNLOAD_FUNCTIONS[detected_platform]
 
-        # Call the platform-specific download function
-        result = await download_func(url)
-
-        # Track successful download
-        if session:
-            try:
-                history_entry = DownloadHistory(
-                    url=url,
-                    platform=detected_platform,
-                    status=DownloadStatus.SUCCESS,
-                    title=result.get("title", ""),
-                    response_time=time.time() - start_time,
+        async def scrape():
+            # Call the platform-specific download function
+            scraped = await download_func(url)
+            provider = last_race_winner()
+            if is_cacheable_result(scraped):
+                result_cache.set(
+                    cache_key,
+                    copy.deepcopy(scraped),
+                    ttl=RESULT_CACHE_TTLS.get(
+                        detected_platform, RESULT_CACHE_DEFAULT_TTL
+                    ),
                 )
-                session.add(history_entry)
-                session.commit()
-            except Exception as db_error:
-                print(f"Failed to save history: {db_error}")
-
+            return scraped, provider
+
+        # Callers arriving while the same video is being scraped wait for it
+        (result, provider), shared = await inflight_downloads.do(cache_key, scrape)
+        if shared:
+            result = copy.deepcopy(result)
+
+        if isinstance(result, dict) and "job" in result:
+            # Still converting (e.g. ssvid.net); record how the job ends
+            record_when_job_done(
+                session,
+                result["job"]["id"],
+                start_time,
+                url=url,
+                platform=detected_platform,
+                title=result.get("title", ""),
+                provider=provider,
+            )
+        else:
+            # Track successful download
+            record_download_history(
+                session,
+                url=url,
+                platform=detected_platform,
+                status=DownloadStatus.SUCCESS,
+                title=result.get("title", ""),
+                response_time=time.time() - start_time,
+                provider=provider,
+            )
+
+        if probe and isinstance(result, dict) and result.get("videos"):
+            await probe_videos(result["videos"])
         return result
 
     except HTTPException:
@@ -209,19 +500,14 @@ async def download_general_core(
         error_msg = f"Download error: {str(e)}"
 
         # Track failed download
-        if session:
-            try:
-                history_entry = DownloadHistory(
-                    url=url,
-                    platform=detected_platform or "unknown",
-                    status=DownloadStatus.FAILED,
-                    error_message=str(e),
-                    response_time=time.time() - start_time,
-                )
-                session.add(history_entry)
-                session.commit()
-            except Exception as db_error:
-                print(f"Failed to save history: {db_error}")
+        record_download_history(
+            session,
+            url=url,
+            platform=detected_platform or "unknown",
+            status=DownloadStatus.FAILED,
+            error_message=str(e),
+            response_time=time.time() - start_time,
+        )
 
         raise HTTPException(status_code=500, detail=error_msg)
 
@@ -230,6 +516,8 @@ async def download_general_core(
 async def download_general_auto(
     url: str,
     platform: Optional[str] = None,
+    refresh: bool = False,
+    probe: bool = False,
     api_key: str = Depends(verify_api_key),
     session: Session = Depends(get_session),
 ):
@@ -239,6 +527,9 @@ async def download_general_auto(
     Args:
         url (str): Video URL to download
         platform (Optional[str]): Force specific platform (optional)
+        refresh (bool): Bypass the result cache and scrape again
+        probe (bool): Fill in each link's filesize, content_type and
+            resumable (adds at most PROBE_BUDGET seconds)
         api_key (str): API key for authentication
         session (Session): Database session for tracking download history
 
@@ -246,7 +537,184 @@ async def download_general_auto(
         JSONResponse: Video information including title, thumbnail, and download links
     """
     try:
-        result = await download_general_core(url, platform, session)
+        result = await download_general_core(url, platform, session, refresh, probe)
         return JSONResponse(content=result, status_code=200)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def batch_slots(platform: str) -> asyncio.Semaphore:
+    """Semaphore limiting concurrent batch scrapes of one platform."""
+    if platform not in _batch_slots:
+        _batch_slots[platform] = asyncio.Semaphore(
+            BATCH_CONCURRENCY.get(platform, BATCH_DEFAULT_CONCURRENCY)
+        )
+    return _batch_slots[platform]
+
+
+async def iter_batch_results(
+    urls: List[str], session: Session, refresh: bool, probe: bool
+) -> AsyncIterator[str]:
+    """
+    Resolve a batch of URLs and yield one NDJSON line per URL as each finishes.
+
+    URLs are grouped by platform and each platform's group is drained by its
+    own workers, at most batch_slots(platform) scraping at a time. A slow or
+    throttled platform therefore never holds up the others, and results are
+    streamed in completion order rather than submission order. Every URL gets
+    exactly one line, whatever its scrape raises. If the client disconnects,
+    the remaining work is cancelled.
+    """
+    results: asyncio.Queue = asyncio.Queue()
+    groups: Dict[str, List[tuple]] = defaultdict(list)
+    for index, url in enumerate(urls):
+        platform = detect_platform(url)
+        if platform in DOWNLOAD_FUNCTIONS:
+            groups[platform].append((index, url))
+        else:
+            results.put_nowait(
+                {
+                    "index": index,
+                    "url": url,
+                    "platform": platform,
+                    "ok": False,
+                    "status_code": 400,
+                    "error": "Unsupported platform",
+                }
+            )
+
+    async def resolve(platform: str, index: int, url: str) -> dict:
+        line = {"index": index, "url": url, "platform": platform}
+        try:
+            async with batch_slots(platform):
+                result = await download_general_core(
+                    url, platform, session, refresh, probe
+                )
+            return {**line, "ok": True, "result": result}
+        except HTTPException as e:
+            return {
+                **line,
+                "ok": False,
+                "status_code": e.status_code,
+                "error": e.detail,
+            }
+        except asyncio.CancelledError:
+            # Only the batch itself cancels its workers; a CancelledError
+            # escaping the scrape is that URL's failure
+            if asyncio.current_task().cancelling():
+                raise
+            error = "Cancelled"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        return {**line, "ok": False, "status_code": 500, "error": error}
+
+    async def worker(platform: str, queue: List[tuple]):
+        while queue:
+            index, url = queue.pop()
+            await results.put(await resolve(platform, index, url))
+
+    workers = []
+    for platform, queue in groups.items():
+        # Workers pop from the end; keep submission order within a platform
+        queue.reverse()
+        limit = BATCH_CONCURRENCY.get(platform, BATCH_DEFAULT_CONCURRENCY)
+        workers += [
+            asyncio.create_task(worker(platform, queue))
+            for _ in range(min(limit, len(queue)))
+        ]
+
+    try:
+        for _ in range(len(urls)):
+            yield json.dumps(await results.get()) + "\n"
+    finally:
+        for task in workers:
+            task.cancel()
+
+
+@general_router.post("/batch")
+async def download_batch(
+    batch: BatchRequest,
+    api_key: str = Depends(verify_api_key),
+    session: Session = Depends(get_session),
+):
+    """
+    Resolve many video URLs in one call, streaming results as NDJSON.
+
+    Each line is {"index", "url", "platform", "ok"} plus "result" (the same
+    object /download/common/ returns) or "status_code" and "error". Lines
+    arrive in completion order; "index" is the URL's position in the request.
+
+    Args:
+        batch (BatchRequest): urls (up to BATCH_MAX_URLS), plus refresh and
+            probe as for /download/common/
+        api_key (str): API key for authentication
+        session (Session): Database session for tracking download history
+
+    Returns:
+        StreamingResponse: One JSON line per URL
+
+    Raises:
+        HTTPException: If the batch is empty or too large
+    """
+    if not batch.urls:
+        raise HTTPException(status_code=400, detail="No URLs given")
+    if len(batch.urls) > BATCH_MAX_URLS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {BATCH_MAX_URLS} URLs per batch",
+        )
+    return StreamingResponse(
+        iter_batch_results(batch.urls, session, batch.refresh, batch.probe),
+        media_type="application/x-ndjson",
+    )
+
+
+@general_router.get("/jobs/{job_id}")
+async def get_job_status(
+    job_id: str,
+    wait: float = 0,
+    api_key: str = Depends(verify_api_key),
+):
+    """
+    Poll a background job (e.g. a Dailymotion conversion) returned by a download call.
+
+    Args:
+        job_id (str): Job identifier from the download response
+        wait (float): Seconds to long-poll for completion (max 30)
+        api_key (str): API key for authentication
+
+    Returns:
+        JSONResponse: Job status, progress and result once completed
+    """
+    job = find_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+
+    if wait > 0 and not job.done:
+        try:
+            await job.wait(timeout=min(wait, 30))
+        except Exception:
+            # Timeout or job failure; the status below reports which
+            pass
+
+    return JSONResponse(content=job.to_dict(), status_code=200)
+
+
+@general_router.get("/cache/stats")
+async def result_cache_stats(api_key: str = Depends(verify_api_key)):
+    """
+    Result cache hit/miss counters, overall and per platform.
+    """
+    return JSONResponse(content=get_result_cache_stats(), status_code=200)
+
+
+@general_router.get("/providers/stats")
+async def provider_race_stats(api_key: str = Depends(verify_api_key)):
+    """
+    Per-provider race outcomes (wins, failures, cancellations, latency) by platform,
+    plus the live scoreboard that decides provider order.
+    """
+    return JSONResponse(
+        content={"races": get_provider_stats(), "scoreboard": get_scoreboard()},
+        status_code=200,
+    )
@@ -0,0 +1,251 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Optional
+import re
+
+from ..auth.auth import verify_api_key
+from ..services.hls_gateway import (
+    PLAYLIST_MEDIA_TYPE,
+    fetch_playlist,
+    get_segment,
+    prefetch_after,
+    segment_media_type,
+    verify_token,
+)
+from ..services.media_proxy import ProxyError, open_upstream
+from ..services.remux import ffmpeg_available, open_output, submit_remux
+
+proxy_router = APIRouter(
+    prefix="/download",
+    tags=["Downloads"],
+)
+
+# Let browser clients read the range headers of a cross-origin response
+EXPOSED_HEADERS = "Content-Length, Content-Range, Accept-Ranges"
+
+
+async def proxy_response(
+    url: str,
+    request: Request,
+    filename: Optional[str] = None,
+    media_type: Optional[str] = None,
+) -> StreamingResponse:
+    """
+    Stream an upstream URL back to the client.
+
+    Args:
+        url: Upstream http(s) URL
+        request: Client request; its method (GET or HEAD) and its Range and
+            If-Range headers are forwarded
+        filename: Serve as an attachment with this name (optional)
+        media_type: Content type when upstream sends none (optional)
+
+    Returns:
+        StreamingResponse: Upstream status, body and content headers
+
+    Raises:
+        HTTPException: If the URL is refused or upstream fails
+    """
+    try:
+        upstream = await open_upstream(url, dict(request.headers), request.method)
+    except ProxyError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    headers = {**upstream.headers, "Access-Control-Expose-Headers": EXPOSED_HEADERS}
+    if filename:
+        safe_name = filename.replace('"', "").replace("\\", "")
+        headers["Content-Disposition"] = f'attachment; filename="{safe_name}"'
+    content_type = headers.pop("content-type", media_type)
+
+    # The background task closes the upstream if the body was never read
+    return StreamingResponse(
+        upstream.iter_chunks(),
+        status_code=upstream.status,
+        headers=headers,
+        media_type=content_type,
+        background=BackgroundTask(upstream.close),
+    )
+
+
+@proxy_router.get("/proxy")
+async def proxy_media(
+    request: Request,
+    url: str,
+    filename: Optional[str] = None,
+    api_key: str = Depends(verify_api_key),
+):
+    """
+    Stream a media URL returned by a downloader through this server.
+
+    Bytes are relayed chunk by chunk as upstream sends them, so memory per
+    connection stays bounded whatever the file size. HTTP Range requests
+    are passed through, which lets players seek.
+
+    Args:
+        url (str): Upstream media URL (http or https, public hosts only)
+        filename (Optional[str]): Serve as an attachment with this file name
+        api_key (str): API key for authentication
+
+    Returns:
+        StreamingResponse: The upstream body with its Content-Type,
+        Content-Length and Content-Range
+
+    Raises:
+        HTTPException: 400/403 if the URL is refused, 502 if upstream fails
+    """
+    return await proxy_response(url, request, filename)
+
+
+@proxy_router.head("/proxy")
+async def proxy_media_head(
+    request: Request,
+    url: str,
+    filename: Optional[str] = None,
+    api_key: str = Depends(verify_api_key),
+):
+    """
+    Headers of GET /download/proxy (size, type, range support), without the body.
+    """
+    return await proxy_response(url, request, filename)
+
+
+async def hls_playlist_response(url: str) -> Response:
+    """
+    Fetch an HLS playlist and return it rewritten to go through the gateway.
+
+    Raises:
+        HTTPException: If the URL is refused or upstream fails
+    """
+    try:
+        playlist = await fetch_playlist(url)
+    except ProxyError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    # Live playlists change every target duration; never let them go stale
+    return Response(
+        playlist, media_type=PLAYLIST_MEDIA_TYPE, headers={"Cache-Control": "no-cache"}
+    )
+
+
+def verified_token(token: str) -> dict:
+    try:
+        return verify_token(token)
+    except ProxyError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception:
+        raise HTTPException(status_code=403, detail="Invalid gateway token")
+
+
+@proxy_router.get("/hls")
+async def hls_gateway(url: str, api_key: str = Depends(verify_api_key)):
+    """
+    Serve an HLS stream (e.g. Dailymotion qualities.auto) through this server.
+
+    The playlist comes back with every variant, rendition, key and segment
+    URI pointing at signed /download/hls/ URLs, which players can fetch
+    without the API key until they expire. Segments are cached on disk and
+    the next few are prefetched, so a popular video is fetched from
+    upstream once rather than once per viewer.
+
+    Args:
+        url (str): Master or media playlist (m3u8) URL
+        api_key (str): API key for authentication
+
+    Returns:
+        Response: The rewritten playlist
+
+    Raises:
+        HTTPException: 400/403 if the URL is refused, 502 if upstream fails
+    """
+    return await hls_playlist_response(url)
+
+
+@proxy_router.get("/hls/playlist")
+async def hls_playlist(t: str):
+    """
+    Variant or rendition playlist referenced by a rewritten playlist.
+
+    Args:
+        t (str): Signed gateway token
+    """
+    return await hls_playlist_response(verified_token(t)["u"])
+
+
+@proxy_router.get("/hls/segment")
+async def hls_segment(t: str, request: Request):
+    """
+    Segment, init section or key referenced by a rewritten playlist.
+
+    Cacheable segments are served from the disk cache, downloaded on a
+    miss, and trigger a prefetch of the segments after them. Anything that
+    cannot be cached is streamed through the proxy.
+
+    Args:
+        t (str): Signed gateway token
+        request: Client request, for Range on streamed responses
+    """
+    fields = verified_token(t)
+    url = fields["u"]
+    if not fields.get("c"):
+        return await proxy_response(url, request)
+
+    try:
+        path = await get_segment(url)
+    except ProxyError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    prefetch_after(fields["p"], fields["i"])
+    if path is None:
+        return await proxy_response(url, request)
+    return FileResponse(
+        path,
+        media_type=segment_media_type(url),
+        headers={"Cache-Control": "public, max-age=86400"},
+    )
+
+
+@proxy_router.post("/remux")
+async def start_remux(
+    url: str,
+    max_height: Optional[int] = None,
+    api_key: str = Depends(verify_api_key),
+):
+    """
+    Convert an HLS stream into a single MP4 file in the background.
+
+    The chosen variant's segments are downloaded in parallel and remuxed
+    (no re-encoding) into a fragmented MP4. Poll /download/jobs/{id}; the
+    completed job's result holds the file's download URL.
+
+    Args:
+        url (str): Master or media playlist (m3u8) URL
+        max_height (Optional[int]): Best variant no taller than this, e.g. 720
+        api_key (str): API key for authentication
+
+    Returns:
+        JSONResponse: The job, with status 202
+
+    Raises:
+        HTTPException: 503 if ffmpeg is not installed
+    """
+    if not ffmpeg_available():
+        raise HTTPException(status_code=503, detail="ffmpeg is not installed")
+    job = submit_remux(url, max_height)
+    return JSONResponse(content=job.to_dict(), status_code=202)
+
+
+@proxy_router.get("/remux/{digest}.mp4")
+async def get_remux_output(digest: str):
+    """
+    Download a remuxed MP4 by the sha256 given in its job result.
+
+    Args:
+        digest (str): sha256 of the file
+    """
+    path = open_output(digest) if re.fullmatch(r"[0-9a-f]{64}", digest) else None
+    if path is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return FileResponse(
+        path,
+        media_type="video/mp4",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
@@ -1,19 +1,53 @@
-from fastapi import APIRouter, Request, Depends
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
 from datetime import datetime, timedelta, timezone
-from sqlmodel import Session, select, func, and_, case
-from sqlalchemy import Integer
+from sqlmodel import Session, select, func, and_
+from sqlalchemy import BigInteger, Integer, cast, true
 from typing import Optional
+import hashlib
+import os
 
-from ..database.database import get_session
+from ..database.database import run_with_session
 from ..models.download_history import DownloadHistory, DownloadStatus
+from ..models.download_rollup import (
+    DownloadRollupDaily,
+    DownloadRollupHourly,
+    ProviderRollupDaily,
+    ProviderRollupHourly,
+)
+from ..services.latency_sketch import merge_sketches, sketch_percentiles
+from ..services.rollups import HOUR, floor_hour, rollup_segments
+from ..services.swr_cache import StaleWhileRevalidateCache
 
 # Initialize templates
 templates = Jinja2Templates(directory="templates")
 
 web_router = APIRouter(tags=["Web Interface"])
 
+# Dashboard data is cached per period: served as-is for DASHBOARD_CACHE_TTL
+# seconds, then served stale for up to DASHBOARD_CACHE_STALE_TTL more while
+# one background refresh runs. A TTL of 0 re-queries on every request.
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "30"))
+DASHBOARD_CACHE_STALE_TTL = float(os.getenv("DASHBOARD_CACHE_STALE_TTL", "300"))
+
+# Rendered pages kept per cached period, one per masked API key
+DASHBOARD_PAGES_PER_PERIOD = 20
+
+dashboard_cache = StaleWhileRevalidateCache(
+    ttl=DASHBOARD_CACHE_TTL, stale_ttl=DASHBOARD_CACHE_STALE_TTL
+)
+
+# Dashboard periods and their length in days
+PERIOD_DAYS = {
+    "3days": 3,
+    "7days": 7,
+    "1month": 30,
+    "3months": 90,
+    "1year": 365,
+}
+DEFAULT_PERIOD = "3days"
+
 # Platform icon mapping - all 19 platforms from general.py
 PLATFORM_ICONS = {
     "tiktok": "🎵",
@@ -61,6 +95,10 @@ PLATFORM_NAMES = {
 }
 
 
+# Statuses counted as successful: cache hits served a working result too
+SUCCESS_STATUSES = (DownloadStatus.SUCCESS, DownloadStatus.CACHED)
+
+
 def mask_api_key(api_key: str) -> str:
     """Mask API key for display, showing only first 4 and last 4 characters"""
     if len(api_key) <= 8:
@@ -72,25 +110,29 @@ def get_database_date_range(session: Session) -> dict:
     """
     Get the actual date range of data in the database.
 
+    Read from the rollups: bucket bounds come off the hourly primary key
+    and the count from the much smaller daily table.
+
     Args:
         session: Database session
 
     Returns:
-        Dictionary with min_date, max_date, and count
+        Dictionary with min_date, max_date (hourly bucket starts), and count
     """
     try:
-        statement = select(
-            func.min(DownloadHistory.created_at).label("min_date"),
-            func.max(DownloadHistory.created_at).label("max_date"),
-            func.count(DownloadHistory.id).label("total_count"),
-        )
-        result = session.exec(statement).first()
+        bounds = session.exec(
+            select(
+                func.min(DownloadRollupHourly.bucket).label("min_date"),
+                func.max(DownloadRollupHourly.bucket).label("max_date"),
+            )
+        ).first()
+        total_count = session.exec(select(func.sum(DownloadRollupDaily.count))).first()
 
-        if result and result.total_count > 0:
+        if bounds and bounds.max_date and total_count:
             return {
-                "min_date": result.min_date,
-                "max_date": result.max_date,
-                "total_count": result.total_count,
+                "min_date": bounds.min_date,
+                "max_date": bounds.max_date,
+                "total_count": total_count,
                 "has_data": True,
             }
         return {"has_data": False, "total_count": 0}
@@ -105,6 +147,8 @@ def parse_period_to_dates(
     """
     Convert period string to start and end datetime objects.
     Uses database's max date if available, otherwise uses current time.
+    The end is exclusive and rounded up to the next hour, so the period
+    lines up with rollup buckets.
 
     Args:
         period: One of "3days", "7days", "1month", "3months", "1year"
@@ -120,17 +164,10 @@ def parse_period_to_dates(
             db_max_date.replace(tzinfo=None) if db_max_date.tzinfo else db_max_date
         )
     else:
-        end_date = datetime.now()
-
-    period_mapping = {
-        "3days": 3,
-        "7days": 7,
-        "1month": 30,
-        "3months": 90,
-        "1year": 365,
-    }
+        end_date = datetime.now(timezone.utc).replace(tzinfo=None)
+    end_date = floor_hour(end_date) + HOUR
 
-    days = period_mapping.get(period, 3)  # Default to 3 days
+    days = PERIOD_DAYS.get(period, PERIOD_DAYS[DEFAULT_PERIOD])
     start_date = end_date - timedelta(days=days)
 
     return start_date, end_date
@@ -170,6 +207,43 @@ def calculate_percentage_change(current: float, previous: float) -> dict:
         return {"change": 0.0, "direction": "neutral", "text": "No change"}
 
 
+def sum_rollups(session: Session, start_date: datetime, end_date: datetime) -> dict:
+    """
+    Add up rollup counters per platform and status over a period.
+
+    Args:
+        session: Database session
+        start_date: Period start date
+        end_date: Period end date (exclusive)
+
+    Returns:
+        Dictionary of (platform, status) -> {"count", "response_time_sum",
+        "response_time_count"}
+    """
+    totals = {}
+    for rollup, lower, upper in rollup_segments(start_date, end_date):
+        statement = (
+            select(
+                rollup.platform,
+                rollup.status,
+                func.sum(rollup.count).label("count"),
+                func.sum(rollup.response_time_sum).label("response_time_sum"),
+                func.sum(rollup.response_time_count).label("response_time_count"),
+            )
+            .where(and_(rollup.bucket >= lower, rollup.bucket < upper))
+            .group_by(rollup.platform, rollup.status)
+        )
+        for row in session.exec(statement).all():
+            counters = totals.setdefault(
+                (row.platform, row.status),
+                {"count": 0, "response_time_sum": 0.0, "response_time_count": 0},
+            )
+            counters["count"] += row.count
+            counters["response_time_sum"] += row.response_time_sum
+            counters["response_time_count"] += row.response_time_count
+    return totals
+
+
 def get_stats_for_period(
     session: Session, start_date: datetime, end_date: datetime
 ) -> dict:
@@ -179,42 +253,34 @@ def get_stats_for_period(
     Args:
         session: Database session
         start_date: Period start date
-        end_date: Period end date
+        end_date: Period end date (exclusive)
 
     Returns:
         Dictionary with basic stats
     """
     try:
-        statement = select(
-            func.count(DownloadHistory.id).label("total"),
-            func.sum(
-                case((DownloadHistory.status == DownloadStatus.SUCCESS, 1), else_=0)
-            ).label("successful"),
-            func.sum(
-                case((DownloadHistory.status == DownloadStatus.FAILED, 1), else_=0)
-            ).label("failed"),
-            func.avg(DownloadHistory.response_time).label("avg_response_time"),
-        ).where(
-            and_(
-                DownloadHistory.created_at >= start_date,
-                DownloadHistory.created_at <= end_date,
-            )
-        )
-
-        result = session.exec(statement).first()
+        total = successful = failed = cached = response_time_count = 0
+        response_time_sum = 0.0
+        for (_, status), counters in sum_rollups(session, start_date, end_date).items():
+            total += counters["count"]
+            if status in SUCCESS_STATUSES:
+                successful += counters["count"]
+            if status == DownloadStatus.FAILED:
+                failed += counters["count"]
+            if status == DownloadStatus.CACHED:
+                cached += counters["count"]
+            response_time_sum += counters["response_time_sum"]
+            response_time_count += counters["response_time_count"]
 
-        total = result.total if result and result.total else 0
-        successful = result.successful if result and result.successful else 0
-        failed = result.failed if result and result.failed else 0
         avg_response_time = (
-            result.avg_response_time if result and result.avg_response_time else 0.0
+            response_time_sum / response_time_count if response_time_count else 0.0
         )
         success_rate = (successful / total) * 100 if total > 0 else 0.0
-
         return {
             "total": total,
             "successful": successful,
             "failed": failed,
+            "cached": cached,
             "success_rate": success_rate,
             "avg_response_time": avg_response_time,
         }
@@ -224,6 +290,7 @@ def get_stats_for_period(
             "total": 0,
             "successful": 0,
             "failed": 0,
+            "cached": 0,
             "success_rate": 0.0,
             "avg_response_time": 0.0,
         }
@@ -301,6 +368,7 @@ def get_dashboard_stats(
             "total_requests_change": total_change,
             "successful": current_stats["successful"],
             "successful_change": successful_change,
+            "cached": current_stats["cached"],
             "failed": current_stats["failed"],
             "failed_change": failed_change,
             "success_rate": round(current_stats["success_rate"], 1),
@@ -316,6 +384,7 @@ def get_dashboard_stats(
             "total_requests_change": no_change,
             "successful": 0,
             "successful_change": no_change,
+            "cached": 0,
             "failed": 0,
             "failed_change": no_change,
             "success_rate": 0.0,
@@ -340,46 +409,38 @@ def get_platform_statistics(
         List of platform statistics with name, icon, total, success, failed, percentages
     """
     try:
-        # Query platform breakdown
-        statement = (
-            select(
-                DownloadHistory.platform,
-                func.count(DownloadHistory.id).label("total"),
-                func.sum(
-                    case((DownloadHistory.status == DownloadStatus.SUCCESS, 1), else_=0)
-                ).label("success"),
-                func.sum(
-                    case((DownloadHistory.status == DownloadStatus.FAILED, 1), else_=0)
-                ).label("failed"),
+        # Platform breakdown from the rollups
+        breakdown = {}
+        for (platform, status), counters in sum_rollups(
+            session, start_date, end_date
+        ).items():
+            row = breakdown.setdefault(
+                platform, {"total": 0, "success": 0, "failed": 0}
             )
-            .where(
-                and_(
-                    DownloadHistory.created_at >= start_date,
-                    DownloadHistory.created_at <= end_date,
-                )
-            )
-            .group_by(DownloadHistory.platform)
-            .order_by(func.count(DownloadHistory.id).desc())
-        )
-
-        results = session.exec(statement).all()
+            row["total"] += counters["count"]
+            if status in SUCCESS_STATUSES:
+                row["success"] += counters["count"]
+            elif status == DownloadStatus.FAILED:
+                row["failed"] += counters["count"]
 
         # Convert to list of dicts and add icons
         platforms_data = []
         max_count = 0
 
-        for row in results:
-            platform_key = row.platform.lower()
-            total = row.total if row.total else 0
-            success = row.success if row.success else 0
-            failed = row.failed if row.failed else 0
+        for platform, row in sorted(
+            breakdown.items(), key=lambda item: item[1]["total"], reverse=True
+        ):
+            platform_key = platform.lower()
+            total = row["total"]
+            success = row["success"]
+            failed = row["failed"]
 
             if total > max_count:
                 max_count = total
 
             platforms_data.append(
                 {
-                    "name": PLATFORM_NAMES.get(platform_key, row.platform.title()),
+                    "name": PLATFORM_NAMES.get(platform_key, platform.title()),
                     "icon": PLATFORM_ICONS.get(platform_key, "🌐"),
                     "total": total,
                     "success": success,
@@ -456,7 +517,7 @@ def get_recent_downloads(
             .where(
                 and_(
                     DownloadHistory.created_at >= start_date,
-                    DownloadHistory.created_at <= end_date,
+                    DownloadHistory.created_at < end_date,
                 )
             )
             .order_by(DownloadHistory.created_at.desc())
@@ -476,9 +537,9 @@ def get_recent_downloads(
                     "title": record.title if record.title else "Untitled",
                     "url": record.url,
                     "status": record.status.value,
-                    "response_time": round(record.response_time, 2)
-                    if record.response_time
-                    else 0.0,
+                    "response_time": (
+                        round(record.response_time, 2) if record.response_time else 0.0
+                    ),
                     "date": record.created_at.strftime("%Y-%m-%d %H:%M"),
                 }
             )
@@ -490,6 +551,232 @@ def get_recent_downloads(
         return []
 
 
+def sum_rollup_sketches(
+    session: Session,
+    start_date: datetime,
+    end_date: datetime,
+    hourly=DownloadRollupHourly,
+    daily=DownloadRollupDaily,
+    group_by: tuple = ("platform",),
+) -> dict:
+    """
+    Merge the response-time sketches of a rollup family over a period.
+
+    Sketch buckets are expanded and summed in the database, so only one
+    row per group and bucket comes back however long the period is.
+
+    Args:
+        session: Database session
+        start_date: Period start date
+        end_date: Period end date (exclusive)
+        hourly: Hourly rollup model
+        daily: Daily rollup model
+        group_by: Rollup columns to keep sketches apart by
+
+    Returns:
+        Dictionary of group values (tuple) -> merged sketch
+    """
+    sketches = {}
+    for rollup, lower, upper in rollup_segments(start_date, end_date, hourly, daily):
+        entries = (
+            func.jsonb_each_text(rollup.response_time_sketch)
+            .table_valued("key", "value")
+            .lateral("entries")
+        )
+        columns = [getattr(rollup, name) for name in group_by]
+        statement = (
+            select(
+                *columns,
+                entries.c.key,
+                cast(func.sum(cast(entries.c.value, BigInteger)), BigInteger).label(
+                    "count"
+                ),
+            )
+            .select_from(rollup)
+            .join(entries, true())
+            .where(and_(rollup.bucket >= lower, rollup.bucket < upper))
+            .group_by(*columns, entries.c.key)
+        )
+        for *group, key, count in session.exec(statement).all():
+            sketch = sketches.setdefault(tuple(group), {})
+            sketch[key] = sketch.get(key, 0) + count
+    return sketches
+
+
+def get_latency_percentiles(
+    session: Session, start_date: datetime, end_date: datetime
+) -> dict:
+    """
+    Get response-time percentiles overall, per platform and per provider.
+
+    Args:
+        session: Database session
+        start_date: Period start date
+        end_date: Period end date (exclusive)
+
+    Returns:
+        Dictionary with overall, platforms and providers entries, each
+        holding count (timed downloads), p50, p95 and p99 in seconds
+    """
+    try:
+        by_platform = sum_rollup_sketches(session, start_date, end_date)
+        by_provider = sum_rollup_sketches(
+            session,
+            start_date,
+            end_date,
+            ProviderRollupHourly,
+            ProviderRollupDaily,
+            group_by=("platform", "provider"),
+        )
+
+        platforms = [
+            {
+                "platform": platform,
+                "name": PLATFORM_NAMES.get(platform.lower(), platform.title()),
+                "icon": PLATFORM_ICONS.get(platform.lower(), "🌐"),
+                "count": sum(sketch.values()),
+                **sketch_percentiles(sketch),
+            }
+            for (platform,), sketch in by_platform.items()
+        ]
+        providers = [
+            {
+                "platform": platform,
+                "name": PLATFORM_NAMES.get(platform.lower(), platform.title()),
+                "provider": provider,
+                "count": sum(sketch.values()),
+                **sketch_percentiles(sketch),
+            }
+            for (platform, provider), sketch in by_provider.items()
+        ]
+        overall = merge_sketches(by_platform.values())
+
+        return {
+            "overall": {"count": sum(overall.values()), **sketch_percentiles(overall)},
+            "platforms": sorted(platforms, key=lambda row: row["count"], reverse=True),
+            "providers": sorted(
+                providers, key=lambda row: (row["platform"], -row["count"])
+            ),
+        }
+    except Exception as e:
+        print(f"Error getting latency percentiles: {e}")
+        return {
+            "overall": {"count": 0, **sketch_percentiles({})},
+            "platforms": [],
+            "providers": [],
+        }
+
+
+def get_period_dates(session: Session, period: str) -> tuple[datetime, datetime]:
+    """
+    Resolve a dashboard period against the data actually in the database.
+
+    Args:
+        session: Database session
+        period: Time period filter ("3days", "7days", "1month", "3months", "1year")
+
+    Returns:
+        Tuple of (start_date, end_date)
+    """
+    # Get database date range first to use actual data dates
+    db_range = get_database_date_range(session)
+
+    # Parse period using actual database dates (fixes issue with future dates)
+    return parse_period_to_dates(
+        period, db_range.get("max_date") if db_range.get("has_data") else None
+    )
+
+
+def load_dashboard_data(session: Session, period: str) -> dict:
+    """
+    Run every dashboard query for a period in one session.
+
+    Args:
+        session: Database session
+        period: Time period filter ("3days", "7days", "1month", "3months", "1year")
+
+    Returns:
+        Dictionary with the period bounds, stats, platform_stats, latency
+        and recent_downloads
+    """
+    start_date, end_date = get_period_dates(session, period)
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "stats": get_dashboard_stats(session, start_date, end_date),
+        "platform_stats": get_platform_statistics(session, start_date, end_date),
+        "latency": get_latency_percentiles(session, start_date, end_date),
+        "recent_downloads": get_recent_downloads(
+            session, start_date, end_date, limit=10
+        ),
+    }
+
+
+async def get_dashboard_snapshot(period: str) -> dict:
+    """
+    Cached dashboard data for a period, with the pages rendered from it.
+
+    Args:
+        period: One of PERIOD_DAYS
+
+    Returns:
+        Dictionary with "data" (load_dashboard_data() output) and "pages"
+        (rendered pages by masked API key, filled by render_dashboard())
+    """
+
+    async def load() -> dict:
+        # Query off the event loop: asyncpg when enabled, a worker thread otherwise
+        data = await run_with_session(load_dashboard_data, period)
+        return {"data": data, "pages": {}}
+
+    return await dashboard_cache.get(period, load)
+
+
+def render_dashboard(snapshot: dict, api_key_masked: str) -> tuple[str, str]:
+    """
+    Render dashboard.html from a snapshot, once per snapshot and API key.
+
+    Args:
+        snapshot: get_dashboard_snapshot() output
+        api_key_masked: Masked API key shown on the page
+
+    Returns:
+        Tuple of (ETag, HTML)
+    """
+    pages = snapshot["pages"]
+    page = pages.get(api_key_masked)
+    if page is None:
+        html = templates.get_template("dashboard.html").render(
+            api_key_masked=api_key_masked, **snapshot["data"]
+        )
+        etag = '"' + hashlib.sha1(html.encode()).hexdigest() + '"'
+        if len(pages) >= DASHBOARD_PAGES_PER_PERIOD:
+            pages.clear()
+        page = pages[api_key_masked] = (etag, html)
+    return page
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header (weak comparison) matches etag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def get_dashboard_cache_stats() -> dict:
+    """Dashboard cache hit/miss counts."""
+    return {
+        **dashboard_cache.stats(),
+        "ttl": DASHBOARD_CACHE_TTL,
+        "stale_ttl": DASHBOARD_CACHE_STALE_TTL,
+    }
+
+
 @web_router.get("/", response_class=HTMLResponse)
 async def welcome_page(request: Request):
     """
@@ -503,40 +790,50 @@ async def dashboard_page(
     request: Request,
     api_key: str = "demo-key",
     period: str = "3days",
-    session: Session = Depends(get_session),
 ):
     """
     Render the analytics dashboard with real data from database.
 
+    Data and rendered HTML are cached per period (see DASHBOARD_CACHE_TTL),
+    and a request whose If-None-Match still matches gets an empty 304.
+
     Args:
         request: FastAPI request object
         api_key: API key from query parameter (for display purposes)
         period: Time period filter ("3days", "7days", "1month", "3months", "1year")
-        session: Database session
     """
-    # Get database date range first to use actual data dates
-    db_range = get_database_date_range(session)
+    if period not in PERIOD_DAYS:
+        period = DEFAULT_PERIOD
+    snapshot = await get_dashboard_snapshot(period)
 
-    # Parse period using actual database dates (fixes issue with future dates)
-    start_date, end_date = parse_period_to_dates(
-        period, db_range.get("max_date") if db_range.get("has_data") else None
-    )
+    # Mask the API key for display
+    etag, html = render_dashboard(snapshot, mask_api_key(api_key))
 
-    # Get real data from database
-    stats = get_dashboard_stats(session, start_date, end_date)
-    platform_stats = get_platform_statistics(session, start_date, end_date)
-    recent_downloads = get_recent_downloads(session, start_date, end_date, limit=10)
+    # no-cache: browsers may keep the page but must revalidate it each time
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(html, headers=headers)
 
-    # Mask the API key for display
-    api_key_masked = mask_api_key(api_key)
-
-    return templates.TemplateResponse(
-        "dashboard.html",
-        {
-            "request": request,
-            "api_key_masked": api_key_masked,
-            "stats": stats,
-            "platform_stats": platform_stats,
-            "recent_downloads": recent_downloads,
-        },
-    )
+
+@web_router.get("/dashboard/latency")
+async def dashboard_latency(period: str = "3days"):
+    """
+    Response-time percentiles (p50/p95/p99) as JSON.
+
+    Args:
+        period: Time period filter ("3days", "7days", "1month", "3months", "1year")
+
+    Returns:
+        dict: Period bounds plus overall, per-platform and per-provider
+        percentiles in seconds
+    """
+    if period not in PERIOD_DAYS:
+        period = DEFAULT_PERIOD
+    data = (await get_dashboard_snapshot(period))["data"]
+    return {
+        "period": period,
+        "start": data["start_date"].isoformat(),
+        "end": data["end_date"].isoformat(),
+        **data["latency"],
+    }
@@ -0,0 +1 @@
+# Shared application services (HTTP client, caches, background jobs)
@@ -0,0 +1,181 @@
+import asyncio
+import os
+import time
+from typing import Dict
+
+import aiohttp
+
+# Consecutive failures that open a host's circuit
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+
+# How long an open circuit rejects requests before probing; doubles after
+# each failed probe up to CIRCUIT_MAX_OPEN_SECONDS
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+CIRCUIT_MAX_OPEN_SECONDS = float(os.getenv("CIRCUIT_MAX_OPEN_SECONDS", "300"))
+
+# Requests let through at once while half-open
+CIRCUIT_HALF_OPEN_PROBES = int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", "1"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {host}, retry in {retry_in:.1f}s")
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one upstream host.
+
+    Closed: requests flow, consecutive failures are counted.
+    Open: requests are rejected immediately until the open period ends.
+    Half-open: a few probe requests are let through; one success closes the
+    circuit, one failure re-opens it for twice as long.
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self.state = CLOSED
+        self.failures = 0
+        self.open_seconds = CIRCUIT_OPEN_SECONDS
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.trips = 0
+        self.rejected = 0
+
+    def before_request(self) -> bool:
+        """
+        Admit or reject a request.
+
+        Returns:
+            bool: True if the request is a half-open probe
+
+        Raises:
+            CircuitOpenError: If the circuit is open or all probe slots are taken
+        """
+        if self.state == CLOSED:
+            return False
+
+        now = time.monotonic()
+        if self.state == OPEN:
+            retry_in = self.opened_at + self.open_seconds - now
+            if retry_in > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.host, retry_in)
+            self.state = HALF_OPEN
+
+        if self.probes_in_flight >= CIRCUIT_HALF_OPEN_PROBES:
+            self.rejected += 1
+            raise CircuitOpenError(self.host, 0)
+        self.probes_in_flight += 1
+        return True
+
+    def record_success(self, probe: bool):
+        if probe:
+            self.probes_in_flight -= 1
+        if self.state != CLOSED:
+            print(f"🟢 Circuit closed for {self.host}")
+        self.state = CLOSED
+        self.failures = 0
+        self.open_seconds = CIRCUIT_OPEN_SECONDS
+
+    def record_failure(self, probe: bool):
+        if probe:
+            self.probes_in_flight -= 1
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            # Failed probe: back off harder before the next one
+            self.open_seconds = min(self.open_seconds * 2, CIRCUIT_MAX_OPEN_SECONDS)
+            self._open()
+        elif self.state == CLOSED and self.failures >= CIRCUIT_FAILURE_THRESHOLD:
+            self._open()
+
+    def release(self, probe: bool):
+        """Forget a request that ended without a verdict (e.g. cancelled)."""
+        if probe:
+            self.probes_in_flight -= 1
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        print(
+            f"🔴 Circuit open for {self.host} after {self.failures} failures "
+            f"({self.open_seconds:.0f}s)"
+        )
+
+    def stats(self) -> dict:
+        retry_in = 0.0
+        if self.state == OPEN:
+            retry_in = max(self.opened_at + self.open_seconds - time.monotonic(), 0)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_in": round(retry_in, 1),
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+# One breaker per upstream host, shared by every downloader
+breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(host: str) -> CircuitBreaker:
+    breaker = breakers.get(host)
+    if breaker is None:
+        breaker = breakers[host] = CircuitBreaker(host)
+    return breaker
+
+
+def is_failure_status(status: int) -> bool:
+    """Server errors and rate limiting count against a host; 4xx do not."""
+    return status >= 500 or status == 429
+
+
+async def _on_request_start(session, ctx, params: aiohttp.TraceRequestStartParams):
+    ctx.breaker = get_breaker(params.url.host or "")
+    ctx.probe = ctx.breaker.before_request()
+
+
+async def _on_request_end(session, ctx, params: aiohttp.TraceRequestEndParams):
+    if is_failure_status(params.response.status):
+        ctx.breaker.record_failure(ctx.probe)
+    else:
+        ctx.breaker.record_success(ctx.probe)
+
+
+async def _on_request_exception(
+    session, ctx, params: aiohttp.TraceRequestExceptionParams
+):
+    if isinstance(params.exception, asyncio.CancelledError):
+        # A cancelled race loser says nothing about the host's health
+        ctx.breaker.release(ctx.probe)
+    else:
+        ctx.breaker.record_failure(ctx.probe)
+
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """TraceConfig that routes every request through its host's breaker."""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_request_end.append(_on_request_end)
+    trace_config.on_request_exception.append(_on_request_exception)
+    return trace_config
+
+
+def get_breaker_stats() -> dict:
+    """Breaker state for hosts that have failed or tripped; others are counted."""
+    hosts = {
+        host: breaker.stats()
+        for host, breaker in breakers.items()
+        if breaker.state != CLOSED or breaker.failures or breaker.trips
+    }
+    return {"hosts_tracked": len(breakers), "hosts": hosts}
@@ -0,0 +1,373 @@
+import asyncio
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from ..database import database
+from ..database.migrations import download_history_partitioned
+from ..models.download_rollup import (
+    DownloadRollupDaily,
+    DownloadRollupHourly,
+    ProviderRollupHourly,
+)
+from .rollups import rebuild_rollups
+
+# Monthly partitions created ahead of the current month
+HISTORY_PARTITIONS_AHEAD = int(os.getenv("HISTORY_PARTITIONS_AHEAD", "2"))
+
+# Raw history older than this many days is dropped a whole partition at a
+# time, once its rows are confirmed in the rollups. 0 keeps it forever.
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "0"))
+
+# Hourly rollups older than this are deleted, leaving the daily ones.
+# Keep it above the longest dashboard period (1 year). 0 keeps them forever.
+ROLLUP_HOURLY_RETENTION_DAYS = int(os.getenv("ROLLUP_HOURLY_RETENTION_DAYS", "400"))
+
+# Seconds between maintenance runs
+HISTORY_MAINTENANCE_INTERVAL = float(os.getenv("HISTORY_MAINTENANCE_INTERVAL", "3600"))
+
+# Arbitrary key keeping app workers from running maintenance together
+MAINTENANCE_LOCK_ID = 7_340_212
+
+DEFAULT_PARTITION = "download_history_default"
+
+_BOUND = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+_maintenance: Optional[asyncio.Task] = None
+_stats = {
+    "runs": 0,
+    "last_run": None,
+    "partitions": 0,
+    "created": 0,
+    "dropped": 0,
+    "rows_dropped": 0,
+    "hourly_rollups_deleted": 0,
+    "errors": 0,
+}
+
+
+def month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(moment: datetime, months: int) -> datetime:
+    month = moment.month - 1 + months
+    return moment.replace(year=moment.year + month // 12, month=month % 12 + 1)
+
+
+def partition_name(lower: datetime) -> str:
+    return f"download_history_p{lower:%Y%m}"
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    if value == "MINVALUE":
+        return None
+    return datetime.fromisoformat(value.strip("'"))
+
+
+def list_history_partitions(
+    conn: Connection,
+) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+    """
+    Range partitions of download_history, oldest first.
+
+    Args:
+        conn: Database connection
+
+    Returns:
+        List of (name, lower bound or None for MINVALUE, upper bound);
+        the DEFAULT partition is left out
+    """
+    rows = conn.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'download_history'::regclass"
+        )
+    ).all()
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND.search(bound)
+        if match:
+            lower, upper = (_parse_bound(value) for value in match.groups())
+            partitions.append((name, lower, upper))
+    return sorted(partitions, key=lambda p: p[2])
+
+
+def _covered(partitions: list, lower: datetime, upper: datetime) -> bool:
+    return any(
+        (start is None or start < upper) and end > lower for _, start, end in partitions
+    )
+
+
+def _create_partition(conn: Connection, lower: datetime) -> str:
+    name = partition_name(lower)
+    conn.execute(
+        text(
+            f"CREATE TABLE {name} PARTITION OF download_history "
+            f"FOR VALUES FROM ('{lower:%Y-%m-%d}') "
+            f"TO ('{add_months(lower, 1):%Y-%m-%d}')"
+        )
+    )
+    return name
+
+
+def ensure_history_partitions(conn: Connection, now: datetime) -> List[str]:
+    """
+    Create monthly partitions up to HISTORY_PARTITIONS_AHEAD months ahead.
+
+    Every month from the oldest partition (or the oldest row in DEFAULT)
+    onwards is checked, so a month missed by an earlier run is filled in
+    later instead of being left to DEFAULT for good. A DEFAULT partition
+    catches rows outside every range, so an insert never fails for want of
+    a partition; rows it holds for a month being created are moved into
+    the new partition.
+
+    Args:
+        conn: Connection inside the caller's transaction
+        now: Current time (naive UTC)
+
+    Returns:
+        List of created partition names
+    """
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} "
+            "PARTITION OF download_history DEFAULT"
+        )
+    )
+    partitions = list_history_partitions(conn)
+    stray = dict(
+        conn.execute(
+            text(
+                "SELECT date_trunc('month', created_at), count(*) "
+                f"FROM {DEFAULT_PARTITION} GROUP BY 1"
+            )
+        ).all()
+    )
+
+    first = month_start(now)
+    for _, lower, upper in partitions:
+        first = min(first, upper if lower is None else lower)
+    if stray:
+        first = min(first, min(stray))
+    last = add_months(month_start(now), HISTORY_PARTITIONS_AHEAD + 1)
+
+    missing = []
+    lower = first
+    while lower < last:
+        if not _covered(partitions, lower, add_months(lower, 1)):
+            missing.append(lower)
+        lower = add_months(lower, 1)
+
+    created = []
+    for lower in [month for month in missing if month not in stray]:
+        try:
+            with conn.begin_nested():
+                created.append(_create_partition(conn, lower))
+        except Exception as e:
+            _stats["errors"] += 1
+            print(
+                f"⚠️  Could not create history partition {partition_name(lower)}: {e}"
+            )
+
+    occupied = [month for month in missing if month in stray]
+    if occupied:
+        # A partition cannot be created over rows DEFAULT already holds for
+        # its range: detach DEFAULT, create the partitions, move the rows
+        # over and re-attach. The parent stays locked until commit.
+        try:
+            with conn.begin_nested():
+                conn.execute(
+                    text(
+                        "ALTER TABLE download_history "
+                        f"DETACH PARTITION {DEFAULT_PARTITION}"
+                    )
+                )
+                names = []
+                for lower in occupied:
+                    name = _create_partition(conn, lower)
+                    bounds = {"lower": lower, "upper": add_months(lower, 1)}
+                    where = "WHERE created_at >= :lower AND created_at < :upper"
+                    conn.execute(
+                        text(
+                            f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} "
+                            + where
+                        ),
+                        bounds,
+                    )
+                    conn.execute(
+                        text(f"DELETE FROM {DEFAULT_PARTITION} " + where), bounds
+                    )
+                    names.append(name)
+                conn.execute(
+                    text(
+                        "ALTER TABLE download_history "
+                        f"ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"
+                    )
+                )
+            created += names
+            moved = sum(stray[month] for month in occupied)
+            print(f"🗂️  Moved {moved} history rows out of {DEFAULT_PARTITION}")
+        except Exception as e:
+            _stats["errors"] += 1
+            print(f"⚠️  Could not move history rows out of {DEFAULT_PARTITION}: {e}")
+    return sorted(created)
+
+
+def drop_expired_history(conn: Connection, now: datetime) -> List[str]:
+    """
+    Drop partitions entirely older than HISTORY_RETENTION_DAYS.
+
+    Each partition's row count is checked against the daily rollups first;
+    if they disagree the rollups for its range are rebuilt from its rows
+    before it is dropped, so the dashboard keeps its numbers.
+
+    Args:
+        conn: Connection inside the caller's transaction
+        now: Current time (naive UTC)
+
+    Returns:
+        List of dropped partition names
+    """
+    if HISTORY_RETENTION_DAYS <= 0:
+        return []
+    cutoff = now - timedelta(days=HISTORY_RETENTION_DAYS)
+
+    dropped = []
+    for name, lower, upper in list_history_partitions(conn):
+        if upper > cutoff:
+            break
+        rows = conn.execute(text(f"SELECT count(*) FROM {name}")).scalar_one()
+        rolled_up = conn.execute(
+            text(
+                f"SELECT coalesce(sum(count), 0) FROM {DownloadRollupDaily.__tablename__} "
+                "WHERE bucket >= :lower AND bucket < :upper"
+            ),
+            {"lower": lower or datetime.min, "upper": upper},
+        ).scalar_one()
+        if rows != rolled_up:
+            print(f"📦 Rebuilding rollups for {name} ({rows} rows) before dropping")
+            rebuild_rollups(conn, lower, upper)
+
+        conn.execute(text(f"DROP TABLE {name}"))
+        _stats["rows_dropped"] += rows
+        dropped.append(name)
+    return dropped
+
+
+def downsample_rollups(conn: Connection, now: datetime) -> int:
+    """
+    Delete hourly rollups older than ROLLUP_HOURLY_RETENTION_DAYS.
+
+    Args:
+        conn: Connection inside the caller's transaction
+        now: Current time (naive UTC)
+
+    Returns:
+        int: Hourly rollup rows deleted
+    """
+    if ROLLUP_HOURLY_RETENTION_DAYS <= 0:
+        return 0
+    cutoff = now - timedelta(days=ROLLUP_HOURLY_RETENTION_DAYS)
+    deleted = 0
+    for model in (DownloadRollupHourly, ProviderRollupHourly):
+        result = conn.execute(
+            text(f"DELETE FROM {model.__tablename__} WHERE bucket < :cutoff"),
+            {"cutoff": cutoff},
+        )
+        deleted += result.rowcount
+    return deleted
+
+
+def run_history_maintenance(now: Optional[datetime] = None) -> bool:
+    """
+    Create upcoming partitions, apply retention and downsample rollups.
+
+    Only one app worker runs it at a time; the others skip the run.
+
+    Args:
+        now: Current time (naive UTC), defaults to now
+
+    Returns:
+        bool: Whether this worker ran the maintenance
+    """
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    with database.engine.begin() as conn:
+        locked = conn.execute(
+            text("SELECT pg_try_advisory_xact_lock(:lock_id)"),
+            {"lock_id": MAINTENANCE_LOCK_ID},
+        ).scalar_one()
+        if not locked:
+            return False
+
+        created, dropped = [], []
+        # Until the offline conversion (database/partition_history.py) has
+        # run there are no partitions to manage
+        if download_history_partitioned(conn):
+            created = ensure_history_partitions(conn, now)
+            dropped = drop_expired_history(conn, now)
+            _stats["partitions"] = len(list_history_partitions(conn))
+        deleted = downsample_rollups(conn, now)
+
+    _stats["runs"] += 1
+    _stats["last_run"] = now.isoformat()
+    _stats["created"] += len(created)
+    _stats["dropped"] += len(dropped)
+    _stats["hourly_rollups_deleted"] += deleted
+    if created or dropped:
+        print(f"🗂️  History partitions: created {created}, dropped {dropped}")
+    return True
+
+
+async def _run_maintenance_loop():
+    while True:
+        await asyncio.sleep(HISTORY_MAINTENANCE_INTERVAL)
+        try:
+            await asyncio.to_thread(run_history_maintenance)
+        except Exception as e:
+            _stats["errors"] += 1
+            print(f"⚠️  History maintenance failed: {e}")
+
+
+async def start_history_maintenance():
+    """
+    Run partition maintenance now, then every HISTORY_MAINTENANCE_INTERVAL.
+    Call this function on application startup, before the history writer.
+    """
+    global _maintenance
+    try:
+        await asyncio.to_thread(run_history_maintenance)
+    except Exception as e:
+        _stats["errors"] += 1
+        print(f"⚠️  History maintenance failed: {e}")
+    if _maintenance is None or _maintenance.done():
+        _maintenance = asyncio.create_task(_run_maintenance_loop())
+
+
+async def stop_history_maintenance():
+    """
+    Stop the periodic maintenance task.
+    Call this function on application shutdown.
+    """
+    global _maintenance
+    if _maintenance is not None:
+        _maintenance.cancel()
+        try:
+            await _maintenance
+        except asyncio.CancelledError:
+            pass
+        _maintenance = None
+
+
+def get_history_maintenance_stats() -> dict:
+    """Partition and retention counters for monitoring."""
+    return {
+        **_stats,
+        "retention_days": HISTORY_RETENTION_DAYS,
+        "running": _maintenance is not None and not _maintenance.done(),
+    }
@@ -0,0 +1,182 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import insert
+
+from ..database import database
+from ..models.download_history import DownloadHistory
+from .rollups import rollup_upserts
+
+# Records waiting to be written; beyond this the overflow policy applies
+HISTORY_QUEUE_SIZE = int(os.getenv("HISTORY_QUEUE_SIZE", "10000"))
+
+# Rows per multi-row INSERT, and the longest a record waits for a batch
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "500"))
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1.0"))
+
+# What to discard when the queue is full: "drop_newest" or "drop_oldest"
+HISTORY_OVERFLOW = os.getenv("HISTORY_OVERFLOW", "drop_newest")
+
+# How long shutdown waits for the queue to drain
+HISTORY_SHUTDOWN_TIMEOUT = float(os.getenv("HISTORY_SHUTDOWN_TIMEOUT", "10"))
+
+_COLUMNS = [column.name for column in DownloadHistory.__table__.columns]
+
+_queue: Optional[asyncio.Queue] = None
+_writer: Optional[asyncio.Task] = None
+_stats = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0, "batches": 0}
+
+
+def _get_queue() -> asyncio.Queue:
+    global _queue
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=HISTORY_QUEUE_SIZE)
+    return _queue
+
+
+def enqueue_history(**fields):
+    """
+    Queue a DownloadHistory row for the background writer without blocking.
+
+    created_at is stamped now, so rows keep their request time however long
+    they wait. When the queue is full the HISTORY_OVERFLOW policy discards a
+    record instead of slowing the request down.
+
+    Args:
+        **fields: DownloadHistory column values
+    """
+    created_at = fields.get("created_at") or datetime.now(timezone.utc)
+    # The column is TIMESTAMP WITHOUT TIME ZONE; asyncpg rejects aware values
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    fields["created_at"] = created_at
+    row = {name: fields.get(name) for name in _COLUMNS if name != "id"}
+
+    queue = _get_queue()
+    if queue.full():
+        _stats["dropped"] += 1
+        if HISTORY_OVERFLOW != "drop_oldest":
+            return
+        queue.get_nowait()
+    queue.put_nowait(row)
+    _stats["enqueued"] += 1
+
+
+def _insert_batch(rows: List[dict]):
+    # One executemany; SQLAlchemy batches it into multi-row INSERT ... VALUES.
+    # The rollups are updated in the same transaction, so they never drift.
+    with database.engine.begin() as conn:
+        conn.execute(insert(DownloadHistory.__table__), rows)
+        for statement, params in rollup_upserts(rows):
+            conn.execute(statement, params)
+
+
+async def _insert_batch_async(rows: List[dict]):
+    if database.async_engine is None:
+        await asyncio.to_thread(_insert_batch, rows)
+        return
+    async with database.async_engine.begin() as conn:
+        await conn.execute(insert(DownloadHistory.__table__), rows)
+        for statement, params in rollup_upserts(rows):
+            await conn.execute(statement, params)
+
+
+async def _write_batch(rows: List[dict]):
+    try:
+        await _insert_batch_async(rows)
+        _stats["written"] += len(rows)
+        _stats["batches"] += 1
+    except Exception as e:
+        _stats["failed"] += len(rows)
+        print(f"Failed to save history batch of {len(rows)}: {e}")
+
+
+async def _collect_batch(queue: asyncio.Queue, rows: List[dict]):
+    # Wait for the first row, then top the batch up for at most one interval
+    rows.append(await queue.get())
+    deadline = asyncio.get_running_loop().time() + HISTORY_FLUSH_INTERVAL
+    while len(rows) < HISTORY_BATCH_SIZE:
+        try:
+            rows.append(queue.get_nowait())
+            continue
+        except asyncio.QueueEmpty:
+            pass
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            break
+        try:
+            rows.append(await asyncio.wait_for(queue.get(), remaining))
+        except asyncio.TimeoutError:
+            break
+
+
+async def _run_writer(queue: asyncio.Queue):
+    while True:
+        rows = []
+        try:
+            await _collect_batch(queue, rows)
+        except asyncio.CancelledError:
+            # Shutting down: rows already taken off the queue still get written
+            if rows:
+                await _write_batch(rows)
+            raise
+
+        write = asyncio.ensure_future(_write_batch(rows))
+        try:
+            await asyncio.shield(write)
+        except asyncio.CancelledError:
+            await write
+            raise
+
+
+async def _drain(queue: asyncio.Queue):
+    while not queue.empty():
+        rows = []
+        while len(rows) < HISTORY_BATCH_SIZE and not queue.empty():
+            rows.append(queue.get_nowait())
+        await _write_batch(rows)
+
+
+async def start_history_writer():
+    """
+    Start the background task that writes queued history in batches.
+    Call this function on application startup.
+    """
+    global _writer
+    if _writer is None or _writer.done():
+        _writer = asyncio.create_task(_run_writer(_get_queue()))
+
+
+async def stop_history_writer():
+    """
+    Stop the writer and flush whatever is still queued.
+    Call this function on application shutdown.
+    """
+    global _writer
+    if _writer is not None:
+        _writer.cancel()
+        try:
+            await _writer
+        except asyncio.CancelledError:
+            pass
+        _writer = None
+
+    queue = _get_queue()
+    pending = queue.qsize()
+    try:
+        await asyncio.wait_for(_drain(queue), HISTORY_SHUTDOWN_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"⚠️  History flush timed out, {queue.qsize()} records lost")
+    if pending:
+        print(f"💾 Flushed {pending - queue.qsize()} queued history records")
+
+
+def get_history_writer_stats() -> dict:
+    """Queue depth and write counters for monitoring."""
+    return {
+        **_stats,
+        "queued": _queue.qsize() if _queue is not None else 0,
+        "running": _writer is not None and not _writer.done(),
+    }
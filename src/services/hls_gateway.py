@@ -0,0 +1,471 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import mimetypes
+import os
+import re
+import secrets
+import tempfile
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit
+
+from .media_proxy import ProxyError, open_upstream
+from .result_cache import TTLCache
+from .single_flight import SingleFlight
+
+# Directory holding cached segments; survives restarts
+HLS_CACHE_DIR = os.getenv(
+    "HLS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "j-video-downloader-hls")
+)
+
+# Total size of cached segments; least recently used ones are evicted past it
+HLS_CACHE_MAX_BYTES = int(os.getenv("HLS_CACHE_MAX_BYTES", str(1024**3)))
+
+# Larger responses (e.g. a whole file addressed by EXT-X-BYTERANGE) are
+# streamed through the proxy instead of cached
+HLS_MAX_SEGMENT_BYTES = int(os.getenv("HLS_MAX_SEGMENT_BYTES", str(32 * 1024**2)))
+HLS_MAX_PLAYLIST_BYTES = 1024**2
+
+# Segments fetched ahead of the one a viewer requests
+HLS_PREFETCH_SEGMENTS = int(os.getenv("HLS_PREFETCH_SEGMENTS", "3"))
+
+# Lifetime of the signed gateway URLs written into rewritten playlists
+HLS_TOKEN_TTL = float(os.getenv("HLS_TOKEN_TTL", "21600"))
+
+# Key signing gateway URLs. Set it when running more than one worker, or a
+# URL signed by one worker is refused by the others.
+HLS_SIGNING_KEY = os.getenv("HLS_SIGNING_KEY", "").encode() or secrets.token_bytes(32)
+
+PLAYLIST_MEDIA_TYPE = "application/vnd.apple.mpegurl"
+
+SEGMENT_MEDIA_TYPES = {
+    ".ts": "video/mp2t",
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4",
+    ".m4a": "audio/mp4",
+    ".aac": "audio/aac",
+    ".vtt": "text/vtt",
+}
+
+# Per-viewer signature and expiry query parameters of common CDNs
+# (CloudFront, Akamai, S3, GCS and generic token schemes). They do not
+# select content, so they are ignored in segment cache keys.
+SEGMENT_SIGNATURE_PARAMS = {
+    "expires",
+    "signature",
+    "key-pair-id",
+    "policy",
+    "hdnts",
+    "hdnea",
+    "__token__",
+    "token",
+    "googleaccessid",
+}
+SEGMENT_SIGNATURE_PREFIXES = ("x-amz-", "x-goog-")
+
+# Tags whose URI attribute names a playlist rather than a segment
+_PLAYLIST_URI_TAGS = (
+    "#EXT-X-MEDIA:",
+    "#EXT-X-I-FRAME-STREAM-INF:",
+    "#EXT-X-RENDITION-REPORT:",
+)
+# Tags whose URI attribute must reach the client but is never cached
+_UNCACHED_URI_TAGS = ("#EXT-X-KEY:", "#EXT-X-SESSION-KEY:")
+_URI_ATTRIBUTE = re.compile(r'URI="([^"]*)"')
+
+# Segment URLs of recently rewritten media playlists, for prefetching
+_playlists = TTLCache(max_entries=2000, default_ttl=HLS_TOKEN_TTL)
+_fetches = SingleFlight()
+_prefetches: set = set()
+_stats = {
+    "playlists": 0,
+    "hits": 0,
+    "misses": 0,
+    "prefetched": 0,
+    "uncacheable": 0,
+    "errors": 0,
+}
+
+
+def sign_token(fields: dict) -> str:
+    """Encode fields with an expiry into a URL-safe token signed with HLS_SIGNING_KEY."""
+    payload = base64.urlsafe_b64encode(
+        json.dumps({**fields, "e": int(time.time() + HLS_TOKEN_TTL)}).encode()
+    ).decode()
+    signature = hmac.new(HLS_SIGNING_KEY, payload.encode(), hashlib.sha256)
+    return f"{payload}.{signature.hexdigest()[:32]}"
+
+
+def verify_token(token: str) -> dict:
+    """
+    Check a token from sign_token() and return its fields.
+
+    Raises:
+        ProxyError: If the token is malformed, forged or expired
+    """
+    payload, _, signature = token.partition(".")
+    expected = hmac.new(HLS_SIGNING_KEY, payload.encode(), hashlib.sha256)
+    if not hmac.compare_digest(signature.encode(), expected.hexdigest()[:32].encode()):
+        raise ProxyError(403, "Invalid gateway token")
+    fields = json.loads(base64.urlsafe_b64decode(payload))
+    if fields["e"] < time.time():
+        raise ProxyError(403, "Gateway token expired")
+    return fields
+
+
+def gateway_url(kind: str, **fields) -> str:
+    return f"/download/hls/{kind}?" + urlencode({"t": sign_token(fields)})
+
+
+def playlist_id(url: str) -> str:
+    return hashlib.sha1(url.encode()).hexdigest()[:16]
+
+
+def segment_cache_key(url: str) -> str:
+    """
+    Cache key of a segment: its scheme, host, path and query.
+
+    Known CDN signature and expiry parameters (SEGMENT_SIGNATURE_PARAMS) are
+    left out of the query so every viewer of a stream shares one copy; any
+    other parameter may select the segment and is kept.
+    """
+    parts = urlsplit(url)
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in SEGMENT_SIGNATURE_PARAMS
+        and not name.lower().startswith(SEGMENT_SIGNATURE_PREFIXES)
+    )
+    host = (parts.netloc.rpartition("@")[2]).lower()
+    key = f"{parts.scheme}://{host}{parts.path}?{urlencode(query)}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def segment_media_type(url: str) -> str:
+    extension = os.path.splitext(urlsplit(url).path)[1].lower()
+    return SEGMENT_MEDIA_TYPES.get(extension) or (
+        mimetypes.guess_type(urlsplit(url).path)[0] or "application/octet-stream"
+    )
+
+
+def rewrite_playlist(text: str, base_url: str) -> Tuple[str, List[str]]:
+    """
+    Point every URI of an HLS playlist at the gateway.
+
+    Works for master and media playlists alike: variant and rendition URIs
+    become /download/hls/playlist URLs, segments and init sections
+    /download/hls/segment URLs, and keys uncached segment URLs.
+
+    Args:
+        text: Playlist as fetched
+        base_url: URL it was fetched from, for resolving relative URIs
+
+    Returns:
+        Tuple of (rewritten playlist, absolute segment URLs in order)
+    """
+    pid = playlist_id(base_url)
+    segments: List[str] = []
+
+    def segment(url: str) -> str:
+        segments.append(url)
+        return gateway_url("segment", u=url, p=pid, i=len(segments) - 1, c=1)
+
+    def rewrite_attribute(tag: str, url: str) -> str:
+        if tag.startswith(_PLAYLIST_URI_TAGS):
+            return gateway_url("playlist", u=url)
+        if tag.startswith(_UNCACHED_URI_TAGS):
+            return gateway_url("segment", u=url, c=0)
+        return segment(url)
+
+    lines = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("#"):
+            if 'URI="' in stripped:
+                line = _URI_ATTRIBUTE.sub(
+                    lambda m: 'URI="%s"'
+                    % rewrite_attribute(stripped, urljoin(base_url, m.group(1))),
+                    line,
+                )
+            lines.append(line)
+        elif stripped:
+            # A URI line names a variant playlist after EXT-X-STREAM-INF,
+            # a segment anywhere else
+            url = urljoin(base_url, stripped)
+            if lines and lines[-1].startswith("#EXT-X-STREAM-INF"):
+                lines.append(gateway_url("playlist", u=url))
+            else:
+                lines.append(segment(url))
+        else:
+            lines.append(line)
+    return "\n".join(lines) + "\n", segments
+
+
+_ATTRIBUTE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def parse_attributes(tag: str) -> dict:
+    """Attribute list of an HLS tag, e.g. BANDWIDTH of EXT-X-STREAM-INF."""
+    attributes = tag.partition(":")[2]
+    return {name: value.strip('"') for name, value in _ATTRIBUTE.findall(attributes)}
+
+
+def parse_variants(text: str, base_url: str) -> List[dict]:
+    """
+    Variant streams of a master playlist.
+
+    Returns:
+        List of the EXT-X-STREAM-INF attributes plus "url"; empty for a
+        media playlist
+    """
+    variants = []
+    attributes = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-STREAM-INF:"):
+            attributes = parse_attributes(line)
+        elif line and not line.startswith("#") and attributes is not None:
+            variants.append({**attributes, "url": urljoin(base_url, line)})
+            attributes = None
+    return variants
+
+
+def parse_segments(text: str, base_url: str) -> List[str]:
+    """
+    Segment URLs of a media playlist in playback order, the EXT-X-MAP init
+    section first.
+
+    Raises:
+        ProxyError: If the segments are encrypted or byte ranges of one
+            file, which cannot simply be concatenated
+    """
+    segments = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-KEY:"):
+            if parse_attributes(line).get("METHOD", "NONE") != "NONE":
+                raise ProxyError(422, "Encrypted HLS streams are not supported")
+        elif line.startswith("#EXT-X-BYTERANGE"):
+            raise ProxyError(422, "Byte-range HLS playlists are not supported")
+        elif line.startswith("#EXT-X-MAP:"):
+            uri = parse_attributes(line).get("URI")
+            if uri and urljoin(base_url, uri) not in segments:
+                segments.append(urljoin(base_url, uri))
+        elif line and not line.startswith("#"):
+            segments.append(urljoin(base_url, line))
+    return segments
+
+
+async def read_playlist(url: str) -> Tuple[str, str]:
+    """
+    Fetch an HLS playlist as-is.
+
+    Returns:
+        Tuple of (playlist text, final URL after redirects)
+
+    Raises:
+        ProxyError: If the URL is refused, upstream fails or the body is
+            not a playlist
+    """
+    upstream = await open_upstream(url)
+    body = await upstream.read(HLS_MAX_PLAYLIST_BYTES)
+    text = body.decode("utf-8", errors="replace")
+    if not text.lstrip("\ufeff").startswith("#EXTM3U"):
+        raise ProxyError(502, "Upstream did not return an HLS playlist")
+    return text, str(upstream.response.url)
+
+
+async def fetch_playlist(url: str) -> str:
+    """
+    Fetch an HLS playlist and rewrite it for the gateway.
+
+    Args:
+        url: Master or media playlist URL
+
+    Returns:
+        str: The rewritten playlist
+
+    Raises:
+        ProxyError: If the URL is refused, upstream fails or the body is
+            not a playlist
+    """
+    # Relative URIs resolve against the final URL, after any redirect
+    text, final_url = await read_playlist(url)
+    playlist, segments = rewrite_playlist(text, final_url)
+    _stats["playlists"] += 1
+    if segments:
+        _playlists.set(playlist_id(final_url), segments)
+    return playlist
+
+
+class SegmentCache:
+    """
+    Size-bounded LRU cache of segment bodies on local disk.
+
+    The index lives in memory and is rebuilt from the directory on first
+    use, oldest file first. File writes and deletes run in worker threads.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._loaded = False
+        self.evictions = 0
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _scan(self) -> List[Tuple[str, int]]:
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        return [(name, size) for _, name, size in sorted(files)]
+
+    async def load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        for key, size in await asyncio.to_thread(self._scan):
+            self._entries[key] = size
+            self._size += size
+        await self._evict()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of a cached segment, marked most recently used, or None."""
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self.path(key)
+
+    def _write(self, key: str, data: bytes):
+        temporary = self.path(key) + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(data)
+        os.replace(temporary, self.path(key))
+
+    async def put(self, key: str, data: bytes) -> str:
+        await asyncio.to_thread(self._write, key, data)
+        self._size += len(data) - self._entries.pop(key, 0)
+        self._entries[key] = len(data)
+        await self._evict()
+        return self.path(key)
+
+    async def _evict(self):
+        victims = []
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            victims.append(self.path(key))
+        if victims:
+            self.evictions += len(victims)
+            await asyncio.to_thread(_remove_files, victims)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+def _remove_files(paths: List[str]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+segment_cache = SegmentCache(HLS_CACHE_DIR, HLS_CACHE_MAX_BYTES)
+
+
+async def _download_segment(url: str, key: str) -> Optional[str]:
+    upstream = await open_upstream(url)
+    length = upstream.headers.get("content-length")
+    if upstream.status != 200 or (length and int(length) > HLS_MAX_SEGMENT_BYTES):
+        await upstream.close()
+        return None
+    data = await upstream.read(HLS_MAX_SEGMENT_BYTES)
+    return await segment_cache.put(key, data)
+
+
+async def get_segment(url: str) -> Optional[str]:
+    """
+    Path of a segment on disk, downloading it on a miss.
+
+    Concurrent misses for the same segment share one download.
+
+    Args:
+        url: Absolute segment URL
+
+    Returns:
+        Optional[str]: The cached file, or None if the segment cannot be
+        cached and should be streamed instead
+
+    Raises:
+        ProxyError: If the URL is refused or upstream fails
+    """
+    await segment_cache.load()
+    key = segment_cache_key(url)
+    path = segment_cache.get(key)
+    if path is not None:
+        _stats["hits"] += 1
+        return path
+
+    _stats["misses"] += 1
+    path, _ = await _fetches.do(key, lambda: _download_segment(url, key))
+    if path is None:
+        _stats["uncacheable"] += 1
+    return path
+
+
+async def _prefetch_segment(url: str):
+    try:
+        path, shared = await _fetches.do(
+            segment_cache_key(url),
+            lambda: _download_segment(url, segment_cache_key(url)),
+        )
+        if path is not None and not shared:
+            _stats["prefetched"] += 1
+    except Exception as e:
+        _stats["errors"] += 1
+        print(f"⚠️  HLS prefetch of {urlsplit(url).path} failed: {e}")
+
+
+def prefetch_after(pid: str, index: int):
+    """
+    Start downloading the HLS_PREFETCH_SEGMENTS segments that follow one.
+
+    Args:
+        pid: playlist_id() of the media playlist the segment came from
+        index: Position of the requested segment in that playlist
+    """
+    segments = _playlists.get(pid) or []
+    for url in segments[index + 1 : index + 1 + HLS_PREFETCH_SEGMENTS]:
+        if segment_cache_key(url) not in segment_cache:
+            task = asyncio.create_task(_prefetch_segment(url))
+            _prefetches.add(task)
+            task.add_done_callback(_prefetches.discard)
+
+
+def get_hls_stats() -> dict:
+    """Segment cache and prefetch counters for monitoring."""
+    return {
+        **_stats,
+        "cache": segment_cache.stats(),
+        "prefetching": len(_prefetches),
+        "playlists_tracked": len(_playlists),
+    }
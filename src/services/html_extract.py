@@ -0,0 +1,64 @@
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Use the C-backed lxml parser when the "fast-html" extra is installed,
+# otherwise fall back to Python's html.parser. HTML_PARSER overrides this.
+try:
+    import lxml  # noqa: F401
+
+    _DEFAULT_PARSER = "lxml"
+except ImportError:
+    _DEFAULT_PARSER = "html.parser"
+
+HTML_PARSER = os.getenv("HTML_PARSER", _DEFAULT_PARSER)
+
+
+def _class_matcher(wanted):
+    # While parsing, class is still the raw attribute string; match any one
+    # of its space-separated names, as find(class_=...) does on a full soup
+    wanted = {wanted} if isinstance(wanted, str) else set(wanted)
+
+    def match(value) -> bool:
+        if not value:
+            return False
+        classes = value.split() if isinstance(value, str) else value
+        return any(name in wanted for name in classes)
+
+    return match
+
+
+def parse_html(markup: str, *names, **attrs) -> BeautifulSoup:
+    """
+    Parse scraped HTML with the fastest available parser.
+
+    When tag names or attributes are given, only matching elements (and
+    everything inside them) are built into the tree, which is much cheaper
+    than a full parse when a scraper needs a handful of nodes. Searches on
+    the result work as on a full soup, but only see the kept elements.
+
+    Args:
+        markup (str): HTML document or fragment
+        *names: Tag names to keep, e.g. "div", "a"
+        **attrs: Attribute filters in SoupStrainer form, e.g.
+            class_=["preview-header", "format-card"]; a list matches any
+            value, and class_ matches individual class names
+
+    Returns:
+        BeautifulSoup: The (possibly partial) parse tree
+
+    Example:
+        soup = parse_html(html, "div", class_=["preview-header", "format-card"])
+        title = soup.find("div", class_="preview-header").find("h1").text
+    """
+    parse_only = None
+    if names or attrs:
+        if "class_" in attrs:
+            attrs["class_"] = _class_matcher(attrs["class_"])
+        parse_only = SoupStrainer(list(names) or None, **attrs)
+    return BeautifulSoup(markup, HTML_PARSER, parse_only=parse_only)
+
+
+def get_parser_info() -> dict:
+    """Which parser scraped pages go through, for monitoring."""
+    return {"parser": HTML_PARSER, "lxml_available": _DEFAULT_PARSER == "lxml"}
@@ -0,0 +1,151 @@
+import aiohttp
+import ipaddress
+import os
+import socket
+from typing import List, Optional
+
+from aiohttp.abc import AbstractResolver, ResolveResult
+from aiohttp.resolver import ThreadedResolver
+
+from .circuit_breaker import create_trace_config
+
+# Connection pool settings for all outbound scraper traffic
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "200"))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "32"))
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(
+    total=HTTP_TIMEOUT, sock_connect=HTTP_CONNECT_TIMEOUT
+)
+
+# Per-host circuit breakers applied to every session
+_breaker_trace_config = create_trace_config()
+
+_connector: Optional[aiohttp.TCPConnector] = None
+# Separate pool for client-supplied URLs (media proxy, HLS gateway)
+_public_connector: Optional[aiohttp.TCPConnector] = None
+
+
+class NonPublicAddressError(OSError):
+    """Raised when a host resolves to an address outside the public internet."""
+
+
+class PublicAddressResolver(ThreadedResolver):
+    """
+    Resolver refusing hosts that resolve to any non-public address.
+
+    The connector connects to exactly the addresses returned here, so the
+    check cannot be sidestepped by a host answering a pre-flight lookup
+    with a public address and the connection's lookup with an internal one
+    (DNS rebinding). Literal IP hosts never reach a resolver and must be
+    checked by the caller.
+    """
+
+    async def resolve(
+        self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET
+    ) -> List[ResolveResult]:
+        hosts = await super().resolve(host, port, family)
+        for entry in hosts:
+            address = ipaddress.ip_address(entry["host"].split("%", 1)[0])
+            if not address.is_global:
+                raise NonPublicAddressError(
+                    f"{host} resolves to non-public address {address}"
+                )
+        return hosts
+
+
+def _create_connector(
+    resolver: Optional[AbstractResolver] = None,
+) -> aiohttp.TCPConnector:
+    return aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        resolver=resolver,
+    )
+
+
+async def start_http_client():
+    """
+    Create the application-wide connection pool.
+    Call this function on application startup.
+    """
+    global _connector
+    if _connector is None or _connector.closed:
+        _connector = _create_connector()
+
+
+async def close_http_client():
+    """
+    Close the application-wide connection pool.
+    Call this function on application shutdown.
+    """
+    global _connector, _public_connector
+    for connector in (_connector, _public_connector):
+        if connector is not None:
+            await connector.close()
+    _connector = _public_connector = None
+
+
+def get_connector() -> aiohttp.TCPConnector:
+    """
+    Get the shared TCP connector, creating it lazily if the application
+    lifespan has not started it (e.g. when a core function is used directly).
+    """
+    global _connector
+    if _connector is None or _connector.closed:
+        _connector = _create_connector()
+    return _connector
+
+
+def get_public_connector() -> aiohttp.TCPConnector:
+    """
+    Get the connector for URLs supplied by API clients, which only ever
+    connects to public addresses (see PublicAddressResolver).
+    """
+    global _public_connector
+    if _public_connector is None or _public_connector.closed:
+        _public_connector = _create_connector(PublicAddressResolver())
+    return _public_connector
+
+
+def http_session(
+    connector: Optional[aiohttp.TCPConnector] = None, **kwargs
+) -> aiohttp.ClientSession:
+    """
+    Create a lightweight client session bound to the shared connection pool.
+
+    Sessions are cheap: they only hold a cookie jar and default settings,
+    while TCP/TLS connections and DNS lookups are reused across all
+    downloaders through the shared connector (or the one given). Each
+    scraper flow gets its own cookie jar so concurrent requests never see
+    each other's cookies.
+    Every request passes through its host's circuit breaker, so a host that
+    is down fails fast with CircuitOpenError instead of waiting for timeouts.
+
+    Example:
+        async with http_session() as session:
+            async with session.get(url, headers=headers) as resp:
+                html = await resp.text()
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    kwargs["trace_configs"] = [_breaker_trace_config, *kwargs.get("trace_configs", [])]
+    return aiohttp.ClientSession(
+        connector=connector or get_connector(), connector_owner=False, **kwargs
+    )
+
+
+def get_pool_stats() -> dict:
+    """Return a snapshot of the shared connection pool for monitoring."""
+    if _connector is None or _connector.closed:
+        return {"open": False}
+    return {
+        "open": True,
+        "limit": _connector.limit,
+        "limit_per_host": _connector.limit_per_host,
+        "dns_cache_ttl": HTTP_DNS_CACHE_TTL,
+    }
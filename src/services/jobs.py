@@ -0,0 +1,172 @@
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# How long finished jobs stay available for polling
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "900"))
+
+
+class JobStatus(str, Enum):
+    """Enum for background job status"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """
+    Handle for a background job.
+
+    Callers can await the result with wait() or poll cheaply through to_dict();
+    identical submissions share the same handle.
+    """
+
+    id: str
+    kind: str
+    key: str
+    status: JobStatus = JobStatus.PENDING
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Any = None
+    error: Optional[str] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    async def wait(self, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for the job to finish and return its result.
+
+        The underlying task is shielded, so a caller timing out or being
+        cancelled never cancels work other callers are waiting on.
+
+        Raises:
+            asyncio.TimeoutError: If the job is still running after timeout
+            Exception: Whatever the job itself raised
+        """
+        return await asyncio.wait_for(asyncio.shield(self.task), timeout)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status.value,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "progress": self.progress,
+            "result": self.result if self.status == JobStatus.COMPLETED else None,
+            "error": self.error,
+        }
+
+
+class JobRegistry:
+    """
+    In-process registry of background jobs of one kind.
+
+    Jobs are keyed so that concurrent submissions for the same work (e.g. the
+    same ssvid conversion key) coalesce onto a single background task.
+    """
+
+    def __init__(self, kind: str, result_ttl: float = JOB_RESULT_TTL):
+        self.kind = kind
+        self.result_ttl = result_ttl
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[str, str] = {}
+        _registries.append(self)
+
+    def submit(self, key: str, work: Callable[[Job], Awaitable[Any]]) -> Job:
+        """
+        Start a job for key, or return the live/finished job already running it.
+
+        Args:
+            key (str): Identity of the work, used for coalescing
+            work: Coroutine function receiving the Job (to report progress)
+
+        Returns:
+            Job: Handle that can be awaited or polled
+        """
+        self._prune()
+
+        existing_id = self._by_key.get(key)
+        if existing_id:
+            existing = self._jobs.get(existing_id)
+            if existing and existing.status != JobStatus.FAILED:
+                return existing
+
+        job = Job(id=uuid.uuid4().hex, kind=self.kind, key=key)
+        job.task = asyncio.create_task(self._run(job, work))
+        job.task.add_done_callback(_consume_task_result)
+        self._jobs[job.id] = job
+        self._by_key[key] = job.id
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        counts = {status.value: 0 for status in JobStatus}
+        for job in self._jobs.values():
+            counts[job.status.value] += 1
+        return {"kind": self.kind, "jobs": counts}
+
+    async def _run(self, job: Job, work: Callable[[Job], Awaitable[Any]]) -> Any:
+        job.status = JobStatus.RUNNING
+        job.updated_at = time.time()
+        try:
+            result = await work(job)
+        except asyncio.CancelledError:
+            job.status = JobStatus.FAILED
+            job.error = "Job cancelled"
+            job.updated_at = time.time()
+            raise
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            job.updated_at = time.time()
+            raise
+        job.result = result
+        job.status = JobStatus.COMPLETED
+        job.updated_at = time.time()
+        return result
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.done and job.updated_at < cutoff
+        ]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if self._by_key.get(job.key) == job_id:
+                del self._by_key[job.key]
+
+
+_registries: List[JobRegistry] = []
+
+
+def _consume_task_result(task: asyncio.Task):
+    # Failures are surfaced through Job.error; mark them retrieved so asyncio
+    # does not log "exception was never retrieved" for unpolled jobs
+    if not task.cancelled():
+        task.exception()
+
+
+def find_job(job_id: str) -> Optional[Job]:
+    """Look a job up by id across all registries."""
+    for registry in _registries:
+        job = registry.get(job_id)
+        if job:
+            return job
+    return None
@@ -0,0 +1,73 @@
+import math
+from typing import Dict, Iterable, Optional
+
+# Relative accuracy of every quantile read from a sketch. Stored sketches
+# are bucketed with it, so changing it requires rebuilding the rollups.
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(SKETCH_GAMMA)
+
+# Response times below this (seconds) share the lowest bucket
+SKETCH_MIN_VALUE = 0.001
+
+# Percentiles reported on the dashboard and the latency API
+REPORTED_PERCENTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+
+
+def sketch_key(value: float) -> str:
+    """
+    Bucket of a response time: ceil(log_gamma(value)), as a JSON object key.
+
+    Every value in bucket i lies in (gamma^(i-1), gamma^i], so reporting a
+    bucket's midpoint is within SKETCH_RELATIVE_ACCURACY of any value in it.
+    The same formula is used in SQL by the rollup backfill migration.
+    """
+    return str(math.ceil(math.log(max(value, SKETCH_MIN_VALUE)) / _LOG_GAMMA))
+
+
+def sketch_add(sketch: Dict[str, int], value: float, count: int = 1):
+    key = sketch_key(value)
+    sketch[key] = sketch.get(key, 0) + count
+
+
+def merge_sketches(sketches: Iterable[Dict[str, int]]) -> Dict[str, int]:
+    """Merge DDSketch-style bucket counts; the result is exact, not approximate."""
+    merged: Dict[str, int] = {}
+    for sketch in sketches:
+        for key, count in sketch.items():
+            merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+def sketch_quantile(sketch: Dict[str, int], quantile: float) -> Optional[float]:
+    """
+    Estimate a quantile from a sketch.
+
+    Args:
+        sketch: Bucket counts keyed by sketch_key()
+        quantile: Between 0 and 1, e.g. 0.95
+
+    Returns:
+        Optional[float]: The estimate in seconds, or None for an empty sketch
+    """
+    buckets = sorted((int(key), count) for key, count in sketch.items() if count)
+    total = sum(count for _, count in buckets)
+    if not total:
+        return None
+
+    rank = quantile * (total - 1)
+    seen = 0
+    for index, count in buckets:
+        seen += count
+        if seen > rank:
+            break
+    return 2 * SKETCH_GAMMA**index / (SKETCH_GAMMA + 1)
+
+
+def sketch_percentiles(sketch: Dict[str, int]) -> Dict[str, Optional[float]]:
+    """REPORTED_PERCENTILES of a sketch, rounded to milliseconds."""
+    percentiles = {}
+    for label, quantile in REPORTED_PERCENTILES.items():
+        value = sketch_quantile(sketch, quantile)
+        percentiles[label] = round(value, 3) if value is not None else None
+    return percentiles
@@ -0,0 +1,103 @@
+import asyncio
+import os
+import sys
+import traceback
+from typing import Optional
+
+# "off" disables the guard, "warn" logs each offending call site once,
+# "raise" aborts the blocking call with BlockingCallOnEventLoop
+BLOCKING_IO_GUARD = os.getenv("BLOCKING_IO_GUARD", "warn").lower()
+
+# Audit events emitted by the socket module for operations that block
+# the calling thread when performed on a blocking socket
+_GUARDED_EVENTS = {"socket.connect", "socket.getaddrinfo", "socket.gethostbyname"}
+
+_LIBRARY_PREFIXES = tuple({sys.prefix, sys.base_prefix, sys.exec_prefix})
+
+_installed = False
+_mode = "off"
+_reported_sites: set = set()
+_violations = 0
+
+
+class BlockingCallOnEventLoop(RuntimeError):
+    """Raised when a synchronous network call is made on the event loop thread."""
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _audit_hook(event: str, args: tuple):
+    global _violations
+
+    if _mode == "off" or event not in _GUARDED_EVENTS:
+        return
+    if _running_loop() is None:
+        # Worker threads (run_in_executor, asyncio's own getaddrinfo) are fine
+        return
+    if event == "socket.connect":
+        sock = args[0]
+        try:
+            if sock.gettimeout() == 0.0:
+                # Non-blocking connect issued by asyncio itself
+                return
+        except OSError:
+            return
+
+    _violations += 1
+    stack = traceback.extract_stack()[:-1]
+    # Report the innermost frame outside the stdlib and installed packages
+    site = next(
+        (
+            frame
+            for frame in reversed(stack)
+            if not frame.filename.startswith(_LIBRARY_PREFIXES)
+        ),
+        stack[-1] if stack else None,
+    )
+    site_key = (event, site.filename, site.lineno) if site else (event,)
+
+    if site_key not in _reported_sites:
+        _reported_sites.add(site_key)
+        where = f"{site.filename}:{site.lineno} in {site.name}" if site else "unknown"
+        print(f"⚠️  Blocking network call on event loop ({event}) at {where}")
+        print("".join(traceback.format_list(stack[-8:])))
+
+    if _mode == "raise":
+        raise BlockingCallOnEventLoop(
+            f"Synchronous network call '{event}' made on the event loop thread"
+        )
+
+
+def install_blocking_io_guard(mode: Optional[str] = None):
+    """
+    Install a runtime guard that reports synchronous network calls made on the
+    event loop thread (e.g. requests.get inside an async def).
+
+    Uses the interpreter's audit hooks, so it catches blocking socket connects
+    and DNS lookups from any library without patching it. Audit hooks cannot
+    be removed once added; calling this again only changes the mode.
+
+    Args:
+        mode (Optional[str]): "off", "warn" or "raise" (defaults to BLOCKING_IO_GUARD)
+    """
+    global _installed, _mode
+    _mode = (mode or BLOCKING_IO_GUARD).lower()
+    if _mode not in ("off", "warn", "raise"):
+        _mode = "warn"
+    if not _installed and _mode != "off":
+        sys.addaudithook(_audit_hook)
+        _installed = True
+
+
+def get_guard_stats() -> dict:
+    """Return guard mode and the number of blocking calls detected so far."""
+    return {
+        "mode": _mode,
+        "violations": _violations,
+        "call_sites": len(_reported_sites),
+    }
@@ -0,0 +1,147 @@
+import asyncio
+import os
+import re
+from typing import List, Optional
+
+from .media_proxy import ProxyError, open_upstream
+from .result_cache import TTLCache
+from .single_flight import SingleFlight
+
+# Seconds a response may spend probing its video links. Links still
+# unanswered by then are returned as scraped.
+PROBE_BUDGET = float(os.getenv("PROBE_BUDGET", "1.5"))
+
+# Probes in flight at once across all requests
+PROBE_CONCURRENCY = int(os.getenv("PROBE_CONCURRENCY", "16"))
+
+# Size and type of a CDN object do not change while its link is valid;
+# failed probes are retried sooner
+PROBE_CACHE_TTL = float(os.getenv("PROBE_CACHE_TTL", "1800"))
+PROBE_FAILURE_TTL = float(os.getenv("PROBE_FAILURE_TTL", "60"))
+
+# Values scrapers put in "filesize" when they do not know it
+UNKNOWN_FILESIZES = ("null", "", None)
+
+_CONTENT_RANGE_TOTAL = re.compile(r"/(\d+)\s*$")
+
+probe_cache = TTLCache(
+    max_entries=int(os.getenv("PROBE_CACHE_MAX_ENTRIES", "20000")),
+    default_ttl=PROBE_CACHE_TTL,
+)
+inflight_probes = SingleFlight()
+_probe_slots = asyncio.Semaphore(PROBE_CONCURRENCY)
+
+_stats = {
+    "probes": 0,
+    "failures": 0,
+    "over_budget": 0,
+}
+
+
+async def probe_url(url: str) -> Optional[dict]:
+    """
+    Ask a media URL for its size, type and range support.
+
+    Sends a one-byte range request rather than HEAD: CDNs that refuse HEAD
+    still answer it, and a 206 reply proves the download can be resumed.
+    The body is never read.
+
+    Args:
+        url: Direct media URL
+
+    Returns:
+        Optional[dict]: filesize (bytes, None if unknown), content_type and
+        resumable, or None if the URL could not be probed
+    """
+    _stats["probes"] += 1
+    try:
+        async with _probe_slots:
+            upstream = await open_upstream(url, {"Range": "bytes=0-0"})
+            await upstream.close()
+    except ProxyError:
+        _stats["failures"] += 1
+        return None
+
+    headers = upstream.headers
+    filesize = None
+    if upstream.status == 206:
+        match = _CONTENT_RANGE_TOTAL.search(headers.get("content-range", ""))
+        filesize = int(match.group(1)) if match else None
+    elif upstream.status == 200 and headers.get("content-length", "").isdigit():
+        filesize = int(headers["content-length"])
+
+    content_type = headers.get("content-type", "").split(";", 1)[0].strip()
+    return {
+        "filesize": filesize,
+        "content_type": content_type or None,
+        "resumable": upstream.status == 206
+        or headers.get("accept-ranges", "").lower() == "bytes",
+    }
+
+
+async def cached_probe(url: str) -> Optional[dict]:
+    """probe_url() through the probe cache, sharing concurrent probes of a URL."""
+    cached = probe_cache.get(url)
+    if cached is not None:
+        return cached or None
+
+    async def probe():
+        result = await probe_url(url)
+        # Failures are cached as {} so a dead link is not probed every time
+        probe_cache.set(
+            url, result or {}, ttl=PROBE_CACHE_TTL if result else PROBE_FAILURE_TTL
+        )
+        return result
+
+    result, _ = await inflight_probes.do(url, probe)
+    return result
+
+
+async def probe_videos(videos: List[dict], budget: float = PROBE_BUDGET):
+    """
+    Fill in size, type and resumability of video links, in place.
+
+    All links are probed concurrently. Whatever has not answered when the
+    budget runs out is cancelled and left as scraped, so probing never adds
+    more than `budget` seconds to a response. A provider-supplied filesize
+    is kept; only placeholders are replaced.
+
+    Args:
+        videos: The "videos" list of a download result
+        budget: Seconds to wait for probes
+    """
+    urls = {
+        video["url"]
+        for video in videos
+        if isinstance(video, dict) and str(video.get("url", "")).startswith("http")
+    }
+    if not urls:
+        return
+
+    tasks = {url: asyncio.create_task(cached_probe(url)) for url in urls}
+    _, pending = await asyncio.wait(tasks.values(), timeout=budget)
+    for task in pending:
+        task.cancel()
+    _stats["over_budget"] += len(pending)
+
+    for video in videos:
+        task = tasks.get(video.get("url")) if isinstance(video, dict) else None
+        if task is None or task in pending or task.exception() is not None:
+            continue
+        probed = task.result()
+        if not probed:
+            continue
+        if video.get("filesize") in UNKNOWN_FILESIZES and probed["filesize"]:
+            video["filesize"] = probed["filesize"]
+        video["content_type"] = probed["content_type"]
+        video["resumable"] = probed["resumable"]
+
+
+def get_probe_stats() -> dict:
+    """Probe counters and probe cache statistics for monitoring."""
+    return {
+        **_stats,
+        "budget": PROBE_BUDGET,
+        "cache": probe_cache.stats(),
+        "single_flight": inflight_probes.stats(),
+    }
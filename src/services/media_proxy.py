@@ -0,0 +1,245 @@
+import asyncio
+import ipaddress
+import os
+import socket
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urljoin, urlsplit
+
+import aiohttp
+
+from .http_client import (
+    HTTP_CONNECT_TIMEOUT,
+    NonPublicAddressError,
+    get_public_connector,
+    http_session,
+)
+
+# Bytes read from upstream per chunk; with the server's write backpressure
+# this bounds the memory a proxied stream holds to a few chunks
+PROXY_CHUNK_SIZE = int(os.getenv("PROXY_CHUNK_SIZE", str(64 * 1024)))
+
+# Seconds without a byte from upstream before a stream is abandoned. There
+# is no total timeout: large files take as long as they take.
+PROXY_READ_TIMEOUT = float(os.getenv("PROXY_READ_TIMEOUT", "30"))
+
+PROXY_MAX_REDIRECTS = int(os.getenv("PROXY_MAX_REDIRECTS", "5"))
+
+PROXY_TIMEOUT = aiohttp.ClientTimeout(
+    total=None, sock_connect=HTTP_CONNECT_TIMEOUT, sock_read=PROXY_READ_TIMEOUT
+)
+
+PROXY_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+# Client request headers forwarded upstream
+FORWARDED_REQUEST_HEADERS = ("range", "if-range")
+
+# Upstream response headers passed back to the client
+FORWARDED_RESPONSE_HEADERS = (
+    "content-type",
+    "content-length",
+    "content-range",
+    "accept-ranges",
+    "etag",
+    "last-modified",
+)
+
+# Upstream statuses relayed as-is; anything else is a bad gateway
+RELAYED_STATUSES = (200, 206, 416)
+
+_stats = {
+    "streams": 0,
+    "active": 0,
+    "bytes": 0,
+    "rejected": 0,
+    "upstream_errors": 0,
+}
+
+
+class ProxyError(Exception):
+    """Raised when an upstream URL cannot or may not be proxied."""
+
+    def __init__(self, status_code: int, detail: str):
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(detail)
+
+
+async def check_public_url(url: str):
+    """
+    Refuse URLs that could reach the server's own network.
+
+    Only http(s) URLs whose host resolves exclusively to public addresses
+    are allowed, so the proxy cannot be pointed at localhost, the cloud
+    metadata endpoint or other internal services. This gives a clear error
+    up front; the connection itself is pinned to vetted addresses by the
+    public connector's resolver, so a host re-resolving to an internal
+    address afterwards is refused too.
+
+    Raises:
+        ProxyError: If the URL is not allowed
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ProxyError(400, "Only absolute http(s) URLs can be proxied")
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            parts.hostname,
+            parts.port or (443 if parts.scheme == "https" else 80),
+            type=socket.SOCK_STREAM,
+        )
+    except socket.gaierror:
+        raise ProxyError(502, f"Cannot resolve {parts.hostname}")
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%", 1)[0])
+        if not address.is_global:
+            raise ProxyError(403, f"Proxying to {parts.hostname} is not allowed")
+
+
+class UpstreamStream:
+    """
+    An open upstream response, streamed to the client chunk by chunk.
+
+    Holds its own client session so the response outlives the request
+    handler that opened it; close() releases both and is safe to call more
+    than once.
+    """
+
+    def __init__(
+        self, session: aiohttp.ClientSession, response: aiohttp.ClientResponse
+    ):
+        self.session = session
+        self.response = response
+        self.status = response.status
+        self.headers: Dict[str, str] = {
+            name: response.headers[name]
+            for name in FORWARDED_RESPONSE_HEADERS
+            if name in response.headers
+        }
+        self.closed = False
+        _stats["active"] += 1
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self.response.content.iter_chunked(PROXY_CHUNK_SIZE):
+                _stats["bytes"] += len(chunk)
+                yield chunk
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # Headers are already sent; all that is left is to cut the stream
+            _stats["upstream_errors"] += 1
+            print(f"⚠️  Proxy stream from {self.response.url.host} broke: {e}")
+        finally:
+            await self.close()
+
+    async def read(self, max_bytes: int) -> bytes:
+        """
+        Read the whole body into memory, then close.
+
+        Raises:
+            ProxyError: If the body is larger than max_bytes
+        """
+        chunks, size = [], 0
+        try:
+            async for chunk in self.response.content.iter_chunked(PROXY_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ProxyError(502, f"Upstream body exceeds {max_bytes} bytes")
+                chunks.append(chunk)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            _stats["upstream_errors"] += 1
+            raise ProxyError(502, f"Failed to read upstream: {e}")
+        finally:
+            await self.close()
+        _stats["bytes"] += size
+        return b"".join(chunks)
+
+    async def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        _stats["active"] -= 1
+        self.response.release()
+        await self.session.close()
+
+
+async def open_upstream(
+    url: str, request_headers: Optional[Dict[str, str]] = None, method: str = "GET"
+) -> UpstreamStream:
+    """
+    Request a URL for proxying, without reading its body.
+
+    Redirects are followed by hand so every hop passes check_public_url().
+
+    Args:
+        url: Upstream http(s) URL
+        request_headers: Client request headers; only Range and If-Range
+            are forwarded
+        method: GET, or HEAD for the headers alone
+
+    Returns:
+        UpstreamStream: The open response, to be streamed or closed
+
+    Raises:
+        ProxyError: If the URL is refused, unreachable or answers with an
+            error status
+    """
+    headers = {
+        "User-Agent": PROXY_USER_AGENT,
+        # Compressed bodies would break Content-Length and byte ranges
+        "Accept-Encoding": "identity",
+    }
+    for name, value in (request_headers or {}).items():
+        if name.lower() in FORWARDED_REQUEST_HEADERS:
+            headers[name] = value
+
+    session = http_session(
+        get_public_connector(), timeout=PROXY_TIMEOUT, auto_decompress=False
+    )
+    try:
+        for _ in range(PROXY_MAX_REDIRECTS + 1):
+            await check_public_url(url)
+            response = await session.request(
+                method, url, headers=headers, allow_redirects=False
+            )
+            if response.status not in (301, 302, 303, 307, 308):
+                break
+            location = response.headers.get("location")
+            response.release()
+            if not location:
+                raise ProxyError(502, "Upstream redirect without a location")
+            url = urljoin(str(response.url), location)
+        else:
+            raise ProxyError(502, "Too many upstream redirects")
+
+        if response.status not in RELAYED_STATUSES:
+            response.release()
+            raise ProxyError(502, f"Upstream returned HTTP {response.status}")
+    except ProxyError:
+        _stats["rejected"] += 1
+        await session.close()
+        raise
+    except aiohttp.ClientConnectorError as e:
+        await session.close()
+        if isinstance(e.os_error, NonPublicAddressError):
+            _stats["rejected"] += 1
+            raise ProxyError(403, f"Proxying to {e.host} is not allowed")
+        _stats["upstream_errors"] += 1
+        raise ProxyError(502, f"Failed to fetch upstream: {e}")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        _stats["upstream_errors"] += 1
+        await session.close()
+        raise ProxyError(502, f"Failed to fetch upstream: {e}")
+    except BaseException:
+        # Cancelled mid-request
+        await session.close()
+        raise
+
+    _stats["streams"] += 1
+    return UpstreamStream(session, response)
+
+
+def get_proxy_stats() -> dict:
+    """Proxied stream counters for monitoring."""
+    return {**_stats, "chunk_size": PROXY_CHUNK_SIZE}
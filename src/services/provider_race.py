@@ -0,0 +1,186 @@
+import asyncio
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .provider_scoreboard import rank_providers, record_provider_score
+
+
+@dataclass
+class Provider:
+    """
+    One upstream scraper for a platform.
+
+    Attributes:
+        name: Short provider name used in stats (e.g. "on4t", "vidburner")
+        fetch: Coroutine function taking the video URL and returning the
+            standard {"title", "thumbnail", "videos"} dict
+        hedge_delay: Seconds after the race starts before this provider is
+            launched, unless every provider started before it has already failed
+    """
+
+    name: str
+    fetch: Callable[[str], Awaitable[dict]]
+    hedge_delay: float = 0.0
+
+
+class AllProvidersFailed(Exception):
+    """Raised when no provider in a race produced a valid result."""
+
+    def __init__(self, platform: str, errors: Dict[str, str]):
+        self.platform = platform
+        self.errors = errors
+        details = "; ".join(f"{name}: {error}" for name, error in errors.items())
+        super().__init__(details or "no providers configured")
+
+
+def has_video_links(result: Any) -> bool:
+    """Default validity predicate: at least one video with a non-empty URL."""
+    if not isinstance(result, dict):
+        return False
+    videos = result.get("videos") or []
+    return any(isinstance(video, dict) and video.get("url") for video in videos)
+
+
+# Name of the provider that won the most recent race in the current context
+_race_winner: ContextVar[Optional[str]] = ContextVar("race_winner", default=None)
+
+
+def last_race_winner() -> Optional[str]:
+    """Provider that won the last race awaited in the current task, if any."""
+    return _race_winner.get()
+
+
+# Per (platform, provider) counters and timings, exposed for monitoring
+provider_stats: Dict[Tuple[str, str], dict] = defaultdict(
+    lambda: {
+        "calls": 0,
+        "successes": 0,
+        "failures": 0,
+        "cancelled": 0,
+        "wins": 0,
+        "total_latency": 0.0,
+        "last_latency": None,
+    }
+)
+
+
+def record_provider_outcome(
+    platform: str, provider: str, latency: float, ok: bool, won: bool = False
+):
+    stats = provider_stats[(platform, provider)]
+    stats["successes" if ok else "failures"] += 1
+    stats["total_latency"] += latency
+    stats["last_latency"] = round(latency, 3)
+    if won:
+        stats["wins"] += 1
+    record_provider_score(platform, provider, latency, ok)
+
+
+def get_provider_stats() -> dict:
+    """Provider stats grouped by platform, with average latency."""
+    grouped: Dict[str, dict] = {}
+    for (platform, provider), stats in provider_stats.items():
+        finished = stats["successes"] + stats["failures"]
+        grouped.setdefault(platform, {})[provider] = {
+            **stats,
+            "total_latency": round(stats["total_latency"], 3),
+            "avg_latency": (
+                round(stats["total_latency"] / finished, 3) if finished else None
+            ),
+        }
+    return grouped
+
+
+def _consume_task_result(task: asyncio.Task):
+    if not task.cancelled():
+        task.exception()
+
+
+async def race_providers(
+    platform: str,
+    url: str,
+    providers: List[Provider],
+    is_valid: Callable[[Any], bool] = has_video_links,
+) -> dict:
+    """
+    Race providers for a URL and return the first valid result.
+
+    Providers are first reordered by the live scoreboard, so a degraded
+    scraper drops behind its backups without a deploy. They then start in
+    that order, each after its hedge_delay (measured from the start of the
+    race); if everything running has failed, the next
+    provider starts immediately instead of waiting out its delay. Exceptions
+    and results rejected by is_valid count as failures, so a fast failure
+    never cancels a slower provider that might still succeed. Once a valid
+    result arrives every other provider is cancelled.
+
+    Args:
+        platform (str): Platform name, used for stats
+        url (str): Video URL passed to each provider
+        providers (List[Provider]): Providers in configured priority order
+        is_valid: Predicate deciding whether a result counts as a success
+
+    Returns:
+        dict: The winning provider's result
+
+    Raises:
+        AllProvidersFailed: If every provider failed or returned an invalid result
+    """
+    loop = asyncio.get_running_loop()
+    race_start = loop.time()
+    queue = rank_providers(platform, list(providers))
+    running: Dict[asyncio.Task, Tuple[Provider, float]] = {}
+    errors: Dict[str, str] = {}
+
+    def launch(provider: Provider):
+        task = asyncio.create_task(provider.fetch(url))
+        running[task] = (provider, loop.time())
+        provider_stats[(platform, provider.name)]["calls"] += 1
+
+    try:
+        while running or queue:
+            # Start every provider whose hedge delay has elapsed, or the next
+            # one straight away when nothing is left running
+            elapsed = loop.time() - race_start
+            while queue and (not running or elapsed >= queue[0].hedge_delay):
+                launch(queue.pop(0))
+
+            timeout = (
+                max(queue[0].hedge_delay - (loop.time() - race_start), 0)
+                if queue
+                else None
+            )
+            done, _ = await asyncio.wait(
+                running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            for task in done:
+                provider, started_at = running.pop(task)
+                latency = loop.time() - started_at
+                try:
+                    result = task.result()
+                except Exception as e:
+                    record_provider_outcome(platform, provider.name, latency, ok=False)
+                    errors[provider.name] = str(e) or type(e).__name__
+                    continue
+
+                if is_valid(result):
+                    record_provider_outcome(
+                        platform, provider.name, latency, ok=True, won=True
+                    )
+                    _race_winner.set(provider.name)
+                    return result
+
+                record_provider_outcome(platform, provider.name, latency, ok=False)
+                errors[provider.name] = "Invalid or empty result"
+
+        raise AllProvidersFailed(platform, errors)
+    finally:
+        # Cancel losers (and everything, if the caller itself was cancelled)
+        for task, (provider, _) in running.items():
+            if not task.done():
+                task.cancel()
+                provider_stats[(platform, provider.name)]["cancelled"] += 1
+            task.add_done_callback(_consume_task_result)
@@ -0,0 +1,161 @@
+import math
+import os
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from ..models.download_history import DownloadHistory, DownloadStatus
+
+if TYPE_CHECKING:
+    from .provider_race import Provider
+
+# Weight of the newest observation in the latency/success moving averages
+PROVIDER_EWMA_ALPHA = float(os.getenv("PROVIDER_EWMA_ALPHA", "0.2"))
+
+# Latency assumed for a provider with no observations yet (seconds)
+PROVIDER_PRIOR_LATENCY = float(os.getenv("PROVIDER_PRIOR_LATENCY", "5"))
+
+# A provider that has not been called for this long is trusted again, so a
+# demoted scraper gets retried once it may have recovered (seconds)
+PROVIDER_RECOVERY_SECONDS = float(os.getenv("PROVIDER_RECOVERY_SECONDS", "600"))
+
+# Hedge a backup once the leader is this many times slower than usual
+PROVIDER_HEDGE_FACTOR = float(os.getenv("PROVIDER_HEDGE_FACTOR", "2"))
+MIN_HEDGE_DELAY = 0.5
+
+# How far back DownloadHistory is read to seed the scoreboard at startup
+PROVIDER_SEED_HOURS = int(os.getenv("PROVIDER_SEED_HOURS", "24"))
+PROVIDER_SEED_LIMIT = 5000
+
+
+@dataclass
+class ProviderScore:
+    """Exponentially-weighted latency and success rate of one provider."""
+
+    latency: Optional[float] = None  # EWMA of successful call latency
+    success: float = 1.0  # EWMA of outcomes, 1.0 = always succeeds
+    samples: int = 0
+    updated_at: float = 0.0
+
+    def observe(self, latency: float, ok: bool, now: float):
+        self.success += PROVIDER_EWMA_ALPHA * ((1.0 if ok else 0.0) - self.success)
+        # Failures are often fast; only successful calls describe real latency
+        if ok:
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += PROVIDER_EWMA_ALPHA * (latency - self.latency)
+        self.samples += 1
+        self.updated_at = now
+
+    def effective_success(self, now: float) -> float:
+        if not self.samples:
+            return self.success
+        # Drift back towards 1.0 while the provider is not being exercised
+        idle = max(now - self.updated_at, 0.0)
+        recovered = 1.0 - math.exp(-idle / PROVIDER_RECOVERY_SECONDS)
+        return self.success + (1.0 - self.success) * recovered
+
+    def score(self, now: float) -> float:
+        """Expected successes per second of waiting; higher is better."""
+        latency = self.latency if self.latency is not None else PROVIDER_PRIOR_LATENCY
+        return self.effective_success(now) / max(latency, 0.05)
+
+
+# Scores per (platform, provider)
+scoreboard: Dict[Tuple[str, str], ProviderScore] = {}
+
+
+def record_provider_score(platform: str, provider: str, latency: float, ok: bool):
+    """Feed one finished provider call into the scoreboard."""
+    score = scoreboard.setdefault((platform, provider), ProviderScore())
+    score.observe(latency, ok, time.monotonic())
+
+
+def rank_providers(platform: str, providers: List["Provider"]) -> List["Provider"]:
+    """
+    Reorder a platform's providers by live score and retune their hedge delays.
+
+    The configured hedge delays are kept as slots: whichever provider ranks
+    second takes the second slot's delay, and so on. A hedged slot fires
+    earlier when the leader is usually much faster than the configured delay,
+    so a stalled leader is backed up after PROVIDER_HEDGE_FACTOR times its
+    typical latency.
+
+    Args:
+        platform (str): Platform name
+        providers (List[Provider]): Providers in configured priority order
+
+    Returns:
+        List[Provider]: Providers in ranked order with adjusted hedge delays
+    """
+    if len(providers) < 2:
+        return providers
+
+    now = time.monotonic()
+    default = ProviderScore()
+    ranked = sorted(
+        providers,
+        key=lambda p: -scoreboard.get((platform, p.name), default).score(now),
+    )
+
+    leader = scoreboard.get((platform, ranked[0].name))
+    slots = [p.hedge_delay for p in providers]
+    result = []
+    for provider, delay in zip(ranked, slots):
+        if delay > 0 and leader and leader.latency is not None:
+            delay = min(
+                delay, max(leader.latency * PROVIDER_HEDGE_FACTOR, MIN_HEDGE_DELAY)
+            )
+        result.append(replace(provider, hedge_delay=delay))
+    return result
+
+
+def get_scoreboard() -> dict:
+    """Current scores grouped by platform, each platform in ranked order."""
+    now = time.monotonic()
+    grouped: Dict[str, dict] = {}
+    entries = sorted(scoreboard.items(), key=lambda item: -item[1].score(now))
+    for (platform, provider), score in entries:
+        grouped.setdefault(platform, {})[provider] = {
+            "latency": round(score.latency, 3) if score.latency is not None else None,
+            "success": round(score.effective_success(now), 3),
+            "score": round(score.score(now), 3),
+            "samples": score.samples,
+        }
+    return grouped
+
+
+def seed_provider_scoreboard(session: Session) -> int:
+    """
+    Seed the scoreboard from recent successful downloads in DownloadHistory.
+    Call this function on application startup.
+
+    Args:
+        session (Session): Database session
+
+    Returns:
+        int: Number of history rows replayed
+    """
+    since = datetime.now(timezone.utc) - timedelta(hours=PROVIDER_SEED_HOURS)
+    rows = session.exec(
+        select(
+            DownloadHistory.platform,
+            DownloadHistory.provider,
+            DownloadHistory.response_time,
+        )
+        .where(DownloadHistory.created_at >= since)
+        .where(DownloadHistory.status == DownloadStatus.SUCCESS)
+        .where(DownloadHistory.provider.is_not(None))
+        .where(DownloadHistory.response_time.is_not(None))
+        .order_by(DownloadHistory.created_at.desc())
+        .limit(PROVIDER_SEED_LIMIT)
+    ).all()
+
+    # Replay oldest first so the newest rows carry the most weight
+    for platform, provider, response_time in reversed(rows):
+        record_provider_score(platform, provider, response_time, ok=True)
+    return len(rows)
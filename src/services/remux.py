@@ -0,0 +1,304 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from collections import deque
+from typing import List, Optional, Tuple
+
+from .hls_gateway import (
+    HLS_MAX_SEGMENT_BYTES,
+    parse_segments,
+    parse_variants,
+    read_playlist,
+    segment_cache,
+    segment_cache_key,
+)
+from .jobs import Job, JobRegistry
+from .media_proxy import ProxyError, open_upstream
+
+# ffmpeg binary used to remux; only stream copies, never re-encodes
+FFMPEG_PATH = os.getenv("FFMPEG_PATH", "ffmpeg")
+
+# Finished MP4s, named by the sha256 of their content
+REMUX_OUTPUT_DIR = os.getenv(
+    "REMUX_OUTPUT_DIR",
+    os.path.join(tempfile.gettempdir(), "j-video-downloader-remux"),
+)
+
+# Finished MP4s are kept while downloaded within REMUX_OUTPUT_MAX_AGE
+# seconds, least recently downloaded evicted first beyond
+# REMUX_OUTPUT_MAX_BYTES
+REMUX_OUTPUT_MAX_BYTES = int(os.getenv("REMUX_OUTPUT_MAX_BYTES", str(4 * 1024**3)))
+REMUX_OUTPUT_MAX_AGE = float(os.getenv("REMUX_OUTPUT_MAX_AGE", "86400"))
+
+# Segments downloaded at once per job. Segments are written to ffmpeg in
+# order as they arrive, so at most this many are held in memory.
+REMUX_SEGMENT_CONCURRENCY = int(os.getenv("REMUX_SEGMENT_CONCURRENCY", "6"))
+
+REMUX_SEGMENT_RETRIES = 2
+
+# ffmpeg processes running at once across all jobs
+REMUX_MAX_JOBS = int(os.getenv("REMUX_MAX_JOBS", "2"))
+
+# Bytes of ffmpeg's stderr kept for the error message of a failed job
+REMUX_STDERR_TAIL = 4096
+
+remux_jobs = JobRegistry("hls-remux")
+_job_slots = asyncio.Semaphore(REMUX_MAX_JOBS)
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which(FFMPEG_PATH) is not None
+
+
+def output_path(digest: str) -> str:
+    return os.path.join(REMUX_OUTPUT_DIR, f"{digest}.mp4")
+
+
+def open_output(digest: str) -> Optional[str]:
+    """
+    Path of a finished MP4, marked as just downloaded, or None if it is gone.
+
+    The modification time records the last download; prune_outputs() evicts
+    by it.
+    """
+    path = output_path(digest)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def prune_outputs(keep: Optional[str] = None) -> int:
+    """
+    Enforce REMUX_OUTPUT_MAX_AGE and REMUX_OUTPUT_MAX_BYTES on the output
+    directory.
+
+    Files not downloaded within the age limit go first, then the least
+    recently downloaded until the rest fit. Temporary files of jobs that
+    died without cleaning up are removed once past the age limit.
+
+    Args:
+        keep: Path never evicted, the file a job just produced
+
+    Returns:
+        int: Number of files removed
+    """
+    cutoff = time.time() - REMUX_OUTPUT_MAX_AGE
+    files = []
+    for entry in os.scandir(REMUX_OUTPUT_DIR):
+        if entry.is_file():
+            stat = entry.stat()
+            files.append((stat.st_mtime, entry.path, stat.st_size))
+
+    total = sum(size for _, path, size in files if path.endswith(".mp4"))
+    removed = 0
+    for mtime, path, size in sorted(files):
+        if path == keep:
+            continue
+        if path.endswith(".mp4"):
+            if mtime >= cutoff and total <= REMUX_OUTPUT_MAX_BYTES:
+                continue
+            total -= size
+        elif mtime >= cutoff:
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def choose_variant(variants: List[dict], max_height: Optional[int] = None) -> dict:
+    """
+    Highest-bandwidth variant, optionally no taller than max_height.
+
+    Falls back to the lowest variant when none fits under max_height.
+    """
+
+    def height(variant: dict) -> int:
+        resolution = variant.get("RESOLUTION", "")
+        return int(resolution.partition("x")[2] or 0)
+
+    def bandwidth(variant: dict) -> int:
+        return int(variant.get("BANDWIDTH") or 0)
+
+    ranked = sorted(variants, key=bandwidth)
+    if max_height:
+        fitting = [variant for variant in ranked if height(variant) <= max_height]
+        return fitting[-1] if fitting else ranked[0]
+    return ranked[-1]
+
+
+async def resolve_segments(
+    url: str, max_height: Optional[int] = None
+) -> Tuple[dict, List[str]]:
+    """
+    Pick a variant from a master playlist (or take a media playlist as-is)
+    and list its segments.
+
+    Raises:
+        ProxyError: If a playlist cannot be fetched or cannot be remuxed
+    """
+    text, final_url = await read_playlist(url)
+    variant = {"url": final_url}
+    variants = parse_variants(text, final_url)
+    if variants:
+        variant = choose_variant(variants, max_height)
+        if "AUDIO" in variant:
+            raise ProxyError(422, "Variants with separate audio are not supported")
+        text, final_url = await read_playlist(variant["url"])
+    segments = parse_segments(text, final_url)
+    if not segments:
+        raise ProxyError(422, "Playlist has no segments")
+    return variant, segments
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def read_segment(url: str) -> bytes:
+    """Segment body, from the HLS segment cache when a viewer already pulled it."""
+    cached = segment_cache.get(segment_cache_key(url))
+    if cached is not None:
+        try:
+            return await asyncio.to_thread(_read_file, cached)
+        except FileNotFoundError:
+            pass  # Evicted meanwhile
+
+    for attempt in range(REMUX_SEGMENT_RETRIES + 1):
+        try:
+            upstream = await open_upstream(url)
+            return await upstream.read(HLS_MAX_SEGMENT_BYTES)
+        except ProxyError:
+            if attempt == REMUX_SEGMENT_RETRIES:
+                raise
+            await asyncio.sleep(0.5 * 2**attempt)
+
+
+def _hash_and_store(temporary: str) -> Tuple[str, int]:
+    digest = hashlib.sha256()
+    with open(temporary, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    size = os.path.getsize(temporary)
+    # Identical output from an earlier job is simply kept
+    os.replace(temporary, output_path(digest.hexdigest()))
+    removed = prune_outputs(keep=output_path(digest.hexdigest()))
+    if removed:
+        print(f"🧹 Evicted {removed} remux outputs")
+    return digest.hexdigest(), size
+
+
+async def remux_hls(job: Job, url: str, max_height: Optional[int] = None) -> dict:
+    """
+    Download an HLS stream and remux it into one fragmented MP4.
+
+    Segments are fetched REMUX_SEGMENT_CONCURRENCY at a time and piped into
+    ffmpeg in playback order as soon as each one's predecessors are written,
+    so the download runs ahead of the remux without the file ever being
+    held in memory.
+
+    Args:
+        job: Job handle for progress reporting
+        url: Master or media playlist URL
+        max_height: Prefer the best variant no taller than this (optional)
+
+    Returns:
+        dict: sha256, size and download URL of the MP4, plus the variant used
+    """
+    variant, segments = await resolve_segments(url, max_height)
+    job.progress = {"segments": len(segments), "done": 0}
+
+    os.makedirs(REMUX_OUTPUT_DIR, exist_ok=True)
+    temporary = os.path.join(REMUX_OUTPUT_DIR, f".{uuid.uuid4().hex}.tmp")
+    pending: deque = deque()
+
+    async with _job_slots:
+        process = await asyncio.create_subprocess_exec(
+            FFMPEG_PATH,
+            *("-hide_banner", "-loglevel", "error", "-i", "pipe:0"),
+            *("-map", "0:v?", "-map", "0:a?", "-c", "copy"),
+            *("-f", "mp4", "-movflags", "frag_keyframe+empty_moov+default_base_moof"),
+            temporary,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        # Read stderr as it is written: a full pipe would stall ffmpeg
+        stderr_tail = bytearray()
+
+        async def drain_stderr():
+            while chunk := await process.stderr.read(4096):
+                stderr_tail.extend(chunk)
+                del stderr_tail[:-REMUX_STDERR_TAIL]
+
+        stderr_task = asyncio.create_task(drain_stderr())
+        try:
+            queue = iter(segments)
+            for segment_url in queue:
+                pending.append(asyncio.create_task(read_segment(segment_url)))
+                if len(pending) >= REMUX_SEGMENT_CONCURRENCY:
+                    break
+            while pending:
+                data = await pending.popleft()
+                next_url = next(queue, None)
+                if next_url is not None:
+                    pending.append(asyncio.create_task(read_segment(next_url)))
+                try:
+                    process.stdin.write(data)
+                    await process.stdin.drain()
+                except (BrokenPipeError, ConnectionResetError):
+                    # ffmpeg exited early; its stderr says why
+                    break
+                job.progress["done"] += 1
+
+            process.stdin.close()
+            await process.wait()
+            await stderr_task
+            if process.returncode != 0 or pending:
+                message = stderr_tail.decode(errors="replace")[-500:].strip()
+                raise RuntimeError(
+                    f"ffmpeg exited with {process.returncode}: {message}"
+                )
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            stderr_task.cancel()
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+    digest, size = await asyncio.to_thread(_hash_and_store, temporary)
+    return {
+        "sha256": digest,
+        "size": size,
+        "url": f"/download/remux/{digest}.mp4",
+        "segments": len(segments),
+        "variant": {
+            key: variant[key]
+            for key in ("BANDWIDTH", "RESOLUTION", "CODECS")
+            if key in variant
+        },
+    }
+
+
+def submit_remux(url: str, max_height: Optional[int] = None) -> Job:
+    """
+    Start (or join) a remux job for a playlist.
+
+    Returns:
+        Job: Handle to poll through /download/jobs/{id}
+    """
+    key = f"{url}|{max_height or ''}"
+    return remux_jobs.submit(key, lambda job: remux_hls(job, url, max_height))
@@ -0,0 +1,233 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+
+from sqlalchemy import func, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import SQLModel
+
+from ..models.download_rollup import (
+    DownloadRollupDaily,
+    DownloadRollupHourly,
+    ProviderRollupDaily,
+    ProviderRollupHourly,
+)
+from .latency_sketch import SKETCH_GAMMA, SKETCH_MIN_VALUE, sketch_key
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+# Rollup tables with the width of their buckets and the history column
+# they break counts down by next to platform
+ROLLUP_TABLES: List[Tuple[Type[SQLModel], timedelta, str]] = [
+    (DownloadRollupHourly, HOUR, "status"),
+    (DownloadRollupDaily, DAY, "status"),
+    (ProviderRollupHourly, HOUR, "provider"),
+    (ProviderRollupDaily, DAY, "provider"),
+]
+
+_COUNTERS = ("count", "response_time_sum", "response_time_count")
+
+# sketch_key() in SQL, for rebuilding rollups from raw history
+_SKETCH_KEY_SQL = (
+    f"ceil(ln(greatest(response_time, {SKETCH_MIN_VALUE})) / ln({SKETCH_GAMMA!r}))"
+    "::int::text"
+)
+
+
+def floor_hour(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _key_rows(rows: Iterable[dict]) -> List[tuple]:
+    # Bucket starts and sketch key are shared by every rollup table, so
+    # work them out once per row
+    keyed = []
+    for row in rows:
+        hour = floor_hour(row["created_at"])
+        response_time = row.get("response_time")
+        keyed.append(
+            (
+                row,
+                {HOUR: hour, DAY: hour.replace(hour=0)},
+                sketch_key(response_time) if response_time is not None else None,
+            )
+        )
+    return keyed
+
+
+def aggregate_rollups(
+    keyed_rows: List[tuple], width: timedelta, dimension: str = "status"
+) -> Dict[tuple, dict]:
+    """
+    Fold history rows into rollup counters keyed by (bucket, platform, dimension).
+
+    Args:
+        keyed_rows: History rows with their buckets and sketch key, as
+            returned by _key_rows()
+        width: Bucket width, HOUR or DAY
+        dimension: Second breakdown column, "status" or "provider"; rows
+            without a value for it are skipped
+
+    Returns:
+        Counters and response-time sketch per rollup key, ready to be
+        added to the rollup table
+    """
+    totals: Dict[tuple, dict] = {}
+    for row, buckets, response_key in keyed_rows:
+        if row.get(dimension) is None:
+            continue
+        key = (buckets[width], row["platform"], row[dimension])
+        counters = totals.setdefault(
+            key,
+            {
+                "count": 0,
+                "response_time_sum": 0.0,
+                "response_time_count": 0,
+                "response_time_sketch": {},
+            },
+        )
+        counters["count"] += 1
+        if response_key is not None:
+            sketch = counters["response_time_sketch"]
+            counters["response_time_sum"] += row["response_time"]
+            counters["response_time_count"] += 1
+            sketch[response_key] = sketch.get(response_key, 0) + 1
+    return totals
+
+
+def rollup_upserts(rows: List[dict]) -> list:
+    """
+    Build the statements adding a batch of history rows to every rollup table.
+
+    Each key appears once per statement (ON CONFLICT may touch a row only
+    once) and keys are sorted so concurrent writers lock rollup rows in the
+    same order instead of deadlocking.
+
+    Args:
+        rows: DownloadHistory column dicts as queued by the history writer
+
+    Returns:
+        List of (statement, parameters) pairs to execute in the batch's
+        transaction
+    """
+    keyed_rows = _key_rows(rows)
+    upserts = []
+    for model, width, dimension in ROLLUP_TABLES:
+        totals = aggregate_rollups(keyed_rows, width, dimension)
+        if not totals:
+            continue
+        table = model.__table__
+        params = [
+            {"bucket": bucket, "platform": platform, dimension: value, **counters}
+            for (bucket, platform, value), counters in sorted(totals.items())
+        ]
+        statement = pg_insert(table)
+        set_ = {name: table.c[name] + statement.excluded[name] for name in _COUNTERS}
+        # Sketches merge by adding bucket counts (SQL function from migration 0004)
+        set_["response_time_sketch"] = func.jsonb_sum_merge(
+            table.c.response_time_sketch, statement.excluded.response_time_sketch
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=["bucket", "platform", dimension], set_=set_
+        )
+        upserts.append((statement, params))
+    return upserts
+
+
+def rollup_segments(
+    start: datetime,
+    end: datetime,
+    hourly: Type[SQLModel] = DownloadRollupHourly,
+    daily: Type[SQLModel] = DownloadRollupDaily,
+) -> List[Tuple[Type[SQLModel], datetime, datetime]]:
+    """
+    Split [start, end) into the fewest rollup bucket ranges covering it.
+
+    Whole days come from the daily table and the partial days at either
+    edge from the hourly one. Both edges are rounded down to the hour.
+
+    Args:
+        start: Range start (naive UTC)
+        end: Range end, exclusive (naive UTC)
+        hourly: Hourly rollup model
+        daily: Daily rollup model of the same family
+
+    Returns:
+        List of (rollup model, bucket >= lower, bucket < upper)
+    """
+    start, end = floor_hour(start), floor_hour(end)
+    if start >= end:
+        return []
+
+    first_day = floor_day(start)
+    if first_day < start:
+        first_day += DAY
+    last_day = floor_day(end)
+    if first_day >= last_day:
+        return [(hourly, start, end)]
+
+    segments = []
+    if start < first_day:
+        segments.append((hourly, start, first_day))
+    segments.append((daily, first_day, last_day))
+    if last_day < end:
+        segments.append((hourly, last_day, end))
+    return segments
+
+
+def rebuild_rollups(
+    conn: Connection, lower: Optional[datetime], upper: datetime
+) -> int:
+    """
+    Recompute every rollup table for [lower, upper) from download_history.
+
+    Both bounds must be day boundaries (partition bounds are month starts),
+    so no daily bucket is split. Existing rollup rows in the range are
+    replaced.
+
+    Args:
+        conn: Connection inside the caller's transaction
+        lower: Range start, or None for everything before upper
+        upper: Range end (exclusive)
+
+    Returns:
+        int: History rows rolled up
+    """
+    params = {"lower": lower or datetime.min, "upper": upper}
+    for model, width, dimension in ROLLUP_TABLES:
+        table = model.__tablename__
+        grain = "day" if width == DAY else "hour"
+        conn.execute(
+            text(f"DELETE FROM {table} WHERE bucket >= :lower AND bucket < :upper"),
+            params,
+        )
+        conn.execute(
+            text(
+                f"INSERT INTO {table} (bucket, platform, {dimension}, count, "
+                "response_time_sum, response_time_count, response_time_sketch) "
+                f"SELECT bucket, platform, {dimension}, sum(n), sum(total), "
+                "sum(timed), coalesce(jsonb_object_agg(key, timed) "
+                "FILTER (WHERE key IS NOT NULL), '{}'::jsonb) "
+                f"FROM (SELECT date_trunc('{grain}', created_at) AS bucket, "
+                f"platform, {dimension}, CASE WHEN response_time IS NOT NULL "
+                f"THEN {_SKETCH_KEY_SQL} END AS key, count(*) AS n, "
+                "coalesce(sum(response_time), 0) AS total, "
+                "count(response_time) AS timed FROM download_history "
+                "WHERE created_at >= :lower AND created_at < :upper "
+                f"AND {dimension} IS NOT NULL "
+                "GROUP BY 1, 2, 3, 4) AS keyed GROUP BY 1, 2, 3"
+            ),
+            params,
+        )
+    return conn.execute(
+        text(
+            "SELECT count(*) FROM download_history "
+            "WHERE created_at >= :lower AND created_at < :upper"
+        ),
+        params,
+    ).scalar_one()
@@ -0,0 +1,271 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from .html_extract import parse_html
+from .http_client import http_session
+
+# How long a scraped form token (and the cookies issued with it) is reused
+SCRAPER_TOKEN_TTL = float(os.getenv("SCRAPER_TOKEN_TTL", "1800"))
+
+# Fraction of the TTL after which a token is refreshed in the background
+SCRAPER_TOKEN_REFRESH_AHEAD = 0.8
+
+# HTTP statuses with which a site rejects a stale token or session
+TOKEN_REJECTED_STATUSES = (401, 403, 419)
+
+
+@dataclass
+class ScraperToken:
+    """A form token plus the cookies the landing page issued alongside it."""
+
+    value: str
+    cookies: Dict[str, str] = field(default_factory=dict)
+    fetched_at: float = field(default_factory=time.monotonic)
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+def extract_input_token(html: str) -> str:
+    """Read <input name="token"> from an aio-dl landing page."""
+    element = parse_html(html, "input", attrs={"name": "token"}).find("input")
+    if not element or not element.get("value"):
+        raise Exception("Token not found")
+    return element["value"]
+
+
+def extract_meta_csrf_token(html: str) -> str:
+    """Read <meta name="csrf-token"> from a Laravel page such as on4t.com."""
+    element = parse_html(html, "meta", attrs={"name": "csrf-token"}).find("meta")
+    if not element or not element.get("content"):
+        raise Exception("CSRF token not found")
+    return element["content"]
+
+
+class TokenCache:
+    """
+    Caches the token scraped from one landing page.
+
+    Fresh tokens are served from memory. Once a token passes
+    SCRAPER_TOKEN_REFRESH_AHEAD of its TTL it is still served, but a
+    background refresh is started so callers rarely wait on the landing
+    page. Concurrent refreshes are coalesced into one request, and a token
+    the site rejects can be invalidated so the next caller fetches a new one.
+    """
+
+    def __init__(
+        self,
+        page_url: str,
+        headers: Optional[dict] = None,
+        extract: Callable[[str], str] = extract_input_token,
+        ttl: float = SCRAPER_TOKEN_TTL,
+    ):
+        self.page_url = page_url
+        self.headers = headers or {}
+        self.extract = extract
+        self.ttl = ttl
+        self.token: Optional[ScraperToken] = None
+        self._refresh: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.fetches = 0
+        self.invalidations = 0
+
+    async def get(self) -> ScraperToken:
+        token = self.token
+        if token and token.age() < self.ttl:
+            self.hits += 1
+            if token.age() >= self.ttl * SCRAPER_TOKEN_REFRESH_AHEAD:
+                self._start_refresh()
+            return token
+        return await asyncio.shield(self._start_refresh())
+
+    def invalidate(self, token: ScraperToken):
+        """Drop a token the site rejected, unless it was already replaced."""
+        if self.token is token:
+            self.token = None
+            self.invalidations += 1
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._fetch())
+            self._refresh.add_done_callback(_consume_task_result)
+        return self._refresh
+
+    async def _fetch(self) -> ScraperToken:
+        self.fetches += 1
+        async with http_session() as session:
+            async with session.get(self.page_url, headers=self.headers) as resp:
+                html = await resp.text()
+            cookies = {
+                name: morsel.value
+                for name, morsel in session.cookie_jar.filter_cookies(resp.url).items()
+            }
+        token = ScraperToken(value=self.extract(html), cookies=cookies)
+        self.token = token
+        return token
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "invalidations": self.invalidations,
+            "age": round(self.token.age(), 1) if self.token else None,
+        }
+
+
+def _consume_task_result(task: asyncio.Task):
+    if not task.cancelled():
+        task.exception()
+
+
+# One cache per landing page, shared by every request
+token_caches: Dict[str, TokenCache] = {}
+
+
+def get_token_cache(
+    page_url: str,
+    headers: Optional[dict] = None,
+    extract: Callable[[str], str] = extract_input_token,
+) -> TokenCache:
+    cache = token_caches.get(page_url)
+    if cache is None:
+        cache = token_caches[page_url] = TokenCache(page_url, headers, extract)
+    return cache
+
+
+def is_token_rejected(status: int, data) -> bool:
+    return status in TOKEN_REJECTED_STATUSES or not isinstance(data, dict)
+
+
+def is_aio_dl_token_rejected(status: int, data) -> bool:
+    # aio-dl answers a bad token with an error object instead of media
+    return is_token_rejected(status, data) or (
+        data.get("error") and "medias" not in data
+    )
+
+
+async def post_with_token(
+    cache: TokenCache,
+    api_url: str,
+    headers: dict,
+    build_payload: Callable[[str], dict],
+    rejected: Callable[[int, object], bool] = is_token_rejected,
+) -> dict:
+    """
+    POST a form carrying a cached token, retrying once if the token is rejected.
+
+    Args:
+        cache (TokenCache): Token cache for the site's landing page
+        api_url (str): Endpoint receiving the form
+        headers (dict): Request headers
+        build_payload: Builds the form data from the token value
+        rejected: Decides from (status, decoded JSON) whether the token was refused
+
+    Returns:
+        dict: The decoded JSON response
+
+    Raises:
+        Exception: If the token cannot be obtained or is rejected twice
+    """
+    for _ in range(2):
+        token = await cache.get()
+        async with http_session(cookies=token.cookies) as session:
+            async with session.post(
+                api_url, data=build_payload(token.value), headers=headers
+            ) as resp:
+                status = resp.status
+                try:
+                    data = await resp.json(content_type=None)
+                except ValueError:
+                    data = None
+
+        if not rejected(status, data):
+            return data
+        cache.invalidate(token)
+
+    # Still an error with a brand-new token: let the caller report it
+    if isinstance(data, dict) and status < 400:
+        return data
+    raise Exception(f"Token rejected by {api_url} (HTTP {status})")
+
+
+async def fetch_aio_dl(
+    page_url: str,
+    api_url: str,
+    url: str,
+    headers: dict,
+    form_hash: Optional[str] = None,
+) -> dict:
+    """
+    Query an "aio-dl" WordPress downloader (vidburner, steptodown, ...).
+
+    The form token from the landing page is cached per page, so a request
+    normally costs a single POST. If the site rejects the cached token it
+    is invalidated and the POST is retried once with a freshly scraped one.
+
+    Args:
+        page_url (str): Landing page carrying <input name="token">
+        api_url (str): The site's /wp-json/aio-dl/video-data/ endpoint
+        url (str): Video URL to resolve
+        headers (dict): Request headers for both the landing page and the POST
+        form_hash (Optional[str]): Static "hash" form field some sites expect
+
+    Returns:
+        dict: The decoded aio-dl JSON response
+
+    Raises:
+        Exception: If the token cannot be obtained or the request fails
+    """
+
+    def build_payload(token: str) -> dict:
+        payload = {"url": url, "token": token}
+        if form_hash:
+            payload["hash"] = form_hash
+        return payload
+
+    return await post_with_token(
+        get_token_cache(page_url, headers),
+        api_url,
+        headers,
+        build_payload,
+        rejected=is_aio_dl_token_rejected,
+    )
+
+
+ON4T_API_URL = "https://on4t.com/all-video-download"
+
+
+async def fetch_on4t(page_url: str, url: str, headers: dict) -> dict:
+    """
+    Submit a video URL to on4t.com's /all-video-download endpoint.
+
+    The Laravel CSRF token is only valid with the session cookie issued
+    alongside it, so both are cached per landing page and replayed together.
+    A 419 (session expired) or non-JSON answer invalidates them and the
+    request is retried once.
+
+    Args:
+        page_url (str): on4t landing page carrying <meta name="csrf-token">
+        url (str): Video URL to resolve
+        headers (dict): Request headers for both the landing page and the POST
+
+    Returns:
+        dict: The decoded on4t JSON response
+
+    Raises:
+        Exception: If the token cannot be obtained or the request fails
+    """
+    return await post_with_token(
+        get_token_cache(page_url, headers, extract=extract_meta_csrf_token),
+        ON4T_API_URL,
+        headers,
+        lambda token: {"_token": token, "link[]": url},
+    )
+
+
+def get_token_cache_stats() -> dict:
+    """Token cache counters per landing page."""
+    return {page_url: cache.stats() for page_url, cache in token_caches.items()}
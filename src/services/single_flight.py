@@ -0,0 +1,76 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    De-duplicate concurrent calls for the same key.
+
+    The first caller for a key starts the work as a background task; callers
+    arriving while it runs await that same task instead of starting their own.
+    Errors propagate to every waiter. A waiter being cancelled (e.g. client
+    disconnect) only cancels the shared work once no other waiter remains.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.started = 0
+        self.shared = 0
+
+    async def do(
+        self, key: Hashable, work: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Run work() for key, or join the call already in flight.
+
+        Returns:
+            Tuple[Any, bool]: The result and whether it was shared with an
+            earlier caller
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = _Flight(asyncio.create_task(work()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(
+                lambda _task, key=key, flight=flight: self._forget(key, flight)
+            )
+            self.started += 1
+        else:
+            self.shared += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller went away; nobody needs the result any more.
+                # Forget the flight first: the done callback only runs on a
+                # later loop iteration, and a caller arriving before then
+                # must start fresh work rather than join the cancelled task.
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            # Mark the exception retrieved; waiters already received it
+            flight.task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "deduplicated": self.shared,
+        }
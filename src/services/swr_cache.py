@@ -0,0 +1,107 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from .single_flight import SingleFlight
+
+
+class StaleWhileRevalidateCache:
+    """
+    In-memory cache that keeps serving a stale value while it is refreshed.
+
+    An entry is fresh for ttl seconds and served as-is. For the following
+    stale_ttl seconds it is still served immediately, but the first such
+    lookup starts a background reload. Past that, or on a miss, the caller
+    waits for the reload. Concurrent reloads of a key are coalesced, so a
+    burst of requests costs at most one load. A ttl of 0 disables caching but
+    keeps the coalescing. Not thread-safe: intended for use from the event
+    loop only.
+    """
+
+    def __init__(self, ttl: float = 30, stale_ttl: float = 300, max_entries: int = 100):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._flights = SingleFlight()
+        self._background: set = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.load_errors = 0
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for key, loading it with load() when needed.
+
+        Args:
+            key: Cache key
+            load: Coroutine function producing a fresh value
+
+        Returns:
+            The cached or freshly loaded value
+
+        Raises:
+            Exception: Whatever load() raised, when there was no value to serve
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._revalidate(key, load)
+                return entry[1]
+
+        self.misses += 1
+        value, _ = await self._flights.do(key, lambda: self._load(key, load))
+        return value
+
+    def _revalidate(self, key: Hashable, load: Callable[[], Awaitable[Any]]):
+        task = asyncio.create_task(self._flights.do(key, lambda: self._load(key, load)))
+        # Keep a reference until done; a failed refresh keeps the stale value
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        self.loads += 1
+        try:
+            value = await load()
+        except Exception:
+            self.load_errors += 1
+            raise
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return value
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": (
+                round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+            ),
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+        }
@@ -0,0 +1,57 @@
+import asyncio
+
+from src.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_result():
+    async def scenario():
+        flights = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "video"
+
+        results = await asyncio.gather(
+            flights.do("k", work), flights.do("k", work), flights.do("k", work)
+        )
+        return calls, results, flights.stats()
+
+    calls, results, stats = asyncio.run(scenario())
+    assert calls == 1
+    assert [result for result, _ in results] == ["video"] * 3
+    assert [shared for _, shared in results] == [False, True, True]
+    assert stats["in_flight"] == 0
+
+
+def test_caller_after_last_waiter_cancelled_starts_fresh_work():
+    async def scenario():
+        flights = SingleFlight()
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def fast():
+            return "fresh"
+
+        first = asyncio.create_task(flights.do("k", slow))
+        await started.wait()
+        first.cancel()
+        try:
+            await first
+        except asyncio.CancelledError:
+            pass
+
+        # Same loop iteration as the cancellation: the dying flight's done
+        # callback has not run yet
+        in_flight = flights.stats()["in_flight"]
+        return in_flight, await flights.do("k", fast)
+
+    in_flight, (result, shared) = asyncio.run(scenario())
+    assert in_flight == 0
+    assert result == "fresh"
+    assert shared is False